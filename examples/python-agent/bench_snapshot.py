@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Decode cost and retained memory: dict snapshots (`SnapshotStore`) vs slot
+records (`SlotStore`).
+
+Synthetic `/api/bot/world` payloads shaped like the server's (players carry
+the full public profile: stats, equipment, an inventory), one full snapshot
+followed by deltas where a share of the players and monsters moved. Each
+tick is timed from raw JSON bytes through `json.loads`, `store.apply` and one
+`decide` step. Retained memory is what one store (one bot) still holds after
+the payloads are gone, measured with tracemalloc, plus the number of
+GC-tracked objects it keeps alive.
+
+    python3 examples/python-agent/bench_snapshot.py
+    python3 examples/python-agent/bench_snapshot.py --players 200 --monsters 120 --ticks 300 --bots 500
+"""
+
+from __future__ import annotations
+
+import gc
+import json
+import random
+import sys
+import time
+import tracemalloc
+from typing import Dict, List
+
+from bot import AgentState, decide
+from snapshot import SlotStore, SnapshotStore
+
+COLORS = ["rgba(251, 182, 206, 0.9)", "rgba(125, 211, 252, 0.9)", None]
+ITEMS = ["jelly", "leaf", "dagger_1", "zenny", "apple"]
+
+
+def _player(i: int, rng: random.Random) -> dict:
+    return {
+        "id": f"p_{i:05d}",
+        "name": f"Bot {i}",
+        "avatarVersion": 0,
+        "x": rng.randrange(0, 960),
+        "y": rng.randrange(0, 576),
+        "facing": "down",
+        "mode": "agent",
+        "intent": "Auto-grinding… (tiny agent)",
+        "interrupt": "mentions",
+        "hp": 30,
+        "maxHp": 30,
+        "level": rng.randrange(1, 20),
+        "xp": rng.randrange(0, 100),
+        "xpToNext": 100,
+        "statPoints": 0,
+        "baseStats": {"str": 1, "agi": 1, "vit": 1, "int": 1, "dex": 1, "luk": 1},
+        "zenny": rng.randrange(0, 5000),
+        "stats": {"atk": 5, "def": 2, "aspd": 1.0, "crit": 0.05, "flee": 3, "hit": 5},
+        "meta": {"kills": rng.randrange(0, 500), "crafts": 0, "pickups": rng.randrange(0, 200)},
+        "partyId": f"party_{i // 4}" if i % 3 == 0 else None,
+        "job": "novice",
+        "equipment": {"weapon": "dagger_1", "armor": None, "accessory": None},
+        "inventory": [{"itemId": rng.choice(ITEMS), "qty": rng.randrange(1, 9)} for _ in range(rng.randrange(4, 24))],
+    }
+
+
+def _monster(i: int, rng: random.Random) -> dict:
+    return {
+        "id": f"m_slime_{i}",
+        "kind": "slime",
+        "name": rng.choice(["Poring", "Drops"]),
+        "x": rng.randrange(0, 960),
+        "y": rng.randrange(0, 576),
+        "hp": rng.randrange(0, 18),
+        "maxHp": 18,
+        "alive": rng.random() < 0.85,
+        "color": rng.choice(COLORS),
+    }
+
+
+def _drop(i: int, rng: random.Random) -> dict:
+    return {
+        "id": f"drop_{i}",
+        "itemId": rng.choice(ITEMS),
+        "name": "Poring Jelly",
+        "rarity": "common",
+        "x": rng.randrange(0, 960),
+        "y": rng.randrange(0, 576),
+        "qty": 1,
+        "expiresAt": 1_700_000_000_000 + i,
+    }
+
+
+def payloads(n_players: int, n_monsters: int, n_drops: int, ticks: int, moved: float, seed: int = 1) -> List[bytes]:
+    """One full snapshot, then `ticks - 1` deltas, as raw JSON replies."""
+    rng = random.Random(seed)
+    players = [_player(i, rng) for i in range(n_players)]
+    monsters = [_monster(i, rng) for i in range(n_monsters)]
+    drops = [_drop(i, rng) for i in range(n_drops)]
+    parties = [
+        {"id": f"party_{k}", "leaderId": players[k * 4]["id"], "members": [{"id": p["id"], "name": p["name"], "level": p["level"], "job": "novice", "hp": 30, "maxHp": 30, "mode": "agent"} for p in players[k * 4 : k * 4 + 4]]}
+        for k in range(n_players // 12)
+    ]
+    board = [{"id": f"b{i}", "author": "x", "text": "looking for party " * 4, "createdAt": "2024-01-01T00:00:00Z"} for i in range(20)]
+    chats = [{"id": f"c{i}", "kind": "chat", "from": {"id": "p_00001", "name": "Bot 1"}, "text": "hello " * 8, "createdAt": "2024-01-01T00:00:00Z"} for i in range(25)]
+    you = dict(players[0])
+    world = {"width": 30, "height": 18, "tileSize": 32}
+    hat = {"submittedAt": None, "answers": {"q1": "a", "q2": "b"}, "localResult": None, "botResult": None}
+
+    out = []
+    snap = {"version": 1, "delta": False, "world": world, "you": you, "players": players, "monsters": monsters, "drops": drops, "parties": parties, "board": board, "chats": chats, "hat": hat}
+    out.append(json.dumps({"ok": True, "snapshot": snap}).encode("utf-8"))
+    for t in range(1, ticks):
+        changed = {}
+        for kind, items in (("players", players), ("monsters", monsters)):
+            picked = rng.sample(items, max(1, int(len(items) * moved))) if items else []
+            for e in picked:
+                e["x"] = max(0, min(959, e["x"] + rng.randrange(-8, 9)))
+                e["y"] = max(0, min(575, e["y"] + rng.randrange(-8, 9)))
+            changed[kind] = picked
+        snap = {
+            "version": t + 1,
+            "delta": True,
+            "since": t,
+            "world": world,
+            "you": you,
+            "players": changed["players"],
+            "monsters": changed["monsters"],
+            "drops": [],
+            "parties": [],
+            "board": [],
+            "chats": [],
+            "hat": hat,
+            "removed": {"players": [], "monsters": [], "drops": [], "parties": [], "board": []},
+        }
+        out.append(json.dumps({"ok": True, "snapshot": snap}).encode("utf-8"))
+    return out
+
+
+def run(store_cls, raws: List[bytes]) -> Dict[str, float]:
+    gc.collect()
+    base_objects = len(gc.get_objects())
+    tracemalloc.start()
+    store = store_cls()
+    state = AgentState()
+    full_ms = 0.0
+    delta_ms = []
+    for i, raw in enumerate(raws):
+        t0 = time.perf_counter()
+        w = json.loads(raw)
+        snap = store.apply(w.get("snapshot") or {})
+        decide(snap, state, 1000.0 + i)
+        ms = (time.perf_counter() - t0) * 1000.0
+        if i == 0:
+            full_ms = ms
+        else:
+            delta_ms.append(ms)
+        del w, snap
+    gc.collect()
+    retained, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    objects = len(gc.get_objects()) - base_objects
+    del store, state
+    delta_ms.sort()
+    return {
+        "fullMs": round(full_ms, 3),
+        "deltaP50Ms": round(delta_ms[len(delta_ms) // 2], 3) if delta_ms else 0.0,
+        "deltaMeanMs": round(sum(delta_ms) / len(delta_ms), 3) if delta_ms else 0.0,
+        "retainedKB": round(retained / 1024.0, 1),
+        "gcObjects": objects,
+    }
+
+
+def main(argv: List[str]) -> int:
+    opts = {"--players": 50, "--monsters": 40, "--drops": 20, "--ticks": 200, "--bots": 100, "--moved": 0.3}
+    i = 1
+    while i < len(argv):
+        a = argv[i]
+        if a in opts and i + 1 < len(argv):
+            i += 1
+            opts[a] = type(opts[a])(float(argv[i]))
+        else:
+            print("Usage: python3 examples/python-agent/bench_snapshot.py [--players 50] [--monsters 40] [--drops 20] [--ticks 200] [--bots 100] [--moved 0.3]", file=sys.stderr)
+            return 2
+        i += 1
+
+    raws = payloads(opts["--players"], opts["--monsters"], opts["--drops"], max(2, opts["--ticks"]), opts["--moved"])
+    print(f"{opts['--players']} players, {opts['--monsters']} monsters, {opts['--drops']} drops; full snapshot {len(raws[0]) / 1024:.0f} KB, {len(raws) - 1} deltas")
+    # Timing runs without tracemalloc first (it slows allocation), memory from a second run.
+    rows = {}
+    for name, cls in (("dict", SnapshotStore), ("slots", SlotStore)):
+        timed = run_untraced(cls, raws)
+        mem = run(cls, raws)
+        rows[name] = dict(timed, retainedKB=mem["retainedKB"], gcObjects=mem["gcObjects"])
+
+    print(f"{'store':<7}{'full ms':>9}{'delta p50':>11}{'delta mean':>12}{'KB/bot':>9}{'objects/bot':>13}{'MB/' + str(opts['--bots']) + ' bots':>14}")
+    for name, r in rows.items():
+        fleet_mb = r["retainedKB"] * opts["--bots"] / 1024.0
+        print(f"{name:<7}{r['fullMs']:>9.2f}{r['deltaP50Ms']:>11.3f}{r['deltaMeanMs']:>12.3f}{r['retainedKB']:>9.1f}{r['gcObjects']:>13}{fleet_mb:>14.1f}")
+    return 0
+
+
+def run_untraced(store_cls, raws: List[bytes]) -> Dict[str, float]:
+    store = store_cls()
+    state = AgentState()
+    times = []
+    for i, raw in enumerate(raws):
+        t0 = time.perf_counter()
+        w = json.loads(raw)
+        snap = store.apply(w.get("snapshot") or {})
+        decide(snap, state, 1000.0 + i)
+        times.append((time.perf_counter() - t0) * 1000.0)
+    deltas = sorted(times[1:])
+    return {
+        "fullMs": round(times[0], 3),
+        "deltaP50Ms": round(deltas[len(deltas) // 2], 3),
+        "deltaMeanMs": round(sum(deltas) / len(deltas), 3),
+    }
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -1,10 +1,14 @@
 #!/usr/bin/env python3
 
-import json
+import os
 import sys
 import time
-import urllib.error
-import urllib.request
+
+from http_pool import HttpClient
+from instrument import Metrics
+from ratelimit import ActionScheduler, RateLimiter
+from snapshot import SlotStore, SnapshotStore
+from spatial import WorldIndex
 
 
 def parse_join_token(raw: str):
@@ -18,36 +22,33 @@ def parse_join_token(raw: str):
     return {"raw": raw, "baseUrl": base_url, "joinCode": join_code}
 
 
-def api_json(url: str, method="GET", headers=None, body=None, timeout=10):
-    h = {"Content-Type": "application/json"}
-    if headers:
-        h.update(headers)
-    data = None
-    if body is not None:
-        data = json.dumps(body).encode("utf-8")
-    req = urllib.request.Request(url, data=data, headers=h, method=method)
-    try:
-        with urllib.request.urlopen(req, timeout=timeout) as resp:
-            text = resp.read().decode("utf-8", errors="replace")
-            try:
-                payload = json.loads(text)
-            except Exception:
-                payload = {"raw": text}
-            return resp.status, payload
-    except urllib.error.HTTPError as e:
-        text = e.read().decode("utf-8", errors="replace")
-        try:
-            payload = json.loads(text)
-        except Exception:
-            payload = {"raw": text}
-        return e.code, payload
-    except Exception as e:
-        return 0, {"ok": False, "error": str(e)}
+# Shared keep-alive pool: every call below reuses sockets per base URL instead of
+# paying a fresh TCP/TLS handshake for each world/goal/cast/thought request.
+ENDPOINT_TIMEOUTS = {
+    "/api/bot/world": 6,
+    "/api/bot/goal": 4,
+    "/api/bot/cast": 4,
+    "/api/bot/thought": 4,
+}
+METRICS = Metrics()
+HTTP = HttpClient(timeouts=ENDPOINT_TIMEOUTS, observer=METRICS.observe_http)
+
 
+def api_json(url: str, method="GET", headers=None, body=None, timeout=None, client=None):
+    return (client or HTTP).request(method, url, headers=headers, body=body, timeout=timeout)
 
-def nearest_alive_monster(you, monsters):
+
+def nearest_alive_monster(you, monsters, index=None):
+    """
+    Closest alive monster as `{"m": monster, "d2": squared distance}`.
+    With a `spatial.WorldIndex` already synced to the snapshot, the lookup only
+    visits nearby grid cells instead of scanning every monster.
+    """
     if not you:
         return None
+    if index is not None:
+        hit = index.nearest("monsters", float(you.get("x") or 0), float(you.get("y") or 0))
+        return {"m": hit[0], "d2": hit[1]} if hit else None
     best = None
     best_d2 = 10**18
     for m in monsters or []:
@@ -64,11 +65,95 @@ def nearest_alive_monster(you, monsters):
     return {"m": best, "d2": best_d2}
 
 
+class AgentState:
+    """Per-bot policy timers (seconds, same clock as the `now` passed to `decide`)."""
+
+    __slots__ = ("last_cast_at", "last_goal_at", "last_thought_at", "hit_range", "index")
+
+    def __init__(self, hit_range: float = 140.0):
+        self.last_cast_at = 0.0
+        self.last_goal_at = 0.0
+        self.last_thought_at = 0.0
+        self.hit_range = float(hit_range)
+        # Updated incrementally from each snapshot; also usable by custom policies
+        # (nearest drop, party members, k-nearest, radius queries).
+        self.index = WorldIndex()
+
+
+THOUGHT_TEXT = "Auto-grinding… (tiny agent)"
+
+
+def decide(snap, state: AgentState, now: float):
+    """
+    One policy step over a world snapshot.
+    Returns a list of `(endpoint, body)` pairs to POST to `/api/bot/<endpoint>`.
+    """
+    actions = []
+    you = snap.get("you") or None
+    nearest = nearest_alive_monster(you, None, index=state.index.update(snap))
+
+    if nearest and you:
+        if nearest["d2"] <= state.hit_range * state.hit_range:
+            if (now - state.last_cast_at) > 0.85:
+                state.last_cast_at = now
+                actions.append(("cast", {"spell": "signature"}))
+        elif (now - state.last_goal_at) > 1.2:
+            state.last_goal_at = now
+            actions.append(("goal", {"x": float(nearest["m"].get("x") or 0), "y": float(nearest["m"].get("y") or 0)}))
+
+    if (now - state.last_thought_at) > 8.0:
+        state.last_thought_at = now
+        actions.append(("thought", {"text": THOUGHT_TEXT}))
+
+    return actions
+
+
+def link_and_enable_agent(base_url: str, join_token: str, client=None):
+    """
+    `/api/bot/link` + `/api/bot/mode` handshake.
+    Returns `(linked, headers, None)` on success or `(None, None, reason)`.
+    """
+    st, linked = api_json(f"{base_url}/api/bot/link", method="POST", body={"joinToken": join_token}, client=client)
+    if st < 200 or st >= 300 or not linked.get("ok") or not linked.get("botToken"):
+        return None, None, f"link failed {st} {linked}"
+
+    headers = {"Authorization": f"Bearer {linked['botToken']}"}
+    st, mode = api_json(f"{base_url}/api/bot/mode", method="POST", headers=headers, body={"mode": "agent"}, client=client)
+    if st < 200 or st >= 300 or not mode.get("ok"):
+        return None, None, f"mode failed {st} {mode}"
+    return linked, headers, None
+
+
+def write_status_pngs(snap, targets):
+    """Render map/minimap PNGs from the merged snapshot (locally, instead of the server's map.png endpoints)."""
+    from render import render_map, render_minimap
+
+    for path, kind in targets:
+        png = (render_map if kind == "map" else render_minimap)(snap)
+        tmp = path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(png)
+        os.replace(tmp, path)
+
+
 def main(argv):
     join_token = ""
     poll_ms = 1200
     run_for_sec = 0
     verbose = False
+    stream = False
+    events = False
+    events_cursor = ""
+    metrics_specs = []
+    metrics_every = 10.0
+    metrics_port = 0
+    profile = False
+    map_png = ""
+    minimap_png = ""
+    png_every = 10.0
+    record = ""
+    slots = False
+    shared_world = ""
 
     i = 1
     while i < len(argv):
@@ -83,86 +168,208 @@ def main(argv):
             run_for_sec = int(float(argv[i] or "0"))
         elif a == "--verbose":
             verbose = True
+        elif a == "--stream":
+            stream = True
+        elif a == "--events":
+            events = True
+        elif a == "--eventsCursor" and i + 1 < len(argv):
+            i += 1
+            events = True
+            events_cursor = argv[i]
+        elif a == "--metrics" and i + 1 < len(argv):
+            i += 1
+            metrics_specs.append(argv[i])
+        elif a == "--metricsEverySec" and i + 1 < len(argv):
+            i += 1
+            metrics_every = float(argv[i] or "0")
+        elif a == "--metricsPort" and i + 1 < len(argv):
+            i += 1
+            metrics_port = int(float(argv[i] or "0"))
+        elif a == "--profile":
+            profile = True
+        elif a == "--mapPng" and i + 1 < len(argv):
+            i += 1
+            map_png = argv[i]
+        elif a == "--minimapPng" and i + 1 < len(argv):
+            i += 1
+            minimap_png = argv[i]
+        elif a == "--pngEverySec" and i + 1 < len(argv):
+            i += 1
+            png_every = float(argv[i] or "0")
+        elif a == "--slots":
+            slots = True
+        elif a == "--sharedWorld" and i + 1 < len(argv):
+            i += 1
+            shared_world = argv[i]
+        elif a == "--record" and i + 1 < len(argv):
+            i += 1
+            record = argv[i]
         i += 1
 
     parsed = parse_join_token(join_token)
     if not parsed:
-        print('Usage: python3 examples/python-agent/bot.py "CT1|<baseUrl>|<joinCode>" [--runForSec 60] [--pollMs 1200] [--verbose]', file=sys.stderr)
+        print('Usage: python3 examples/python-agent/bot.py "CT1|<baseUrl>|<joinCode>" [--runForSec 60] [--pollMs 1200] [--stream] [--events] [--eventsCursor path] [--metrics log|json:path|prom:path] [--metricsEverySec 10] [--metricsPort 0] [--profile] [--mapPng path] [--minimapPng path] [--pngEverySec 10] [--record path] [--slots] [--sharedWorld http://127.0.0.1:8788] [--verbose]', file=sys.stderr)
+        return 2
+    if stream and (slots or shared_world):
+        # Both change how /api/bot/world replies are fetched and stored; --stream reads the WS feed instead.
+        print("--slots and --sharedWorld only apply to the polling loop; they cannot be combined with --stream.", file=sys.stderr)
         return 2
 
     base_url = parsed["baseUrl"]
     poll_ms = max(500, int(poll_ms or 1200))
     run_for_sec = max(0, int(run_for_sec or 0))
 
-    st, linked = api_json(f"{base_url}/api/bot/link", method="POST", body={"joinToken": parsed["raw"]})
-    if st < 200 or st >= 300 or not linked.get("ok") or not linked.get("botToken"):
-        print("link failed", st, linked, file=sys.stderr)
+    linked, headers, err = link_and_enable_agent(base_url, parsed["raw"])
+    if err:
+        print(err, file=sys.stderr)
         return 2
 
-    bot_token = str(linked["botToken"])
-    headers = {"Authorization": f"Bearer {bot_token}"}
+    print(f"Connected. baseUrl={base_url} playerId={linked.get('playerId','')}")
+    state = AgentState()
+
+    from instrument import LogExporter, ProfileToggle, Reporter, StackSampler, exporter_for, install_profiling_signals, serve_prometheus, stop_profiling
 
-    st, mode = api_json(f"{base_url}/api/bot/mode", method="POST", headers=headers, body={"mode": "agent"})
-    if st < 200 or st >= 300 or not mode.get("ok"):
-        print("mode failed", st, mode, file=sys.stderr)
+    try:
+        reporter = Reporter(METRICS, [exporter_for(s) for s in metrics_specs], every_sec=metrics_every)
+    except ValueError as e:
+        print(e, file=sys.stderr)
         return 2
+    if metrics_port:
+        serve_prometheus(METRICS, metrics_port)
+    profiler = sampler = None
+    if profile:
+        profiler, sampler = ProfileToggle(), StackSampler()
+        if install_profiling_signals(profiler, sampler):
+            print(f"Profiling: kill -USR1 {os.getpid()} toggles cProfile, kill -USR2 {os.getpid()} the stack sampler.")
 
-    print(f"Connected. baseUrl={base_url} playerId={linked.get('playerId','')}")
-    print("Loop: world → goal/cast. Ctrl+C to stop.")
+    policy = decide
+    recorder = None
+    if record:
+        from recorder import Recorder
+
+        recorder = Recorder(record)
+        policy = recorder.wrap(decide)
+        print(f"Recording to {record}.dat (+ .idx, .str), {recorder.ticks} ticks so far.")
+
+    limiter = RateLimiter()
+    sched = ActionScheduler(limiter)
+    feed = None
+    if events:
+        from events import CursorFile, EventDispatcher, EventFeed
 
+        store_cursor = CursorFile(events_cursor, linked.get("playerId")) if events_cursor else None
+        feed = EventFeed(base_url, headers, api_json, limiter=limiter, cursor_store=store_cursor)
+        dispatcher = EventDispatcher()
+        for kind in ("kill", "loot", "level", "mention"):
+            dispatcher.on(kind, lambda e: print(f"[{e.kind}] {e.text}"))
+
+    pngs = [(path, kind) for path, kind in ((map_png, "map"), (minimap_png, "minimap")) if path]
+    next_png = 0.0
+
+    if stream:
+        from stream import run_stream
+
+        def after_decide(snap):
+            nonlocal next_png
+            if pngs and time.time() >= next_png:
+                next_png = time.time() + max(1.0, png_every)
+                with METRICS.phase("render"):
+                    write_status_pngs(snap, pngs)
+            if feed:
+                for evt in feed.poll():
+                    dispatcher.dispatch(evt)
+                feed.commit()
+            reporter.tick()
+
+        print("Loop: ws state → goal/cast. Ctrl+C to stop.")
+        try:
+            out = run_stream(base_url, headers, linked, policy, state, api_json, poll_ms=poll_ms, run_for_sec=run_for_sec, verbose=verbose, scheduler=sched, after_decide=after_decide)
+            if verbose:
+                print("stream", out, file=sys.stderr)
+        except KeyboardInterrupt:
+            pass
+        stop_profiling(profiler, sampler)
+        reporter.tick(force=True)
+        if recorder:
+            recorder.close()
+        HTTP.close()
+        print("Done.")
+        return 0
+
+    print("Loop: world → goal/cast. Ctrl+C to stop.")
     started = time.time()
-    last_cast_at = 0.0
-    last_goal_at = 0.0
-    last_thought_at = 0.0
-    hit_range = 140.0
+    store = SlotStore() if slots else SnapshotStore()
+    shared = None
+    if shared_world:
+        from world_cache import DaemonWorld, with_you
+
+        shared = DaemonWorld(shared_world, lambda url, headers=None: api_json(url, headers=headers))
+        print(f"World snapshots via {shared_world} (+ /api/bot/me for you).")
+
+    def send(endpoint, body):
+        with METRICS.phase("act"):
+            return api_json(f"{base_url}/api/bot/{endpoint}", method="POST", headers=headers, body=body)
 
     try:
         while True:
             if run_for_sec > 0 and (time.time() - started) > run_for_sec:
                 break
 
-            st, w = api_json(f"{base_url}/api/bot/world", headers=headers)
+            limiter.take("world")
+            if shared:
+                st, w = shared.world(base_url, headers)
+                if 200 <= st < 300 and w.get("ok"):
+                    st, w = with_you(st, w, *api_json(f"{base_url}/api/bot/me", headers=headers))
+            else:
+                st, w = api_json(store.world_url(base_url), headers=headers)
+            if st == 429:
+                limiter.note_retry("world", w.get("retryInMs"))
+                continue
             if st < 200 or st >= 300 or not w.get("ok"):
                 if verbose:
                     print("world error", st, w, file=sys.stderr)
                 time.sleep(poll_ms / 1000.0)
                 continue
 
-            snap = w.get("snapshot") or {}
-            you = snap.get("you") or None
-            nearest = nearest_alive_monster(you, snap.get("monsters") or [])
-            now = time.time()
-
-            if nearest and you:
-                if nearest["d2"] <= hit_range * hit_range:
-                    if (now - last_cast_at) > 0.85:
-                        last_cast_at = now
-                        st2, r = api_json(f"{base_url}/api/bot/cast", method="POST", headers=headers, body={"spell": "signature"})
-                        if verbose:
-                            print("cast", st2, ("ok" if r.get("ok") else r), file=sys.stderr)
-                elif (now - last_goal_at) > 1.2:
-                    last_goal_at = now
-                    st2, r = api_json(
-                        f"{base_url}/api/bot/goal",
-                        method="POST",
-                        headers=headers,
-                        body={"x": float(nearest["m"].get("x") or 0), "y": float(nearest["m"].get("y") or 0)},
-                    )
-                    if verbose:
-                        print("goal", st2, ("ok" if r.get("ok") else r), file=sys.stderr)
-
-            if (now - last_thought_at) > 8.0:
-                last_thought_at = now
-                api_json(f"{base_url}/api/bot/thought", method="POST", headers=headers, body={"text": "Auto-grinding… (tiny agent)"})
-
-            time.sleep(poll_ms / 1000.0)
+            METRICS.loops += 1
+            with METRICS.phase("merge"):
+                snap = store.apply(w.get("snapshot") or {})
+            with METRICS.phase("decide"):
+                actions = policy(snap, state, time.time())
+            for endpoint, body in actions:
+                sched.submit(endpoint, body)
+            if pngs and time.time() >= next_png:
+                next_png = time.time() + max(1.0, png_every)
+                with METRICS.phase("render"):
+                    write_status_pngs(snap, pngs)
+
+            # Send now, then keep retrying anything the server pushed back until the next poll.
+            for endpoint, st2, r in sched.run_until(limiter.clock() + poll_ms, send):
+                if verbose and endpoint != "thought":
+                    print(endpoint, st2, ("ok" if r.get("ok") else r), file=sys.stderr)
+
+            if feed:
+                for evt in feed.poll():
+                    dispatcher.dispatch(evt)
+                feed.commit()
+            reporter.tick()
     except KeyboardInterrupt:
         pass
 
+    stop_profiling(profiler, sampler)
+    reporter.tick(force=True)
+
+    if verbose:
+        print("http", HTTP.stats(), "snapshots", store.counters, "actions", sched.counters, file=sys.stderr)
+        if feed:
+            print("events", feed.counters, dispatcher.counters, file=sys.stderr)
+        LogExporter().export(METRICS)
+    if recorder:
+        recorder.close()
+    HTTP.close()
     print("Done.")
     return 0
 
 
 if __name__ == "__main__":
     raise SystemExit(main(sys.argv))
-
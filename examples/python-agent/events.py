@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Cursor-driven consumer for `GET /api/bot/events?cursor=&limit=`.
+
+The server keeps the last 240 events per character (kill, loot, level,
+thought, ...) with increasing ids and answers each page with `nextCursor`.
+`EventFeed` pages forward from a cursor, adapts its poll interval to the
+traffic (full page → poll again as soon as the rate limit allows, empty page
+→ back off up to `max_interval_ms`), and persists the cursor through an
+optional `CursorFile` so restarts resume where they stopped.
+
+Two ways to consume it:
+
+    feed = EventFeed(base_url, headers, api_json, cursor_store=CursorFile(path, player_id))
+    on = EventDispatcher()
+    on.on("kill", lambda e: print("killed", e.data["monster"]["name"]))
+
+    for evt in iter_events(feed):      # blocking generator; pulls pages only as fast as you consume
+        on.dispatch(evt)
+
+    for evt in feed.poll():            # non-blocking, from an existing loop
+        on.dispatch(evt)
+    feed.commit()
+
+The cursor on disk only moves once a page has been handed out completely
+(at-least-once delivery across crashes).
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional
+
+from ratelimit import RateLimiter, monotonic_ms
+
+
+KIND_KILL = "kill"
+KIND_LOOT = "loot"
+KIND_LEVEL = "level"
+KIND_THOUGHT = "thought"
+KIND_MENTION = "mention"
+KIND_NEARBY = "nearby"
+
+PAGE_MAX = 60  # server clamps `limit` to 1..60
+
+
+class BotEvent:
+    __slots__ = ("id", "at", "kind", "text", "important", "data")
+
+    def __init__(self, id: int, at: int, kind: str, text: str, important: bool, data: dict):
+        self.id = id
+        self.at = at
+        self.kind = kind
+        self.text = text
+        self.important = important
+        self.data = data
+
+    @classmethod
+    def from_json(cls, e: dict) -> "BotEvent":
+        return cls(
+            int(e.get("id") or 0),
+            int(e.get("at") or 0),
+            str(e.get("kind") or "info"),
+            str(e.get("text") or ""),
+            bool(e.get("important")),
+            e.get("data") if isinstance(e.get("data"), dict) else {},
+        )
+
+    def __repr__(self) -> str:
+        return f"BotEvent({self.id}, {self.kind!r}, {self.text!r})"
+
+
+class CursorFile:
+    """Cursor persisted as a tiny JSON file, scoped to one player id."""
+
+    def __init__(self, path: str, player_id: str = ""):
+        self.path = path
+        self.player_id = str(player_id or "")
+
+    def load(self) -> int:
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        if not isinstance(saved, dict):
+            return 0
+        if self.player_id and saved.get("playerId") not in (None, self.player_id):
+            return 0
+        try:
+            return max(0, int(saved.get("cursor") or 0))
+        except (TypeError, ValueError):
+            return 0
+
+    def save(self, cursor: int) -> None:
+        tmp = f"{self.path}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"playerId": self.player_id or None, "cursor": int(cursor), "savedAt": int(time.time() * 1000)}, f)
+        os.replace(tmp, self.path)
+
+
+class EventFeed:
+    def __init__(
+        self,
+        base_url: str,
+        headers: dict,
+        api_json: Callable,
+        limiter: Optional[RateLimiter] = None,
+        cursor_store: Optional[CursorFile] = None,
+        limit: int = PAGE_MAX,
+        min_interval_ms: float = 700.0,
+        max_interval_ms: float = 15000.0,
+        clock: Callable[[], float] = monotonic_ms,
+    ):
+        self.base_url = base_url
+        self.headers = headers
+        self.api_json = api_json
+        self.limiter = limiter or RateLimiter(clock=clock)
+        self.cursor_store = cursor_store
+        self.limit = max(1, min(PAGE_MAX, int(limit)))
+        self.min_interval_ms = float(min_interval_ms)
+        self.max_interval_ms = max(self.min_interval_ms, float(max_interval_ms))
+        self.clock = clock
+        self.cursor = cursor_store.load() if cursor_store else 0
+        self.committed = self.cursor
+        self.interval_ms = min(self.max_interval_ms, 2000.0)
+        self._next_at = 0.0
+        self.counters = {"polls": 0, "events": 0, "empty": 0, "full": 0, "throttled": 0, "errors": 0, "missed": 0}
+
+    def due_in_ms(self) -> float:
+        return max(0.0, self._next_at - self.clock(), self.limiter.wait_ms("events"))
+
+    def _schedule(self, n: int) -> None:
+        if n >= self.limit:
+            # Backlog: drain as fast as the server's events bucket allows.
+            self.interval_ms = self.min_interval_ms
+            self.counters["full"] += 1
+        elif n > 0:
+            self.interval_ms = max(self.min_interval_ms, self.interval_ms / 2)
+        else:
+            self.interval_ms = min(self.max_interval_ms, self.interval_ms * 1.6)
+            self.counters["empty"] += 1
+        self._next_at = self.clock() + self.interval_ms
+
+    def poll(self) -> List[BotEvent]:
+        """Fetch one page if due (non-blocking). Advances the in-memory cursor only."""
+        if self.due_in_ms() > 0 or not self.limiter.try_take("events"):
+            return []
+        self.counters["polls"] += 1
+        url = f"{self.base_url}/api/bot/events?cursor={self.cursor}&limit={self.limit}"
+        st, r = self.api_json(url, headers=self.headers)
+        if st == 429:
+            self.counters["throttled"] += 1
+            self.limiter.note_retry("events", r.get("retryInMs"))
+            return []
+        if st < 200 or st >= 300 or not r.get("ok"):
+            self.counters["errors"] += 1
+            self.interval_ms = min(self.max_interval_ms, self.interval_ms * 2)
+            self._next_at = self.clock() + self.interval_ms
+            return []
+
+        events = [BotEvent.from_json(e) for e in r.get("events") or [] if isinstance(e, dict)]
+        events = [e for e in events if e.id > self.cursor]
+        if events and self.cursor and events[0].id > self.cursor + 1:
+            # The server's window rolled past our cursor; those events are gone.
+            self.counters["missed"] += events[0].id - self.cursor - 1
+        next_cursor = int(r.get("nextCursor") or 0)
+        self.cursor = max(self.cursor, next_cursor, events[-1].id if events else 0)
+        self.counters["events"] += len(events)
+        self._schedule(len(events))
+        return events
+
+    def commit(self) -> None:
+        """Persist the cursor (call after the last polled page was handled)."""
+        if self.cursor == self.committed:
+            return
+        if self.cursor_store:
+            try:
+                self.cursor_store.save(self.cursor)
+            except OSError as e:
+                print("events: cursor save failed", e, file=sys.stderr)
+                return
+        self.committed = self.cursor
+
+
+def iter_events(
+    feed: EventFeed,
+    stop: Optional[Callable[[], bool]] = None,
+    sleep: Callable[[float], None] = time.sleep,
+) -> Iterator[BotEvent]:
+    """
+    Blocking generator over the feed. Pages are fetched only when the consumer
+    asks for more, so a slow handler naturally slows polling down.
+    """
+    while not (stop and stop()):
+        wait = feed.due_in_ms()
+        if wait > 0:
+            sleep(wait / 1000.0)
+            continue
+        for evt in feed.poll():
+            yield evt
+        feed.commit()
+
+
+class EventDispatcher:
+    """Routes events to handlers by `kind`; `"*"` handlers see every event."""
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[BotEvent], None]]] = {}
+        self.counters = {"dispatched": 0, "unhandled": 0, "handlerErrors": 0}
+
+    def on(self, kind: str, fn: Optional[Callable[[BotEvent], None]] = None):
+        """Register `fn` for `kind`; without `fn`, works as a decorator."""
+        if fn is None:
+            def deco(f):
+                self._handlers.setdefault(kind, []).append(f)
+                return f
+
+            return deco
+        self._handlers.setdefault(kind, []).append(fn)
+        return fn
+
+    def dispatch(self, evt: BotEvent) -> None:
+        handlers = self._handlers.get(evt.kind, []) + self._handlers.get("*", [])
+        if not handlers:
+            self.counters["unhandled"] += 1
+            return
+        self.counters["dispatched"] += 1
+        for fn in handlers:
+            try:
+                fn(evt)
+            except Exception as e:  # one bad handler must not stop the feed
+                self.counters["handlerErrors"] += 1
+                print(f"events: {evt.kind} handler failed:", e, file=sys.stderr)
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Run many linked Clawtown characters from one Python process (asyncio).
+
+Each line of the tokens file is a join token (`CT1|<baseUrl>|<joinCode>`);
+blank lines and `#` comments are ignored. Every bot does the link + mode
+handshake, then runs the same world → goal/cast policy as bot.py as its own
+task. All bots share one `AsyncHttpClient` (keep-alive pool per base URL) and
+a global cap on in-flight requests.
+
+Usage:
+  python3 examples/python-agent/fleet.py tokens.txt [--concurrency 64] [--jitterMs 3000]
+      [--pollMs 1200] [--runForSec 0] [--slots] [--sharedWorld] [--verbose]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import sys
+import time
+from typing import Dict, List, Optional
+
+from bot import ENDPOINT_TIMEOUTS, AgentState, decide, parse_join_token
+from http_pool import AsyncHttpClient
+from ratelimit import ActionScheduler
+from snapshot import SlotStore, SnapshotStore
+from world_cache import AsyncWorldCache, with_you
+
+
+def read_tokens(path: str) -> List[dict]:
+    out = []
+    seen = set()
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            parsed = parse_join_token(line)
+            if not parsed:
+                print("skipping invalid token:", line[:40], file=sys.stderr)
+                continue
+            if parsed["raw"] in seen:
+                continue
+            seen.add(parsed["raw"])
+            out.append(parsed)
+    return out
+
+
+class Fleet:
+    def __init__(
+        self,
+        tokens: List[dict],
+        concurrency: int = 64,
+        jitter_ms: int = 3000,
+        poll_ms: int = 1200,
+        run_for_sec: int = 0,
+        verbose: bool = False,
+        slots: bool = False,
+        shared_world: bool = False,
+        client: Optional[AsyncHttpClient] = None,
+    ):
+        self.tokens = tokens
+        self.concurrency = max(1, int(concurrency))
+        self.jitter_ms = max(0, int(jitter_ms))
+        self.poll_ms = max(500, int(poll_ms))
+        self.run_for_sec = max(0, int(run_for_sec))
+        self.verbose = verbose
+        self.slots = slots
+        # One /api/bot/world fetch per server per tick for the whole fleet; bots add their own /api/bot/me.
+        self.world_cache = AsyncWorldCache(lambda url, headers=None: self.call("GET", url, headers=headers)) if shared_world else None
+        self.client = client or AsyncHttpClient(timeouts=ENDPOINT_TIMEOUTS, max_idle_per_origin=self.concurrency)
+        self._sem: Optional[asyncio.Semaphore] = None
+        self.stats: Dict[str, int] = {"linked": 0, "linkFailed": 0, "ticks": 0, "actions": 0, "throttled": 0, "errors": 0}
+
+    async def call(self, method: str, url: str, headers=None, body=None):
+        assert self._sem is not None
+        async with self._sem:
+            return await self.client.request(method, url, headers=headers, body=body)
+
+    async def _handshake(self, base_url: str, raw: str):
+        st, linked = await self.call("POST", f"{base_url}/api/bot/link", body={"joinToken": raw})
+        if st < 200 or st >= 300 or not linked.get("ok") or not linked.get("botToken"):
+            return None, f"link failed {st} {linked}"
+        headers = {"Authorization": f"Bearer {linked['botToken']}"}
+        st, mode = await self.call("POST", f"{base_url}/api/bot/mode", headers=headers, body={"mode": "agent"})
+        if st < 200 or st >= 300 or not mode.get("ok"):
+            return None, f"mode failed {st} {mode}"
+        return headers, None
+
+    async def run_bot(self, parsed: dict, deadline: float) -> None:
+        loop = asyncio.get_running_loop()
+        if self.jitter_ms:
+            await asyncio.sleep(random.uniform(0, self.jitter_ms / 1000.0))
+
+        base_url = parsed["baseUrl"]
+        headers, err = await self._handshake(base_url, parsed["raw"])
+        if err:
+            self.stats["linkFailed"] += 1
+            print(err, file=sys.stderr)
+            return
+        self.stats["linked"] += 1
+
+        state = AgentState()
+        store = SlotStore() if self.slots else SnapshotStore()
+        sched = ActionScheduler()
+        limiter = sched.limiter
+        interval = self.poll_ms / 1000.0
+        while not deadline or loop.time() < deadline:
+            t0 = loop.time()
+            wait_ms = limiter.wait_ms("world")
+            if wait_ms > 0:
+                await asyncio.sleep(wait_ms / 1000.0)
+            limiter.try_take("world")
+            if self.world_cache:
+                st, w = await self.world_cache.world(base_url, headers)
+                if 200 <= st < 300 and w.get("ok"):
+                    st, w = with_you(st, w, *await self.call("GET", f"{base_url}/api/bot/me", headers=headers))
+            else:
+                st, w = await self.call("GET", store.world_url(base_url), headers=headers)
+            if st == 429:
+                limiter.note_retry("world", w.get("retryInMs"))
+                self.stats["throttled"] += 1
+            elif 200 <= st < 300 and w.get("ok"):
+                self.stats["ticks"] += 1
+                snap = store.apply(w.get("snapshot") or {})
+                for endpoint, body in decide(snap, state, time.time()):
+                    sched.submit(endpoint, body)
+                for endpoint, body in sched.due():
+                    st2, r = await self.call("POST", f"{base_url}/api/bot/{endpoint}", headers=headers, body=body)
+                    sched.report(endpoint, body, st2, r)
+                    self.stats["actions"] += 1
+                    if self.verbose and endpoint != "thought":
+                        print(endpoint, st2, ("ok" if r.get("ok") else r), file=sys.stderr)
+            else:
+                self.stats["errors"] += 1
+                if self.verbose:
+                    print("world error", st, w, file=sys.stderr)
+            await asyncio.sleep(max(0.0, interval - (loop.time() - t0)))
+
+    async def run(self) -> Dict[str, int]:
+        self._sem = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.run_for_sec if self.run_for_sec else 0.0
+        try:
+            await asyncio.gather(*(self.run_bot(p, deadline) for p in self.tokens))
+        finally:
+            await self.client.close()
+        return self.stats
+
+
+def main(argv):
+    tokens_path = ""
+    concurrency = 64
+    jitter_ms = 3000
+    poll_ms = 1200
+    run_for_sec = 0
+    verbose = False
+    slots = False
+    shared_world = False
+
+    i = 1
+    while i < len(argv):
+        a = argv[i]
+        if a == "--concurrency" and i + 1 < len(argv):
+            i += 1
+            concurrency = int(float(argv[i] or "0"))
+        elif a == "--jitterMs" and i + 1 < len(argv):
+            i += 1
+            jitter_ms = int(float(argv[i] or "0"))
+        elif a == "--pollMs" and i + 1 < len(argv):
+            i += 1
+            poll_ms = int(float(argv[i] or "0"))
+        elif a == "--runForSec" and i + 1 < len(argv):
+            i += 1
+            run_for_sec = int(float(argv[i] or "0"))
+        elif a == "--verbose":
+            verbose = True
+        elif a == "--slots":
+            slots = True
+        elif a == "--sharedWorld":
+            shared_world = True
+        elif not tokens_path and not a.startswith("--"):
+            tokens_path = a
+        i += 1
+
+    if not tokens_path:
+        print("Usage: python3 examples/python-agent/fleet.py tokens.txt [--concurrency 64] [--jitterMs 3000] [--pollMs 1200] [--runForSec 0] [--slots] [--sharedWorld] [--verbose]", file=sys.stderr)
+        return 2
+
+    tokens = read_tokens(tokens_path)
+    if not tokens:
+        print("no valid join tokens in", tokens_path, file=sys.stderr)
+        return 2
+
+    fleet = Fleet(tokens, concurrency=concurrency, jitter_ms=jitter_ms, poll_ms=poll_ms, run_for_sec=run_for_sec, verbose=verbose, slots=slots, shared_world=shared_world)
+    print(f"Fleet: {len(tokens)} bots, concurrency={fleet.concurrency}. Ctrl+C to stop.")
+    try:
+        stats = asyncio.run(fleet.run())
+    except KeyboardInterrupt:
+        stats = fleet.stats
+    print("Done.", stats, fleet.client.stats(), *([fleet.world_cache.counters] if fleet.world_cache else []))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
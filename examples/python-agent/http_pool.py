@@ -0,0 +1,392 @@
+#!/usr/bin/env python3
+"""
+Keep-alive HTTP client for Clawtown bots (stdlib only).
+
+`api_json` in bot.py used to open a fresh TCP (and TLS) connection per call.
+`HttpClient` keeps idle connections per origin (scheme, host, port) and reuses
+them across calls; a stale pooled connection is transparently replaced once.
+A request that was already written when the socket failed is only resent for
+idempotent methods: a POST (cast, chat, goal) may have been handled before the
+reset, so it is reported as a transport error instead of being sent twice.
+
+    client = HttpClient(timeouts={"/api/bot/world": 5})
+    st, payload = client.request("GET", f"{base_url}/api/bot/world", headers=h)
+    print(client.stats())
+
+`AsyncHttpClient` is the asyncio twin (same `request` contract, awaitable) used
+by fleet.py to drive many bots over one shared pool from a single event loop.
+
+Both accept an `observer(method, path, status, net_ms, decode_ms)` callback,
+called once per request, so instrumentation can tell time on the wire from
+time spent decoding JSON (see instrument.py).
+"""
+
+from __future__ import annotations
+
+import asyncio
+import http.client
+import json
+import ssl
+import threading
+import time
+import urllib.parse
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# Errors that mean "the pooled socket was closed under us" (server keep-alive
+# timeout, load balancer idle reset, ...). Retrying on a fresh socket is safe.
+_STALE_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.BadStatusLine,
+    BrokenPipeError,
+    ConnectionResetError,
+    ConnectionAbortedError,
+)
+# Only these are resent after a stale-socket error; see the module docstring.
+_IDEMPOTENT = frozenset(("GET", "HEAD", "OPTIONS", "PUT", "DELETE"))
+
+
+def _decode_payload(raw: bytes):
+    text = raw.decode("utf-8", errors="replace")
+    try:
+        return json.loads(text)
+    except Exception:
+        return {"raw": text}
+
+
+Observer = Callable[[str, str, int, float, float], None]
+
+
+def _finish(observer: Optional[Observer], method: str, path: str, t0: float, status: int, raw: Optional[bytes]):
+    """Decode the body and report timings; `raw=None` means a transport error."""
+    t1 = time.perf_counter()
+    payload = _decode_payload(raw) if raw is not None else None
+    if observer is not None:
+        observer(method, path, status, (t1 - t0) * 1000.0, (time.perf_counter() - t1) * 1000.0)
+    return payload
+
+
+class ConnectionPool:
+    """
+    Idle keep-alive connections keyed by origin. Thread-safe.
+    """
+
+    def __init__(self, max_idle_per_origin: int = 4):
+        self.max_idle_per_origin = max(1, int(max_idle_per_origin))
+        self._idle: Dict[Tuple[str, str, int], List[http.client.HTTPConnection]] = {}
+        self._lock = threading.Lock()
+        self.counters = {"new": 0, "reused": 0, "reconnects": 0, "discarded": 0, "errors": 0}
+
+    def _count(self, key: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def acquire(self, origin: Tuple[str, str, int], timeout: float) -> Tuple[http.client.HTTPConnection, bool]:
+        with self._lock:
+            idle = self._idle.get(origin)
+            conn = idle.pop() if idle else None
+            if conn is not None:
+                self.counters["reused"] += 1
+        if conn is not None:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+            return conn, True
+
+        scheme, host, port = origin
+        cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        conn = cls(host, port, timeout=timeout)
+        self._count("new")
+        return conn, False
+
+    def release(self, origin: Tuple[str, str, int], conn: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(origin, [])
+            if len(idle) < self.max_idle_per_origin:
+                idle.append(conn)
+                return
+            self.counters["discarded"] += 1
+        conn.close()
+
+    def close(self) -> None:
+        with self._lock:
+            conns = [c for lst in self._idle.values() for c in lst]
+            self._idle.clear()
+        for c in conns:
+            try:
+                c.close()
+            except Exception:
+                pass
+
+    def idle_count(self) -> int:
+        with self._lock:
+            return sum(len(v) for v in self._idle.values())
+
+
+class HttpClient:
+    """
+    JSON-over-HTTP client with pooled keep-alive connections.
+
+    `timeouts` maps a URL path (e.g. "/api/bot/world") to a timeout in seconds;
+    anything else uses `default_timeout`. An explicit `timeout=` on a call wins.
+    """
+
+    def __init__(
+        self,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = 10.0,
+        pool: Optional[ConnectionPool] = None,
+        observer: Optional[Observer] = None,
+    ):
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = float(default_timeout)
+        self.pool = pool or ConnectionPool()
+        self.observer = observer
+
+    def timeout_for(self, path: str) -> float:
+        return float(self.timeouts.get(path, self.default_timeout))
+
+    def request(self, method: str, url: str, headers=None, body=None, timeout=None):
+        """
+        Returns `(status, payload)` exactly like `api_json`:
+        status 0 + {"ok": False, "error": ...} on transport errors.
+        """
+        u = urllib.parse.urlsplit(url)
+        scheme = (u.scheme or "http").lower()
+        port = u.port or (443 if scheme == "https" else 80)
+        origin = (scheme, u.hostname or "", port)
+        target = u.path or "/"
+        if u.query:
+            target += "?" + u.query
+
+        h = {"Content-Type": "application/json", "Connection": "keep-alive"}
+        if headers:
+            h.update(headers)
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+        t = float(timeout) if timeout is not None else self.timeout_for(u.path or "/")
+        t0 = time.perf_counter()
+
+        for attempt in range(2):
+            conn, reused = self.pool.acquire(origin, t)
+            sent = False
+            try:
+                conn.request(method, target, body=data, headers=h)
+                sent = True
+                resp = conn.getresponse()
+                raw = resp.read()
+            except _STALE_ERRORS as e:
+                conn.close()
+                # Only a reused socket can be stale; a fresh one failing is a real error.
+                # A request that was fully written may have been handled, so only
+                # idempotent ones are resent after that point.
+                if reused and attempt == 0 and (not sent or method.upper() in _IDEMPOTENT):
+                    self.pool._count("reconnects")
+                    continue
+                self.pool._count("errors")
+                _finish(self.observer, method, u.path, t0, 0, None)
+                return 0, {"ok": False, "error": str(e)}
+            except Exception as e:
+                conn.close()
+                self.pool._count("errors")
+                _finish(self.observer, method, u.path, t0, 0, None)
+                return 0, {"ok": False, "error": str(e)}
+
+            if resp.will_close:
+                conn.close()
+            else:
+                self.pool.release(origin, conn)
+            return resp.status, _finish(self.observer, method, u.path, t0, resp.status, raw)
+
+        return 0, {"ok": False, "error": "connection failed"}
+
+    def stats(self) -> Dict[str, int]:
+        out = dict(self.pool.counters)
+        out["idle"] = self.pool.idle_count()
+        return out
+
+    def close(self) -> None:
+        self.pool.close()
+
+
+class _AsyncConn:
+    __slots__ = ("reader", "writer")
+
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self.reader = reader
+        self.writer = writer
+
+    def close(self) -> None:
+        try:
+            self.writer.close()
+        except Exception:
+            pass
+
+
+class AsyncHttpClient:
+    """
+    Minimal HTTP/1.1 keep-alive client on asyncio streams.
+
+    Same `(status, payload)` contract as `HttpClient.request`. Connections are
+    pooled per origin and shared by every coroutine using this client, so a
+    fleet of bots against one server reuses a handful of sockets.
+    """
+
+    def __init__(
+        self,
+        timeouts: Optional[Dict[str, float]] = None,
+        default_timeout: float = 10.0,
+        max_idle_per_origin: int = 32,
+        observer: Optional[Observer] = None,
+    ):
+        self.timeouts = dict(timeouts or {})
+        self.default_timeout = float(default_timeout)
+        self.max_idle_per_origin = max(1, int(max_idle_per_origin))
+        self.observer = observer
+        self._idle: Dict[Tuple[str, str, int], List[_AsyncConn]] = {}
+        self._ssl: Optional[ssl.SSLContext] = None
+        self.counters = {"new": 0, "reused": 0, "reconnects": 0, "discarded": 0, "errors": 0}
+
+    def timeout_for(self, path: str) -> float:
+        return float(self.timeouts.get(path, self.default_timeout))
+
+    async def _acquire(self, origin: Tuple[str, str, int]) -> Tuple[_AsyncConn, bool]:
+        idle = self._idle.get(origin)
+        while idle:
+            conn = idle.pop()
+            if conn.reader.at_eof():
+                conn.close()
+                continue
+            self.counters["reused"] += 1
+            return conn, True
+        scheme, host, port = origin
+        ctx = None
+        if scheme == "https":
+            if self._ssl is None:
+                self._ssl = ssl.create_default_context()
+            ctx = self._ssl
+        reader, writer = await asyncio.open_connection(host, port, ssl=ctx)
+        self.counters["new"] += 1
+        return _AsyncConn(reader, writer), False
+
+    def _release(self, origin: Tuple[str, str, int], conn: _AsyncConn) -> None:
+        idle = self._idle.setdefault(origin, [])
+        if len(idle) < self.max_idle_per_origin:
+            idle.append(conn)
+            return
+        self.counters["discarded"] += 1
+        conn.close()
+
+    @staticmethod
+    async def _roundtrip(conn: _AsyncConn, head: bytes, data: Optional[bytes]) -> Tuple[int, bool, bytes]:
+        conn.writer.write(head + (data or b""))
+        await conn.writer.drain()
+
+        status_line = await conn.reader.readline()
+        if not status_line:
+            raise ConnectionResetError("connection closed before response")
+        parts = status_line.decode("latin-1").split(None, 2)
+        if len(parts) < 2 or not parts[0].startswith("HTTP/"):
+            raise http.client.BadStatusLine(status_line.decode("latin-1", errors="replace"))
+        version, status = parts[0], int(parts[1])
+
+        resp_headers: Dict[str, str] = {}
+        while True:
+            line = await conn.reader.readline()
+            if line in (b"\r\n", b"\n", b""):
+                break
+            k, _, v = line.decode("latin-1").partition(":")
+            resp_headers[k.strip().lower()] = v.strip()
+
+        keep = version == "HTTP/1.1" and resp_headers.get("connection", "").lower() != "close"
+        if "chunked" in resp_headers.get("transfer-encoding", "").lower():
+            chunks = []
+            while True:
+                size = int((await conn.reader.readline()).split(b";", 1)[0].strip() or b"0", 16)
+                if size == 0:
+                    # trailers until blank line
+                    while (await conn.reader.readline()) not in (b"\r\n", b"\n", b""):
+                        pass
+                    break
+                chunks.append(await conn.reader.readexactly(size))
+                await conn.reader.readexactly(2)
+            raw = b"".join(chunks)
+        elif "content-length" in resp_headers:
+            raw = await conn.reader.readexactly(int(resp_headers["content-length"]))
+        elif status in (204, 304) or 100 <= status < 200:
+            raw = b""
+        else:
+            raw = await conn.reader.read()
+            keep = False
+        return status, keep, raw
+
+    async def request(self, method: str, url: str, headers=None, body=None, timeout=None):
+        u = urllib.parse.urlsplit(url)
+        scheme = (u.scheme or "http").lower()
+        default_port = 443 if scheme == "https" else 80
+        port = u.port or default_port
+        host = u.hostname or ""
+        origin = (scheme, host, port)
+        target = u.path or "/"
+        if u.query:
+            target += "?" + u.query
+
+        data = None
+        if body is not None:
+            data = json.dumps(body).encode("utf-8")
+        h = {
+            "Host": host if port == default_port else f"{host}:{port}",
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+            "Content-Length": str(len(data or b"")),
+        }
+        if headers:
+            h.update(headers)
+        head = f"{method} {target} HTTP/1.1\r\n" + "".join(f"{k}: {v}\r\n" for k, v in h.items()) + "\r\n"
+        t = float(timeout) if timeout is not None else self.timeout_for(u.path or "/")
+        t0 = time.perf_counter()
+
+        for attempt in range(2):
+            conn = None
+            reused = False
+            try:
+                conn, reused = await asyncio.wait_for(self._acquire(origin), t)
+                status, keep, raw = await asyncio.wait_for(self._roundtrip(conn, head.encode("latin-1"), data), t)
+            except (asyncio.IncompleteReadError,) + _STALE_ERRORS as e:
+                if conn is not None:
+                    conn.close()
+                # Writes are buffered here, so a failure cannot be placed before or
+                # after the request went out; only idempotent methods are resent.
+                if reused and attempt == 0 and method.upper() in _IDEMPOTENT:
+                    self.counters["reconnects"] += 1
+                    continue
+                self.counters["errors"] += 1
+                _finish(self.observer, method, u.path, t0, 0, None)
+                return 0, {"ok": False, "error": str(e) or type(e).__name__}
+            except Exception as e:
+                # includes asyncio.TimeoutError: the socket state is unknown, drop it.
+                if conn is not None:
+                    conn.close()
+                self.counters["errors"] += 1
+                _finish(self.observer, method, u.path, t0, 0, None)
+                return 0, {"ok": False, "error": str(e) or type(e).__name__}
+
+            if keep:
+                self._release(origin, conn)
+            else:
+                conn.close()
+            return status, _finish(self.observer, method, u.path, t0, status, raw)
+
+        return 0, {"ok": False, "error": "connection failed"}
+
+    def stats(self) -> Dict[str, int]:
+        out = dict(self.counters)
+        out["idle"] = sum(len(v) for v in self._idle.values())
+        return out
+
+    async def close(self) -> None:
+        conns = [c for lst in self._idle.values() for c in lst]
+        self._idle.clear()
+        for c in conns:
+            c.close()
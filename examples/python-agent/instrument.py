@@ -0,0 +1,367 @@
+#!/usr/bin/env python3
+"""
+Instrumentation for the agent loop: where does a slow bot spend its time?
+
+`Metrics` keeps fixed-bucket latency histograms for the loop phases and for
+every bot endpoint, plus request / error / 429 counters:
+
+- fetch:  time on the wire for `/api/bot/world` (reported by the HTTP client)
+- decode: JSON decoding of every response (reported by the HTTP client)
+- merge:  folding the world snapshot into the local copy (`SnapshotStore.apply`)
+- decide: the policy (`decide()`)
+- act:    sending goal/cast/thought actions (wire + decode)
+
+Wire it up with `HttpClient(observer=metrics.observe_http)` and
+`with metrics.phase("decide"): ...`. `Reporter` exports periodically through
+pluggable exporters: `LogExporter` (one line), `JsonFileExporter`, and
+`PrometheusTextExporter` (text exposition format, for the node_exporter
+textfile collector or `serve_prometheus`).
+
+`install_profiling_signals()` adds opt-in profiling to a running bot:
+`kill -USR1 <pid>` toggles cProfile (stats dumped on stop), `kill -USR2 <pid>`
+toggles a low-overhead stack sampler that writes collapsed stacks for
+flamegraph tools.
+"""
+
+from __future__ import annotations
+
+import bisect
+import collections
+import contextlib
+import cProfile
+import io
+import json
+import os
+import pstats
+import signal
+import sys
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+
+
+# Upper bounds (ms) shared by every histogram; the last bucket is +Inf.
+BUCKETS_MS = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+PHASES = ("fetch", "decode", "merge", "decide", "act")
+
+
+def endpoint_of(path: str) -> str:
+    """`/api/bot/world` → `world`, `/api/bot/party/join` → `party/join`."""
+    p = str(path or "").split("?", 1)[0]
+    if p.startswith("/api/bot/"):
+        return p[len("/api/bot/"):] or "/"
+    return p or "/"
+
+
+class Histogram:
+    __slots__ = ("bounds", "counts", "count", "sum", "max")
+
+    def __init__(self, bounds: Tuple[float, ...] = BUCKETS_MS):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)
+        self.count = 0
+        self.sum = 0.0
+        self.max = 0.0
+
+    def observe(self, v: float) -> None:
+        self.counts[bisect.bisect_left(self.bounds, v)] += 1
+        self.count += 1
+        self.sum += v
+        if v > self.max:
+            self.max = v
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Upper bound of the bucket holding the q-quantile, capped at the observed max."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, c in enumerate(self.counts):
+            seen += c
+            if seen >= rank and c:
+                return min(float(self.bounds[i]), self.max) if i < len(self.bounds) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            "count": self.count,
+            "meanMs": round(self.sum / self.count, 3) if self.count else None,
+            "p50Ms": self.quantile(0.50),
+            "p95Ms": self.quantile(0.95),
+            "p99Ms": self.quantile(0.99),
+            "maxMs": round(self.max, 3),
+        }
+
+
+class Metrics:
+    def __init__(self):
+        self.started_at = time.time()
+        self.phases: Dict[str, Histogram] = {p: Histogram() for p in PHASES}
+        self.endpoints: Dict[str, Histogram] = {}
+        self.requests: Dict[Tuple[str, int], int] = collections.Counter()
+        self.errors: Dict[str, int] = collections.Counter()
+        self.throttled: Dict[str, int] = collections.Counter()
+        self.loops = 0
+        self._lock = threading.Lock()
+
+    def observe_phase(self, name: str, ms: float) -> None:
+        with self._lock:
+            h = self.phases.get(name)
+            if h is None:
+                h = self.phases[name] = Histogram()
+            h.observe(ms)
+
+    @contextlib.contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe_phase(name, (time.perf_counter() - t0) * 1000.0)
+
+    def observe_http(self, method: str, path: str, status: int, net_ms: float, decode_ms: float) -> None:
+        """`HttpClient(observer=...)` hook."""
+        ep = endpoint_of(path)
+        with self._lock:
+            h = self.endpoints.get(ep)
+            if h is None:
+                h = self.endpoints[ep] = Histogram()
+            h.observe(net_ms + decode_ms)
+            self.requests[(ep, int(status))] += 1
+            if status == 429:
+                self.throttled[ep] += 1
+            elif status < 200 or status >= 300:
+                self.errors[ep] += 1
+            if ep == "world":
+                self.phases["fetch"].observe(net_ms)
+            self.phases["decode"].observe(decode_ms)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            return {
+                "at": int(time.time() * 1000),
+                "uptimeSec": round(time.time() - self.started_at, 1),
+                "loops": self.loops,
+                "phases": {k: h.summary() for k, h in self.phases.items()},
+                "endpoints": {k: h.summary() for k, h in sorted(self.endpoints.items())},
+                "requests": {f"{ep} {st}": n for (ep, st), n in sorted(self.requests.items())},
+                "errors": dict(self.errors),
+                "throttled": dict(self.throttled),
+            }
+
+    def prometheus(self, prefix: str = "clawtown_agent") -> str:
+        lines: List[str] = []
+        with self._lock:
+            _prom_hist(lines, f"{prefix}_phase_ms", "phase", self.phases, "Agent loop phase duration (ms).")
+            _prom_hist(lines, f"{prefix}_request_ms", "endpoint", self.endpoints, "Bot API request latency incl. decode (ms).")
+            lines.append(f"# HELP {prefix}_requests_total Bot API responses by endpoint and status (0 = transport error).")
+            lines.append(f"# TYPE {prefix}_requests_total counter")
+            for (ep, st), n in sorted(self.requests.items()):
+                lines.append(f'{prefix}_requests_total{{endpoint="{ep}",status="{st}"}} {n}')
+            for name, counter, help_ in (
+                ("errors_total", self.errors, "Non-2xx, non-429 responses and transport errors."),
+                ("throttled_total", self.throttled, "429 responses."),
+            ):
+                lines.append(f"# HELP {prefix}_{name} {help_}")
+                lines.append(f"# TYPE {prefix}_{name} counter")
+                for ep, n in sorted(counter.items()):
+                    lines.append(f'{prefix}_{name}{{endpoint="{ep}"}} {n}')
+            lines.append(f"# TYPE {prefix}_loops_total counter")
+            lines.append(f"{prefix}_loops_total {self.loops}")
+        return "\n".join(lines) + "\n"
+
+
+def _prom_hist(lines: List[str], name: str, label: str, hists: Dict[str, Histogram], help_: str) -> None:
+    lines.append(f"# HELP {name} {help_}")
+    lines.append(f"# TYPE {name} histogram")
+    for key, h in sorted(hists.items()):
+        cum = 0
+        for bound, c in zip(h.bounds, h.counts):
+            cum += c
+            lines.append(f'{name}_bucket{{{label}="{key}",le="{bound}"}} {cum}')
+        lines.append(f'{name}_bucket{{{label}="{key}",le="+Inf"}} {h.count}')
+        lines.append(f'{name}_sum{{{label}="{key}"}} {round(h.sum, 3)}')
+        lines.append(f'{name}_count{{{label}="{key}"}} {h.count}')
+
+
+def _write_atomic(path: str, text: str) -> None:
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+class LogExporter:
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def export(self, m: Metrics) -> None:
+        s = m.snapshot()
+        parts = [f"loops={s['loops']}"]
+        for name, h in s["phases"].items():
+            if h["count"]:
+                parts.append(f"{name} p50={h['p50Ms']} p99={h['p99Ms']}")
+        for ep, h in s["endpoints"].items():
+            parts.append(f"{ep} n={h['count']} p99={h['p99Ms']} 429={s['throttled'].get(ep, 0)} err={s['errors'].get(ep, 0)}")
+        print("metrics " + " | ".join(parts), file=self.stream or sys.stderr)
+
+
+class JsonFileExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, m: Metrics) -> None:
+        _write_atomic(self.path, json.dumps(m.snapshot(), indent=2) + "\n")
+
+
+class PrometheusTextExporter:
+    def __init__(self, path: str):
+        self.path = path
+
+    def export(self, m: Metrics) -> None:
+        _write_atomic(self.path, m.prometheus())
+
+
+def exporter_for(spec: str):
+    """`log`, `json:<path>` or `prom:<path>` (the `--metrics` flag)."""
+    kind, _, path = str(spec or "").partition(":")
+    if kind == "log":
+        return LogExporter()
+    if kind == "json" and path:
+        return JsonFileExporter(path)
+    if kind == "prom" and path:
+        return PrometheusTextExporter(path)
+    raise ValueError(f"unknown metrics exporter: {spec!r}")
+
+
+class Reporter:
+    """Calls every exporter at most once per `every_sec`; call `tick()` from the loop."""
+
+    def __init__(self, metrics: Metrics, exporters: List, every_sec: float = 10.0):
+        self.metrics = metrics
+        self.exporters = list(exporters)
+        self.every_sec = max(0.5, float(every_sec))
+        self._next = time.monotonic() + self.every_sec
+
+    def tick(self, force: bool = False) -> None:
+        now = time.monotonic()
+        if not force and now < self._next:
+            return
+        self._next = now + self.every_sec
+        for ex in self.exporters:
+            try:
+                ex.export(self.metrics)
+            except OSError as e:
+                print("metrics export failed:", e, file=sys.stderr)
+
+
+def serve_prometheus(metrics: Metrics, port: int, host: str = "127.0.0.1"):
+    """Serve `GET /metrics` from a daemon thread; returns the server."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    srv = ThreadingHTTPServer((host, int(port)), Handler)
+    threading.Thread(target=srv.serve_forever, name="ct-metrics", daemon=True).start()
+    return srv
+
+
+class ProfileToggle:
+    """cProfile on/off for a running process; stats are dumped each time it stops."""
+
+    def __init__(self, out_path: str = "agent.prof", top: int = 25):
+        self.out_path = out_path
+        self.top = top
+        self._prof: Optional[cProfile.Profile] = None
+
+    @property
+    def active(self) -> bool:
+        return self._prof is not None
+
+    def toggle(self) -> None:
+        if self._prof is None:
+            self._prof = cProfile.Profile()
+            self._prof.enable()
+            print("profile: cProfile on", file=sys.stderr)
+            return
+        prof, self._prof = self._prof, None
+        prof.disable()
+        prof.dump_stats(self.out_path)
+        buf = io.StringIO()
+        pstats.Stats(prof, stream=buf).sort_stats("cumulative").print_stats(self.top)
+        print(buf.getvalue(), file=sys.stderr)
+        print("profile: cProfile off, stats in", self.out_path, file=sys.stderr)
+
+
+class StackSampler:
+    """
+    Samples one thread's stack every `interval_ms` from a background thread and
+    counts collapsed stacks (`a;b;c N`, the flamegraph.pl / speedscope input).
+    """
+
+    def __init__(self, out_path: str = "agent.stacks", interval_ms: float = 5.0, thread_id: Optional[int] = None):
+        self.out_path = out_path
+        self.interval = max(0.001, interval_ms / 1000.0)
+        self.thread_id = thread_id if thread_id is not None else threading.main_thread().ident
+        self.counts: Dict[str, int] = collections.Counter()
+        self._stop: Optional[threading.Event] = None
+
+    @property
+    def active(self) -> bool:
+        return self._stop is not None
+
+    def _run(self, stop: threading.Event) -> None:
+        while not stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+                frame = frame.f_back
+            if stack:
+                self.counts[";".join(reversed(stack))] += 1
+
+    def toggle(self) -> None:
+        if self._stop is None:
+            self.counts.clear()
+            self._stop = threading.Event()
+            threading.Thread(target=self._run, args=(self._stop,), name="ct-sampler", daemon=True).start()
+            print("profile: sampler on", file=sys.stderr)
+            return
+        self._stop.set()
+        self._stop = None
+        _write_atomic(self.out_path, "".join(f"{k} {n}\n" for k, n in sorted(self.counts.items())))
+        print(f"profile: sampler off, {sum(self.counts.values())} samples in", self.out_path, file=sys.stderr)
+
+
+def install_profiling_signals(profile: Optional[ProfileToggle] = None, sampler: Optional[StackSampler] = None) -> bool:
+    """SIGUSR1 toggles cProfile, SIGUSR2 the stack sampler. Returns False where unsupported."""
+    if not hasattr(signal, "SIGUSR1"):
+        return False
+    profile = profile or ProfileToggle()
+    sampler = sampler or StackSampler()
+    signal.signal(signal.SIGUSR1, lambda *_: profile.toggle())
+    signal.signal(signal.SIGUSR2, lambda *_: sampler.toggle())
+    return True
+
+
+def stop_profiling(profile: Optional[ProfileToggle], sampler: Optional[StackSampler]) -> None:
+    """Flush whatever is still running (e.g. on exit)."""
+    for p in (profile, sampler):
+        if p is not None and p.active:
+            p.toggle()
+
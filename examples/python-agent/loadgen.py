@@ -0,0 +1,389 @@
+#!/usr/bin/env python3
+"""
+Load generator + latency benchmark for the bot API.
+
+Ramps linked bots against one Clawtown node in stages (e.g. 10 → 50 → 100) and
+drives a weighted mix of `/api/bot/world`, `/api/bot/goal`, `/api/bot/cast`,
+`/api/bot/events` and `/api/bot/status` calls from each of them. Per stage it
+records latency percentiles (p50/p95/p99/max) and 429 / error rates per
+endpoint, and — when the `/ws` feed is reachable — the gap between `state`
+broadcasts, which is the server's tick (100 ms when healthy). The report is
+written as JSON so runs can be compared over time.
+
+Every bot needs its own join token (same file format as fleet.py); bots never
+share a token, so the server's per-bot rate limits stay meaningful.
+
+Usage:
+  python3 examples/python-agent/loadgen.py tokens.txt [--ramp 10,50,100] [--stageSec 30]
+      [--rps 2] [--mix world=4,goal=2,cast=2,events=1,status=1] [--respectLimits]
+      [--concurrency 256] [--noTick] [--out loadgen-report.json]
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import random
+import sys
+import threading
+import time
+from typing import Dict, List, Optional
+
+from bot import ENDPOINT_TIMEOUTS
+from fleet import read_tokens
+from http_pool import AsyncHttpClient
+from ratelimit import RateLimiter
+from stream import WorldModel, WorldStream, ws_url_for
+
+
+DEFAULT_MIX = {"world": 4, "goal": 2, "cast": 2, "events": 1, "status": 1}
+ENDPOINTS = tuple(DEFAULT_MIX)
+
+
+def percentile(sorted_vals: List[float], p: float) -> Optional[float]:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_vals:
+        return None
+    k = max(0, min(len(sorted_vals) - 1, int(round(p / 100.0 * len(sorted_vals) + 0.5)) - 1))
+    return sorted_vals[k]
+
+
+def parse_mix(text: str) -> Dict[str, float]:
+    mix: Dict[str, float] = {}
+    for part in str(text or "").split(","):
+        if "=" not in part:
+            continue
+        k, v = part.split("=", 1)
+        k = k.strip()
+        if k in ENDPOINTS:
+            mix[k] = max(0.0, float(v or "0"))
+    return mix if sum(mix.values()) > 0 else dict(DEFAULT_MIX)
+
+
+class EndpointStats:
+    __slots__ = ("latencies_ms", "status", "errors", "throttled", "skipped")
+
+    def __init__(self):
+        self.latencies_ms: List[float] = []
+        self.status: Dict[int, int] = {}
+        self.errors = 0
+        self.throttled = 0
+        self.skipped = 0
+
+    def record(self, status: int, ms: float) -> None:
+        self.latencies_ms.append(ms)
+        self.status[status] = self.status.get(status, 0) + 1
+        if status == 429:
+            self.throttled += 1
+        elif status < 200 or status >= 300:
+            self.errors += 1
+
+    def summary(self, seconds: float) -> dict:
+        lat = sorted(self.latencies_ms)
+        n = len(lat)
+        return {
+            "count": n,
+            "rps": round(n / seconds, 2) if seconds > 0 else None,
+            "p50Ms": _r(percentile(lat, 50)),
+            "p95Ms": _r(percentile(lat, 95)),
+            "p99Ms": _r(percentile(lat, 99)),
+            "maxMs": _r(lat[-1] if lat else None),
+            "meanMs": _r(sum(lat) / n if n else None),
+            "rate429": round(self.throttled / n, 4) if n else 0.0,
+            "errorRate": round(self.errors / n, 4) if n else 0.0,
+            "skippedLocal": self.skipped,
+            "status": {str(k): v for k, v in sorted(self.status.items())},
+        }
+
+
+def _r(v: Optional[float]) -> Optional[float]:
+    return None if v is None else round(v, 2)
+
+
+class TickProbe(WorldModel):
+    """WorldModel that also records the arrival gap between `state` broadcasts."""
+
+    def __init__(self, player_id: str):
+        super().__init__(player_id, fx_keep=1)
+        self._last = 0.0
+        self._gaps_lock = threading.Lock()
+        self.gaps_ms: List[float] = []
+
+    def apply(self, msg: dict) -> bool:
+        if msg.get("type") == "state":
+            now = time.perf_counter()
+            if self._last:
+                with self._gaps_lock:
+                    self.gaps_ms.append((now - self._last) * 1000.0)
+            self._last = now
+        return super().apply(msg)
+
+    def drain(self) -> List[float]:
+        with self._gaps_lock:
+            out, self.gaps_ms = self.gaps_ms, []
+        return out
+
+
+def tick_summary(gaps: List[float], tick_ms: float) -> dict:
+    gaps = sorted(gaps)
+    return {
+        "samples": len(gaps),
+        "p50Ms": _r(percentile(gaps, 50)),
+        "p95Ms": _r(percentile(gaps, 95)),
+        "p99Ms": _r(percentile(gaps, 99)),
+        "maxMs": _r(gaps[-1] if gaps else None),
+        # A gap over 1.5 ticks means at least one broadcast was late.
+        "slipped": sum(1 for g in gaps if g > tick_ms * 1.5),
+    }
+
+
+class LoadGen:
+    def __init__(
+        self,
+        tokens: List[dict],
+        ramp: List[int],
+        stage_sec: float = 30.0,
+        rps: float = 2.0,
+        mix: Optional[Dict[str, float]] = None,
+        respect_limits: bool = False,
+        concurrency: int = 256,
+        tick_probe: bool = True,
+        tick_ms: float = 100.0,
+    ):
+        self.tokens = tokens
+        self.ramp = [max(1, min(len(tokens), int(n))) for n in ramp]
+        self.stage_sec = max(1.0, float(stage_sec))
+        self.rps = max(0.05, float(rps))
+        self.mix = dict(mix or DEFAULT_MIX)
+        self.respect_limits = respect_limits
+        self.concurrency = max(1, int(concurrency))
+        self.tick_probe = tick_probe
+        self.tick_ms = float(tick_ms)
+        self.client = AsyncHttpClient(timeouts=ENDPOINT_TIMEOUTS, max_idle_per_origin=self.concurrency)
+        self._sem: Optional[asyncio.Semaphore] = None
+        self._stats: Dict[str, EndpointStats] = {}
+        self.link_failed = 0
+
+    async def _call(self, method: str, url: str, headers=None, body=None):
+        assert self._sem is not None
+        async with self._sem:
+            # Timed inside the semaphore: client-side queueing is not server latency.
+            t0 = time.perf_counter()
+            st, payload = await self.client.request(method, url, headers=headers, body=body)
+            return st, payload, (time.perf_counter() - t0) * 1000.0
+
+    async def _link(self, parsed: dict) -> Optional[dict]:
+        base_url = parsed["baseUrl"]
+        st, linked, _ = await self._call("POST", f"{base_url}/api/bot/link", body={"joinToken": parsed["raw"]})
+        if st < 200 or st >= 300 or not linked.get("ok") or not linked.get("botToken"):
+            print("link failed", st, linked, file=sys.stderr)
+            return None
+        headers = {"Authorization": f"Bearer {linked['botToken']}"}
+        st, mode, _ = await self._call("POST", f"{base_url}/api/bot/mode", headers=headers, body={"mode": "agent"})
+        if st < 200 or st >= 300 or not mode.get("ok"):
+            print("mode failed", st, mode, file=sys.stderr)
+            return None
+        return {"baseUrl": base_url, "headers": headers, "linked": linked, "limiter": RateLimiter(), "cursor": 0, "you": None, "world": None}
+
+    def _stat(self, endpoint: str) -> EndpointStats:
+        s = self._stats.get(endpoint)
+        if s is None:
+            s = self._stats[endpoint] = EndpointStats()
+        return s
+
+    async def _one(self, bot: dict, endpoint: str) -> None:
+        limiter: RateLimiter = bot["limiter"]
+        if self.respect_limits and not limiter.try_take(endpoint):
+            self._stat(endpoint).skipped += 1
+            return
+        base, headers = bot["baseUrl"], bot["headers"]
+        if endpoint == "world":
+            st, r, ms = await self._call("GET", f"{base}/api/bot/world", headers=headers)
+            if st == 200 and r.get("ok"):
+                snap = r.get("snapshot") or {}
+                bot["you"] = snap.get("you") or bot["you"]
+                bot["world"] = snap.get("world") or bot["world"]
+        elif endpoint == "status":
+            st, r, ms = await self._call("GET", f"{base}/api/bot/status", headers=headers)
+        elif endpoint == "events":
+            st, r, ms = await self._call("GET", f"{base}/api/bot/events?cursor={bot['cursor']}&limit=20", headers=headers)
+            if st == 200 and r.get("ok"):
+                bot["cursor"] = int(r.get("nextCursor") or bot["cursor"])
+        elif endpoint == "goal":
+            w = bot["world"] or {"width": 30, "height": 18, "tileSize": 32}
+            you = bot["you"] or {}
+            x = float(you.get("x") or w["width"] * w["tileSize"] / 2) + random.uniform(-160, 160)
+            y = float(you.get("y") or w["height"] * w["tileSize"] / 2) + random.uniform(-160, 160)
+            x = max(0.0, min(x, (w["width"] - 1) * w["tileSize"]))
+            y = max(0.0, min(y, (w["height"] - 1) * w["tileSize"]))
+            st, r, ms = await self._call("POST", f"{base}/api/bot/goal", headers=headers, body={"x": round(x), "y": round(y)})
+        else:
+            st, r, ms = await self._call("POST", f"{base}/api/bot/cast", headers=headers, body={"spell": "signature"})
+        if st == 429:
+            limiter.note_retry(endpoint, r.get("retryInMs"))
+        self._stat(endpoint).record(st, ms)
+
+    async def _run_bot(self, bot: dict, stop: asyncio.Event) -> None:
+        names = list(self.mix)
+        weights = [self.mix[n] for n in names]
+        interval = 1.0 / self.rps
+        # Spread bots across the first interval so they don't fire in lockstep.
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=random.uniform(0, interval))
+            return
+        except asyncio.TimeoutError:
+            pass
+        loop = asyncio.get_running_loop()
+        while not stop.is_set():
+            t0 = loop.time()
+            await self._one(bot, random.choices(names, weights)[0])
+            # Exponential think time keeps arrivals Poisson-like at `rps` per bot.
+            delay = max(0.0, random.expovariate(self.rps) - (loop.time() - t0))
+            try:
+                await asyncio.wait_for(stop.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+
+    async def run(self) -> dict:
+        self._sem = asyncio.Semaphore(self.concurrency)
+        loop = asyncio.get_running_loop()
+        bots: List[dict] = []
+        tasks: List[asyncio.Task] = []
+        stop = asyncio.Event()
+        probe: Optional[TickProbe] = None
+        stream: Optional[WorldStream] = None
+        stages = []
+        next_token = 0
+        try:
+            for target in self.ramp:
+                link_t0 = loop.time()
+                while len(bots) < target and next_token < len(self.tokens):
+                    batch = self.tokens[next_token : next_token + (target - len(bots))]
+                    next_token += len(batch)
+                    for bot in await asyncio.gather(*(self._link(p) for p in batch)):
+                        if bot is None:
+                            self.link_failed += 1
+                            continue
+                        bots.append(bot)
+                        tasks.append(asyncio.ensure_future(self._run_bot(bot, stop)))
+                link_sec = loop.time() - link_t0
+                if probe is None and self.tick_probe and bots:
+                    probe = TickProbe(str(bots[0]["linked"].get("playerId") or ""))
+                    stream = WorldStream(ws_url_for(bots[0]["baseUrl"], bots[0]["linked"]), probe).start()
+
+                # Measure only the steady part of the stage.
+                self._stats = {}
+                if probe:
+                    probe.drain()
+                t0 = loop.time()
+                await asyncio.sleep(self.stage_sec)
+                seconds = loop.time() - t0
+                stage = {
+                    "bots": len(bots),
+                    "seconds": round(seconds, 2),
+                    "linkSeconds": round(link_sec, 2),
+                    "totalRps": round(sum(len(s.latencies_ms) for s in self._stats.values()) / seconds, 2),
+                    "endpoints": {ep: self._stats[ep].summary(seconds) for ep in ENDPOINTS if ep in self._stats},
+                    "tick": tick_summary(probe.drain(), self.tick_ms) if probe else None,
+                }
+                stages.append(stage)
+                print(_stage_line(stage), file=sys.stderr)
+        finally:
+            stop.set()
+            if tasks:
+                await asyncio.gather(*tasks, return_exceptions=True)
+            if stream:
+                stream.stop()
+            await self.client.close()
+        return {
+            "target": sorted({b["baseUrl"] for b in bots}),
+            "startedAt": int(time.time() * 1000),
+            "config": {
+                "ramp": self.ramp,
+                "stageSec": self.stage_sec,
+                "rpsPerBot": self.rps,
+                "mix": self.mix,
+                "respectLimits": self.respect_limits,
+                "concurrency": self.concurrency,
+            },
+            "linkFailed": self.link_failed,
+            "stages": stages,
+            "http": self.client.stats(),
+        }
+
+
+def _stage_line(stage: dict) -> str:
+    parts = [f"bots={stage['bots']} rps={stage['totalRps']}"]
+    for ep, s in stage["endpoints"].items():
+        parts.append(f"{ep}: p50={s['p50Ms']} p99={s['p99Ms']} 429={s['rate429']:.1%}")
+    t = stage.get("tick")
+    if t and t["samples"]:
+        parts.append(f"tick p99={t['p99Ms']} slipped={t['slipped']}")
+    return " | ".join(parts)
+
+
+def main(argv):
+    tokens_path = ""
+    ramp = [10, 50, 100]
+    stage_sec = 30.0
+    rps = 2.0
+    mix = dict(DEFAULT_MIX)
+    respect_limits = False
+    concurrency = 256
+    tick_probe = True
+    out_path = "loadgen-report.json"
+
+    i = 1
+    while i < len(argv):
+        a = argv[i]
+        if a == "--ramp" and i + 1 < len(argv):
+            i += 1
+            ramp = [int(float(x)) for x in argv[i].split(",") if x.strip()]
+        elif a == "--stageSec" and i + 1 < len(argv):
+            i += 1
+            stage_sec = float(argv[i] or "0")
+        elif a == "--rps" and i + 1 < len(argv):
+            i += 1
+            rps = float(argv[i] or "0")
+        elif a == "--mix" and i + 1 < len(argv):
+            i += 1
+            mix = parse_mix(argv[i])
+        elif a == "--respectLimits":
+            respect_limits = True
+        elif a == "--concurrency" and i + 1 < len(argv):
+            i += 1
+            concurrency = int(float(argv[i] or "0"))
+        elif a == "--noTick":
+            tick_probe = False
+        elif a == "--out" and i + 1 < len(argv):
+            i += 1
+            out_path = argv[i]
+        elif not tokens_path and not a.startswith("--"):
+            tokens_path = a
+        i += 1
+
+    if not tokens_path or not ramp:
+        print("Usage: python3 examples/python-agent/loadgen.py tokens.txt [--ramp 10,50,100] [--stageSec 30] [--rps 2] [--mix world=4,goal=2,cast=2,events=1,status=1] [--respectLimits] [--concurrency 256] [--noTick] [--out loadgen-report.json]", file=sys.stderr)
+        return 2
+
+    tokens = read_tokens(tokens_path)
+    if not tokens:
+        print("no valid join tokens in", tokens_path, file=sys.stderr)
+        return 2
+    if max(ramp) > len(tokens):
+        print(f"only {len(tokens)} tokens; ramp capped at {len(tokens)} bots", file=sys.stderr)
+
+    gen = LoadGen(tokens, ramp, stage_sec=stage_sec, rps=rps, mix=mix, respect_limits=respect_limits, concurrency=concurrency, tick_probe=tick_probe)
+    try:
+        report = asyncio.run(gen.run())
+    except KeyboardInterrupt:
+        return 130
+    with open(out_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+        f.write("\n")
+    print("Report:", out_path)
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
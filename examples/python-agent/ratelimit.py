@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Client-side mirror of the server's per-endpoint bot rate limits.
+
+`rateLimitBot(p, key, { intervalMs, burst })` in server/index.js is a token
+bucket per (player, endpoint): one token every `intervalMs`, at most `burst`
+stored, and a `429 {retryInMs}` when empty. `TokenBucket` runs the same math
+locally so the agent waits instead of spending round trips on rejections, and
+re-syncs from `retryInMs` whenever the server disagrees (other clients sharing
+the same bot token, clock drift, a restart).
+
+`ActionScheduler` queues POST actions on top of those buckets:
+- casts go first, thoughts last (`PRIORITY`);
+- goal/intent/thought are coalesced, so only the latest target is sent;
+- 429s and cast cooldowns (`result.reason == "cooldown"`) requeue the action.
+
+It does no I/O itself: `due()` hands out what may be sent now and `report()`
+takes the response, so the same scheduler works for sync and asyncio loops.
+"""
+
+from __future__ import annotations
+
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+
+# endpoint key -> (intervalMs, burst); keep in sync with rateLimitBot() calls in server/index.js.
+BOT_RATE_LIMITS: Dict[str, Tuple[int, int]] = {
+    "world": (250, 6),
+    "status": (250, 6),
+    "goal": (220, 6),
+    "cast": (220, 6),
+    "intent": (500, 3),
+    "chat": (1200, 2),
+    "thought": (2500, 2),
+    "events": (700, 3),
+    "mode": (700, 2),
+    "minimap_png": (1800, 1),
+    "map_png": (2400, 1),
+}
+
+# Lower sends first.
+PRIORITY: Dict[str, int] = {"cast": 0, "goal": 1, "intent": 2, "chat": 3, "thought": 4}
+
+COALESCE = ("goal", "intent", "thought")
+
+
+def monotonic_ms() -> float:
+    return time.monotonic() * 1000.0
+
+
+class TokenBucket:
+    __slots__ = ("interval_ms", "burst", "tokens", "last_ms", "blocked_until_ms")
+
+    def __init__(self, interval_ms: float, burst: int, now_ms: float):
+        self.interval_ms = max(20.0, float(interval_ms))
+        self.burst = max(1, int(burst))
+        self.tokens = float(self.burst)
+        self.last_ms = float(now_ms)
+        self.blocked_until_ms = 0.0
+
+    def _refill(self, now_ms: float) -> None:
+        dt = max(0.0, now_ms - self.last_ms)
+        self.tokens = min(float(self.burst), self.tokens + dt / self.interval_ms)
+        self.last_ms = now_ms
+
+    def wait_ms(self, now_ms: float) -> float:
+        """Milliseconds until a request would be accepted (0 = now)."""
+        self._refill(now_ms)
+        w = 0.0 if self.tokens >= 1.0 else (1.0 - self.tokens) * self.interval_ms
+        return max(w, self.blocked_until_ms - now_ms, 0.0)
+
+    def try_take(self, now_ms: float) -> bool:
+        if self.wait_ms(now_ms) > 0:
+            return False
+        self.tokens -= 1.0
+        return True
+
+    def note_retry(self, retry_in_ms: Optional[float], now_ms: float) -> None:
+        """Re-sync with a server `retryInMs` (429 body or cast cooldown)."""
+        retry = float(retry_in_ms) if retry_in_ms else self.interval_ms
+        self._refill(now_ms)
+        # The server's bucket is authoritative: it says a token appears in `retry` ms.
+        self.tokens = 1.0 - min(1.0, retry / self.interval_ms)
+        self.blocked_until_ms = max(self.blocked_until_ms, now_ms + retry)
+
+
+class RateLimiter:
+    """Buckets for every endpoint of one bot token."""
+
+    def __init__(self, limits: Optional[Dict[str, Tuple[int, int]]] = None, clock: Callable[[], float] = monotonic_ms):
+        self.limits = dict(limits or BOT_RATE_LIMITS)
+        self.clock = clock
+        self._buckets: Dict[str, TokenBucket] = {}
+        self.counters = {"taken": 0, "throttled": 0, "retries": 0}
+
+    def bucket(self, key: str) -> Optional[TokenBucket]:
+        b = self._buckets.get(key)
+        if b is None and key in self.limits:
+            interval, burst = self.limits[key]
+            b = self._buckets[key] = TokenBucket(interval, burst, self.clock())
+        return b
+
+    def wait_ms(self, key: str) -> float:
+        b = self.bucket(key)
+        return b.wait_ms(self.clock()) if b else 0.0
+
+    def try_take(self, key: str) -> bool:
+        b = self.bucket(key)
+        if b is None or b.try_take(self.clock()):
+            self.counters["taken"] += 1
+            return True
+        self.counters["throttled"] += 1
+        return False
+
+    def take(self, key: str, sleep: Callable[[float], None] = time.sleep) -> None:
+        """Block (via `sleep`, seconds) until a token is available, then take it."""
+        while not self.try_take(key):
+            sleep(self.wait_ms(key) / 1000.0)
+
+    def note_retry(self, key: str, retry_in_ms: Optional[float]) -> None:
+        b = self.bucket(key)
+        if b is not None:
+            self.counters["retries"] += 1
+            b.note_retry(retry_in_ms, self.clock())
+
+
+class ActionScheduler:
+    def __init__(self, limiter: Optional[RateLimiter] = None, max_queue: int = 4):
+        self.limiter = limiter or RateLimiter()
+        self.max_queue = max(1, int(max_queue))
+        self._pending: Dict[str, List[dict]] = {}
+        self._seq = 0
+        self._order: Dict[str, int] = {}
+        self.counters = {"submitted": 0, "coalesced": 0, "dropped": 0, "sent": 0, "requeued": 0}
+
+    def submit(self, endpoint: str, body: dict) -> None:
+        self.counters["submitted"] += 1
+        q = self._pending.setdefault(endpoint, [])
+        if endpoint in COALESCE and q:
+            q[-1] = body
+            self.counters["coalesced"] += 1
+            return
+        if len(q) >= self.max_queue:
+            q.pop(0)
+            self.counters["dropped"] += 1
+        q.append(body)
+        if endpoint not in self._order:
+            self._seq += 1
+            self._order[endpoint] = self._seq
+
+    def pending(self) -> int:
+        return sum(len(q) for q in self._pending.values())
+
+    def _endpoints(self) -> List[str]:
+        eps = [e for e, q in self._pending.items() if q]
+        eps.sort(key=lambda e: (PRIORITY.get(e, 5), self._order.get(e, 0)))
+        return eps
+
+    def due(self, max_sends: Optional[int] = None) -> List[Tuple[str, dict]]:
+        """Pop every action that may be sent right now (takes its token), by priority."""
+        out: List[Tuple[str, dict]] = []
+        for ep in self._endpoints():
+            q = self._pending[ep]
+            while q and (max_sends is None or len(out) < max_sends):
+                if not self.limiter.try_take(ep):
+                    break
+                out.append((ep, q.pop(0)))
+            if not q:
+                self._pending.pop(ep, None)
+                self._order.pop(ep, None)
+        self.counters["sent"] += len(out)
+        return out
+
+    def next_due_ms(self) -> Optional[float]:
+        """Milliseconds until the next queued action can go, or None if idle."""
+        waits = [self.limiter.wait_ms(ep) for ep in self._endpoints()]
+        return min(waits) if waits else None
+
+    def report(self, endpoint: str, body: dict, status: int, payload) -> None:
+        """Feed a response back: 429s and cast cooldowns requeue the action."""
+        payload = payload if isinstance(payload, dict) else {}
+        retry = None
+        if status == 429:
+            retry = payload.get("retryInMs") or None
+            self.limiter.note_retry(endpoint, retry)
+        elif endpoint == "cast":
+            result = payload.get("result") if isinstance(payload.get("result"), dict) else {}
+            if result.get("reason") == "cooldown":
+                retry = result.get("retryInMs") or None
+                self.limiter.note_retry(endpoint, retry)
+            else:
+                return
+        else:
+            return
+
+        q = self._pending.setdefault(endpoint, [])
+        if endpoint in COALESCE and q:
+            # A newer target was submitted meanwhile; that one wins.
+            return
+        if len(q) >= self.max_queue:
+            # Same bound as `submit`: the requeued action is the oldest, so it is the one dropped.
+            self.counters["dropped"] += 1
+            return
+        q.insert(0, body)
+        self._order.setdefault(endpoint, 0)
+        self.counters["requeued"] += 1
+
+    def pump(self, send: Callable[[str, dict], Tuple[int, dict]], max_sends: Optional[int] = None) -> List[Tuple[str, int, dict]]:
+        """Sync helper: send everything due via `send(endpoint, body) -> (status, payload)`."""
+        results = []
+        for ep, body in self.due(max_sends=max_sends):
+            st, payload = send(ep, body)
+            self.report(ep, body, st, payload)
+            results.append((ep, st, payload))
+        return results
+
+    def run_until(self, deadline_ms: float, send: Callable[[str, dict], Tuple[int, dict]], sleep: Callable[[float], None] = time.sleep) -> List[Tuple[str, int, dict]]:
+        """Keep pumping (sleeping between tokens) until `deadline_ms` on the limiter clock."""
+        results = self.pump(send)
+        while True:
+            now = self.limiter.clock()
+            if now >= deadline_ms:
+                return results
+            nxt = self.next_due_ms()
+            wait = deadline_ms - now if nxt is None else min(max(nxt, 1.0), deadline_ms - now)
+            sleep(wait / 1000.0)
+            results.extend(self.pump(send))
@@ -0,0 +1,525 @@
+#!/usr/bin/env python3
+"""
+Binary session recorder + memory-mapped replay.
+
+Every snapshot the agent acts on (`you`, `players`, `monsters`, `drops`) is
+appended together with the actions `decide` returned, so policy changes can
+be evaluated offline against real sessions instead of live runs:
+
+    rec = Recorder("runs/bot1")                      # bot.py --record runs/bot1
+    policy = rec.wrap(decide)                        # records (snap, actions) per call
+    ...
+    rec.close()
+
+    rp = Replay("runs/bot1")
+    len(rp), rp[123].snapshot, rp[-1].actions
+    for tick in rp.iter(start=rp.seek_time(t0)): ...
+
+Three append-only files, written in this order so a crash leaves at most an
+unindexed tail (trimmed on the next open):
+
+  <base>.str   string table: u32 length + UTF-8 bytes per string; string 0 is
+               None, every id/name/colour/endpoint is stored once
+  <base>.dat   one block per tick: TICK header, then the struct arrays
+               you (0/1) | players | monsters | drops (ENTITY) | actions (ACTION)
+  <base>.idx   IDX entry per tick (block offset, time), for O(1) seeks and
+               bisecting by time
+
+The reader maps all three with mmap and decodes a tick only when it is
+accessed, so millions of ticks can be iterated or sampled without loading
+them. `Replay.entities(i, kind)` yields raw struct tuples for scans that do
+not need dicts.
+
+CLI:
+    python3 examples/python-agent/recorder.py info runs/bot1
+    python3 examples/python-agent/recorder.py eval runs/bot1 [--start 0] [--count 100000]
+        replays bot.decide over the recording and reports how often it agrees
+        with the recorded actions
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import math
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+MAGIC_DAT = b"CTRD0001"
+MAGIC_IDX = b"CTRI0001"
+MAGIC_STR = b"CTRS0001"
+
+# t, world version (-1: none), flags (bit 0: has you), players, monsters, drops, actions
+TICK = struct.Struct("<dqI4H")
+# id, s1, s2, s3 (string refs), x, y (float32), i1, i2, i3, flags (bit 0: alive, bit 1: has alive)
+ENTITY = struct.Struct("<4I2f3iI")
+# endpoint, string key, x, y (NaN: absent), string value, JSON of any other keys (string refs)
+ACTION = struct.Struct("<2I2d2I")
+IDX = struct.Struct("<Qd")
+STRLEN = struct.Struct("<I")
+
+KINDS = ("players", "monsters", "drops")
+# Which snapshot keys land in the three string slots and three int slots, per kind.
+STR_FIELDS = {
+    "players": ("name", "partyId", "job"),
+    "monsters": ("kind", "name", "color"),
+    "drops": ("itemId", "name", "rarity"),
+}
+INT_FIELDS = {
+    "players": ("hp", "maxHp", "level"),
+    "monsters": ("hp", "maxHp", None),
+    "drops": ("qty", None, None),
+}
+MAX_COUNT = 0xFFFF
+I32 = (-(2**31), 2**31 - 1)
+
+
+def _i32(v) -> int:
+    try:
+        return max(I32[0], min(I32[1], int(v or 0)))
+    except (TypeError, ValueError):
+        return 0
+
+
+def _f(v) -> float:
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return math.nan
+
+
+def _paths(base: str) -> Tuple[str, str, str]:
+    return base + ".dat", base + ".idx", base + ".str"
+
+
+def _tick_size(n_you: int, n_ent: int, n_act: int) -> int:
+    return TICK.size + (n_you + n_ent) * ENTITY.size + n_act * ACTION.size
+
+
+def _trusted_ticks(n: int, offset_of: Callable[[int], int], head_at: Callable[[int], bytes], dat_len: int) -> Tuple[int, int]:
+    """
+    Scan the index back from entry `n - 1` to the last entry that points at a
+    complete tick block past the data header and after the previous entry's
+    block (a zero-filled tail left by a crash fails this). Returns the number
+    of trusted entries and where that block ends.
+    """
+    while n > 0:
+        off = offset_of(n - 1)
+        prev = offset_of(n - 2) if n > 1 else -1
+        if off >= len(MAGIC_DAT) and off > prev and off + TICK.size <= dat_len:
+            _, _, flags, np_, nm, nd, na = TICK.unpack(head_at(off))
+            end = off + _tick_size(flags & 1, np_ + nm + nd, na)
+            if end <= dat_len:
+                return n, end
+        n -= 1
+    return 0, len(MAGIC_DAT)
+
+
+class Recorder:
+    """Append-only writer. Reopening an existing recording continues it."""
+
+    def __init__(self, base: str, flush_every: int = 64):
+        self.base = base
+        self.flush_every = max(1, int(flush_every))
+        self.ticks = 0
+        self._strings: Dict[str, int] = {}
+        self._pending = 0
+        self._new_strings = False
+        d = os.path.dirname(base)
+        if d:
+            os.makedirs(d, exist_ok=True)
+        dat, idx, strs = _paths(base)
+        self._str = self._open(strs, MAGIC_STR)
+        self._dat = self._open(dat, MAGIC_DAT)
+        self._idx = self._open(idx, MAGIC_IDX)
+        self._recover()
+
+    @staticmethod
+    def _open(path: str, magic: bytes):
+        f = open(path, "a+b")
+        f.seek(0, os.SEEK_END)
+        if f.tell() == 0:
+            f.write(magic)
+        else:
+            f.seek(0)
+            if f.read(len(magic)) != magic:
+                f.close()
+                raise ValueError(f"{path}: not a recorder file")
+            f.seek(0, os.SEEK_END)
+        return f
+
+    def _recover(self) -> None:
+        """Rebuild the intern table and drop anything written after the last complete tick."""
+        self._str.seek(len(MAGIC_STR))
+        data = self._str.read()
+        pos = 0
+        while pos + STRLEN.size <= len(data):
+            (n,) = STRLEN.unpack_from(data, pos)
+            if pos + STRLEN.size + n > len(data):
+                break
+            s = data[pos + STRLEN.size : pos + STRLEN.size + n].decode("utf-8")
+            self._strings[s] = len(self._strings) + 1
+            pos += STRLEN.size + n
+        self._str.truncate(len(MAGIC_STR) + pos)
+
+        def offset_of(i: int) -> int:
+            self._idx.seek(len(MAGIC_IDX) + i * IDX.size)
+            return IDX.unpack(self._idx.read(IDX.size))[0]
+
+        def head_at(off: int) -> bytes:
+            self._dat.seek(off)
+            return self._dat.read(TICK.size)
+
+        self._idx.seek(0, os.SEEK_END)
+        n = (self._idx.tell() - len(MAGIC_IDX)) // IDX.size
+        self._dat.seek(0, os.SEEK_END)
+        n, end = _trusted_ticks(n, offset_of, head_at, self._dat.tell())
+        self._idx.truncate(len(MAGIC_IDX) + n * IDX.size)
+        self._dat.truncate(end)
+        self._dat.seek(0, os.SEEK_END)
+        self._idx.seek(0, os.SEEK_END)
+        self._str.seek(0, os.SEEK_END)
+        self.ticks = n
+
+    def _s(self, v) -> int:
+        if v is None:
+            return 0
+        s = v if isinstance(v, str) else str(v)
+        ref = self._strings.get(s)
+        if ref is None:
+            b = s.encode("utf-8")
+            self._str.write(STRLEN.pack(len(b)) + b)
+            ref = self._strings[s] = len(self._strings) + 1
+            self._new_strings = True
+        return ref
+
+    def _entity(self, kind: str, e: dict) -> bytes:
+        s1, s2, s3 = (self._s(e.get(k)) for k in STR_FIELDS[kind])
+        i1, i2, i3 = (_i32(e.get(k)) if k else 0 for k in INT_FIELDS[kind])
+        flags = 0
+        if "alive" in e:
+            flags = 2 | (1 if e.get("alive") else 0)
+        return ENTITY.pack(self._s(e.get("id")), s1, s2, s3, _f(e.get("x")), _f(e.get("y")), i1, i2, i3, flags)
+
+    def _action(self, endpoint: str, body: dict) -> bytes:
+        body = dict(body or {})
+        x = _f(body.pop("x")) if "x" in body else math.nan
+        y = _f(body.pop("y")) if "y" in body else math.nan
+        key = value = 0
+        k = next((k for k, v in body.items() if isinstance(v, str)), None)
+        if k is not None:
+            key, value = self._s(k), self._s(body.pop(k))
+        rest = self._s(json.dumps(body, separators=(",", ":"), sort_keys=True)) if body else 0
+        return ACTION.pack(self._s(endpoint), key, x, y, value, rest)
+
+    def append(self, snap: dict, actions: List[Tuple[str, dict]] = (), t: Optional[float] = None) -> int:
+        """Record one tick; returns its index."""
+        lists = [[e for e in (snap.get(k) or []) if e] for k in KINDS]
+        actions = list(actions or [])
+        if max([len(x) for x in lists] + [len(actions)]) > MAX_COUNT:
+            raise ValueError(f"more than {MAX_COUNT} entities or actions in one tick")
+        you = snap.get("you")
+        v = snap.get("version")
+        parts = [
+            TICK.pack(
+                time.time() if t is None else float(t),
+                int(v) if isinstance(v, (int, float)) else -1,
+                1 if you else 0,
+                *(len(x) for x in lists),
+                len(actions),
+            )
+        ]
+        if you:
+            parts.append(self._entity("players", you))
+        for kind, items in zip(KINDS, lists):
+            parts.extend(self._entity(kind, e) for e in items)
+        parts.extend(self._action(ep, body) for ep, body in actions)
+
+        if self._new_strings:
+            # A tick must never reach the disk before the strings it refers to.
+            self._str.flush()
+            self._new_strings = False
+        off = self._dat.tell()
+        self._dat.write(b"".join(parts))
+        self._pending += 1
+        if self._pending >= self.flush_every:
+            self.flush()
+        self._idx.write(IDX.pack(off, struct.unpack_from("<d", parts[0])[0]))
+        self.ticks += 1
+        return self.ticks - 1
+
+    def wrap(self, policy: Callable) -> Callable:
+        """`decide`-shaped policy that records each (snapshot, actions) it produces."""
+
+        def recorded(snap, state, now):
+            actions = policy(snap, state, now)
+            self.append(snap, actions, t=now)
+            return actions
+
+        return recorded
+
+    def flush(self) -> None:
+        # Strings and tick blocks reach the disk before the index entries that point at them.
+        self._str.flush()
+        self._dat.flush()
+        self._idx.flush()
+        self._pending = 0
+
+    def close(self) -> None:
+        self.flush()
+        for f in (self._str, self._dat, self._idx):
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class Tick:
+    """One recorded tick; entities and actions are decoded on first access."""
+
+    __slots__ = ("replay", "index", "t", "version", "_off", "_counts", "_has_you", "_snap", "_actions")
+
+    def __init__(self, replay: "Replay", index: int, off: int):
+        self.replay = replay
+        self.index = index
+        self._off = off
+        t, v, flags, np_, nm, nd, na = TICK.unpack_from(replay._dat, off)
+        self.t = t
+        self.version = None if v < 0 else v
+        self._has_you = flags & 1
+        self._counts = (np_, nm, nd, na)
+        self._snap = None
+        self._actions = None
+
+    @property
+    def snapshot(self) -> dict:
+        """Same shape as the merged `/api/bot/world` snapshot (recorded fields only)."""
+        if self._snap is None:
+            rp = self.replay
+            pos = self._off + TICK.size
+            snap: Dict[str, object] = {"version": self.version, "you": None}
+            if self._has_you:
+                snap["you"] = rp._decode("players", ENTITY.unpack_from(rp._dat, pos))
+                pos += ENTITY.size
+            for kind, n in zip(KINDS, self._counts):
+                snap[kind] = [rp._decode(kind, rec) for rec in ENTITY.iter_unpack(rp._dat[pos : pos + n * ENTITY.size])]
+                pos += n * ENTITY.size
+            self._snap = snap
+        return self._snap
+
+    @property
+    def actions(self) -> List[Tuple[str, dict]]:
+        if self._actions is None:
+            rp = self.replay
+            np_, nm, nd, na = self._counts
+            pos = self._off + TICK.size + (self._has_you + np_ + nm + nd) * ENTITY.size
+            out = []
+            for ep, key, x, y, value, rest in ACTION.iter_unpack(rp._dat[pos : pos + na * ACTION.size]):
+                body = json.loads(rp.string(rest)) if rest else {}
+                if not math.isnan(x):
+                    body["x"] = x
+                if not math.isnan(y):
+                    body["y"] = y
+                if key:
+                    body[rp.string(key)] = rp.string(value)
+                out.append((rp.string(ep), body))
+            self._actions = out
+        return self._actions
+
+
+class Replay:
+    """Read-only, memory-mapped view of a recording. Call `refresh()` to pick up ticks appended since opening."""
+
+    def __init__(self, base: str):
+        self.base = base
+        self._dat = self._idx = self._str = None
+        self._maps = ()
+        self._files = [open(p, "rb") for p in _paths(base)]
+        for f, magic in zip(self._files, (MAGIC_DAT, MAGIC_IDX, MAGIC_STR)):
+            if f.read(len(magic)) != magic:
+                self.close()
+                raise ValueError(f"{f.name}: not a recorder file")
+        self._str_offsets: List[int] = [0]
+        self._str_scan = len(MAGIC_STR)
+        self._str_cache: Dict[int, str] = {}
+        self.refresh()
+
+    def refresh(self) -> int:
+        self._release()
+        dat, idx, strs = (mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) for f in self._files)
+        self._dat, self._idx, self._str = memoryview(dat), memoryview(idx), memoryview(strs)
+        self._maps = (dat, idx, strs)
+        n = (len(self._idx) - len(MAGIC_IDX)) // IDX.size
+        # An index entry is only trusted once its tick block is fully on disk.
+        n, _ = _trusted_ticks(n, lambda i: self._entry(i)[0], lambda off: self._dat[off : off + TICK.size], len(self._dat))
+        self._n = n
+        return n
+
+    def _release(self) -> None:
+        for view in (self._dat, self._idx, self._str):
+            if view is not None:
+                view.release()
+        for m in self._maps:
+            m.close()
+        self._maps = ()
+        self._dat = self._idx = self._str = None
+
+    def close(self) -> None:
+        self._release()
+        for f in self._files:
+            f.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self) -> int:
+        return self._n
+
+    def _entry(self, i: int) -> Tuple[int, float]:
+        return IDX.unpack_from(self._idx, len(MAGIC_IDX) + i * IDX.size)
+
+    def __getitem__(self, i: int) -> Tick:
+        if i < 0:
+            i += self._n
+        if not 0 <= i < self._n:
+            raise IndexError(i)
+        return Tick(self, i, self._entry(i)[0])
+
+    def __iter__(self) -> Iterator[Tick]:
+        return self.iter()
+
+    def iter(self, start: int = 0, stop: Optional[int] = None, step: int = 1) -> Iterator[Tick]:
+        for i in range(*slice(start, stop, step).indices(self._n)):
+            yield self[i]
+
+    def time(self, i: int) -> float:
+        return self._entry(i)[1]
+
+    def seek_time(self, t: float) -> int:
+        """Index of the first tick recorded at or after `t` (bisect over the mapped index)."""
+
+        class _Times:
+            def __len__(_):
+                return self._n
+
+            def __getitem__(_, i):
+                return self._entry(i)[1]
+
+        return bisect.bisect_left(_Times(), t)
+
+    def string(self, ref: int) -> Optional[str]:
+        if ref == 0:
+            return None
+        s = self._str_cache.get(ref)
+        if s is not None:
+            return s
+        while len(self._str_offsets) <= ref:
+            # String records are variable length: scan forward once, remembering offsets.
+            if self._str_scan + STRLEN.size > len(self._str):
+                raise IndexError(f"string {ref} not in table")
+            self._str_offsets.append(self._str_scan)
+            (n,) = STRLEN.unpack_from(self._str, self._str_scan)
+            self._str_scan += STRLEN.size + n
+        pos = self._str_offsets[ref]
+        (n,) = STRLEN.unpack_from(self._str, pos)
+        s = self._str_cache[ref] = bytes(self._str[pos + STRLEN.size : pos + STRLEN.size + n]).decode("utf-8")
+        return s
+
+    def entities(self, i: int, kind: str) -> Iterator[tuple]:
+        """Raw ENTITY tuples of one kind ("you" too) at tick `i`, without building dicts."""
+        tick = self[i]
+        pos = tick._off + TICK.size
+        if kind == "you":
+            return ENTITY.iter_unpack(self._dat[pos : pos + tick._has_you * ENTITY.size])
+        pos += tick._has_you * ENTITY.size
+        for k, n in zip(KINDS, tick._counts):
+            if k == kind:
+                return ENTITY.iter_unpack(self._dat[pos : pos + n * ENTITY.size])
+            pos += n * ENTITY.size
+        raise KeyError(kind)
+
+    def _decode(self, kind: str, rec: tuple) -> dict:
+        eid, s1, s2, s3, x, y, i1, i2, i3, flags = rec
+        e = {"id": self.string(eid), "x": x, "y": y}
+        for k, ref in zip(STR_FIELDS[kind], (s1, s2, s3)):
+            e[k] = self.string(ref)
+        for k, v in zip(INT_FIELDS[kind], (i1, i2, i3)):
+            if k:
+                e[k] = v
+        if flags & 2:
+            e["alive"] = bool(flags & 1)
+        return e
+
+
+def _same_action(a: Tuple[str, dict], b: Tuple[str, dict]) -> bool:
+    # Entity positions are stored as float32 (the server sends whole pixels), so compare numbers loosely.
+    if a[0] != b[0] or a[1].keys() != b[1].keys():
+        return False
+    for k, v in a[1].items():
+        w = b[1][k]
+        if isinstance(v, (int, float)) and isinstance(w, (int, float)):
+            if not math.isclose(v, w, rel_tol=1e-6, abs_tol=1e-6):
+                return False
+        elif v != w:
+            return False
+    return True
+
+
+def evaluate(rp: Replay, policy: Callable, state, start: int = 0, count: Optional[int] = None) -> dict:
+    """
+    Run a `decide`-shaped policy over recorded ticks (recorded time as `now`)
+    and compare its (endpoint, body) pairs with what was recorded.
+    """
+    stop = None if count is None else start + count
+    out = {"ticks": 0, "recorded": 0, "proposed": 0, "same": 0, "endpoints": {}}
+    for tick in rp.iter(start, stop):
+        got = policy(tick.snapshot, state, tick.t)
+        want = tick.actions
+        out["ticks"] += 1
+        out["recorded"] += len(want)
+        out["proposed"] += len(got)
+        for ep, body in got:
+            c = out["endpoints"].setdefault(ep, {"proposed": 0, "same": 0})
+            c["proposed"] += 1
+            if any(_same_action((ep, body), w) for w in want):
+                c["same"] += 1
+                out["same"] += 1
+    return out
+
+
+def main(argv: List[str]) -> int:
+    if len(argv) < 3 or argv[1] not in ("info", "eval"):
+        print("Usage: python3 examples/python-agent/recorder.py info|eval <base> [--start N] [--count N]", file=sys.stderr)
+        return 2
+    opts = {"--start": 0, "--count": None}
+    i = 3
+    while i < len(argv):
+        if argv[i] in opts and i + 1 < len(argv):
+            opts[argv[i]] = int(argv[i + 1])
+            i += 1
+        i += 1
+    with Replay(argv[2]) as rp:
+        if argv[1] == "info":
+            sizes = {p: os.path.getsize(p) for p in _paths(argv[2])}
+            span = (rp.time(len(rp) - 1) - rp.time(0)) if len(rp) else 0.0
+            print(json.dumps({"ticks": len(rp), "seconds": round(span, 3), "bytes": sizes}, indent=1))
+            return 0
+        from bot import AgentState, decide
+
+        res = evaluate(rp, decide, AgentState(), start=opts["--start"], count=opts["--count"])
+        print(json.dumps(res, indent=1))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Local map / minimap PNGs from a `/api/bot/world` snapshot.
+
+Same pictures as `GET /api/bot/map.png` and `GET /api/bot/minimap.png`, but
+drawn here instead of on the server, which renders them pixel by pixel on its
+only thread and allows just two renders at a time (503 otherwise). A bot that
+already holds a merged snapshot can produce status images without touching
+those endpoints:
+
+    from render import render_map, render_minimap
+    png = render_map(snap, w=960, h=576)       # bytes, image/png
+    png = render_minimap(snap)                 # 480x288 by default
+
+Rasterization is vectorized with NumPy (rect fills are slice assignments;
+runs of same-sized, same-coloured dots are one fancy-index write of a disk
+stencil) and encoding uses Pillow. Both are imported on first use, so the
+rest of the agent stays stdlib-only. Drawing order and the server's rounding
+(`Math.floor` edges, `Math.round` centres, overwrite instead of blend) are
+kept, so the output matches the server's pixels.
+
+CLI (snapshot as saved JSON, either the bare snapshot or the whole reply):
+    python3 examples/python-agent/render.py world.json map.png [--minimap] [--w 960] [--h 576]
+"""
+
+from __future__ import annotations
+
+import io
+import json
+import math
+import re
+import sys
+from typing import Dict, List, Optional, Sequence, Tuple
+
+Rgba = Tuple[int, int, int, int]
+
+# Server's WORLD constants; a snapshot's "world" block overrides them.
+WORLD = {"width": 30, "height": 18, "tileSize": 32}
+
+GRASS: Rgba = (114, 201, 112, 255)
+GRASS_DARK: Rgba = (106, 192, 104, 255)
+PATH: Rgba = (217, 179, 118, 255)
+PLAZA: Rgba = (245, 230, 204, 255)
+POND: Rgba = (61, 148, 199, 220)
+DROP: Rgba = (250, 220, 90, 255)
+MONSTER_DEFAULT = (250, 200, 90, 1.0)
+HP_BACK: Rgba = (20, 40, 20, 180)
+HP_FILL: Rgba = (74, 209, 92, 220)
+YOU: Rgba = (255, 156, 69, 255)
+YOU_RING: Rgba = (255, 240, 220, 70)
+OTHER_MINIMAP: Rgba = (28, 100, 230, 220)
+OTHER_MAP: Rgba = (28, 100, 230, 230)
+
+_RGBA_RE = re.compile(r"^rgba?\(\s*(\d+)\s*,\s*(\d+)\s*,\s*(\d+)(?:\s*,\s*([0-9.]+)\s*)?\)$", re.I)
+
+_np = None
+_stencils: Dict[int, tuple] = {}
+
+
+def _numpy():
+    global _np
+    if _np is None:
+        try:
+            import numpy
+        except ImportError:
+            raise RuntimeError("render.py needs numpy and Pillow (pip install numpy pillow)") from None
+        _np = numpy
+    return _np
+
+
+def _clamp(v, lo, hi):
+    return max(lo, min(hi, v))
+
+
+def _js_round(v: float) -> int:
+    return math.floor(v + 0.5)
+
+
+def _dim(v, default: int, lo: int, hi: int) -> int:
+    try:
+        f = float(v)
+    except (TypeError, ValueError):
+        f = 0.0
+    if not f or math.isnan(f):
+        f = default
+    return _clamp(math.floor(f), lo, hi)
+
+
+def _alpha(a) -> int:
+    # Server: clamp(Math.floor(Number(a) || 255), 0, 255), so alpha 0 means opaque.
+    return _clamp(math.floor(float(a or 0) or 255), 0, 255)
+
+
+def parse_rgba(s) -> Optional[Tuple[int, int, int, float]]:
+    m = _RGBA_RE.match(str(s or "").strip())
+    if not m:
+        return None
+    r, g, b = (_clamp(int(m.group(i)), 0, 255) for i in (1, 2, 3))
+    try:
+        a = 1.0 if m.group(4) is None else _clamp(float(m.group(4)), 0.0, 1.0)
+    except ValueError:
+        return None
+    return r, g, b, a
+
+
+def _monster_rgba(m: dict) -> Rgba:
+    r, g, b, a = parse_rgba(m.get("color")) or MONSTER_DEFAULT
+    return r, g, b, _js_round(a * 255)
+
+
+class Canvas:
+    """RGBA pixel buffer with the server's two primitives (both overwrite, no blending)."""
+
+    def __init__(self, width: int, height: int):
+        np = _numpy()
+        self.width = width
+        self.height = height
+        self.px = np.empty((height, width, 4), dtype=np.uint8)
+
+    def fill_rect(self, x0: float, y0: float, w: float, h: float, rgba: Rgba) -> None:
+        x1 = _clamp(math.floor(x0 + w), 0, self.width)
+        y1 = _clamp(math.floor(y0 + h), 0, self.height)
+        xs = _clamp(math.floor(x0), 0, self.width)
+        ys = _clamp(math.floor(y0), 0, self.height)
+        if xs < x1 and ys < y1:
+            self.px[ys:y1, xs:x1] = (*rgba[:3], _alpha(rgba[3]))
+
+    def dots(self, cx: Sequence[int], cy: Sequence[int], radius: float, rgba: Rgba) -> None:
+        """Filled disks (dx*dx + dy*dy <= r*r) at integer centres, all in one write."""
+        np = _numpy()
+        if not len(cx):
+            return
+        r = max(1, math.floor(radius or 1))
+        dy, dx = _stencil(r)
+        ys = (np.asarray(cy, dtype=np.int64)[:, None] + dy).ravel()
+        xs = (np.asarray(cx, dtype=np.int64)[:, None] + dx).ravel()
+        keep = (xs >= 0) & (xs < self.width) & (ys >= 0) & (ys < self.height)
+        self.px[ys[keep], xs[keep]] = (*rgba[:3], _alpha(rgba[3]))
+
+    def dot(self, cx: int, cy: int, radius: float, rgba: Rgba) -> None:
+        self.dots((cx,), (cy,), radius, rgba)
+
+    def png(self, compress_level: int = 6) -> bytes:
+        from PIL import Image
+
+        buf = io.BytesIO()
+        Image.fromarray(self.px, "RGBA").save(buf, "PNG", compress_level=compress_level)
+        return buf.getvalue()
+
+
+def _stencil(r: int):
+    st = _stencils.get(r)
+    if st is None:
+        np = _numpy()
+        dy, dx = np.mgrid[-r : r + 1, -r : r + 1]
+        inside = dx * dx + dy * dy <= r * r
+        st = _stencils[r] = (dy[inside][None, :], dx[inside][None, :])
+    return st
+
+
+def _draw_runs(cv: Canvas, marks: List[Tuple[int, int, float, Rgba]]) -> None:
+    """Draw (x, y, radius, rgba) dots in order, batching consecutive marks that share radius and colour."""
+    i = 0
+    while i < len(marks):
+        key = marks[i][2:]
+        j = i + 1
+        while j < len(marks) and marks[j][2:] == key:
+            j += 1
+        run = marks[i:j]
+        cv.dots([m[0] for m in run], [m[1] for m in run], key[0], key[1])
+        i = j
+
+
+def _pos(e: dict, sx: float, sy: float) -> Optional[Tuple[int, int]]:
+    try:
+        return _js_round(float(e["x"]) * sx), _js_round(float(e["y"]) * sy)
+    except (KeyError, TypeError, ValueError):
+        return None  # the server's NaN centre draws nothing either
+
+
+def _world(snapshot: dict) -> dict:
+    w = (snapshot or {}).get("world") or {}
+    return {k: int(w.get(k) or v) for k, v in WORLD.items()}
+
+
+def _landmarks(cv: Canvas, world: dict, sx: float, sy: float, pond_r: int) -> None:
+    t = world["tileSize"]
+    path_y = 9 * t
+    cv.fill_rect(0, (path_y - 10) * sy, cv.width, 20 * sy, PATH)
+    path_x = 15 * t
+    cv.fill_rect((path_x - 10) * sx, 0, 20 * sx, cv.height, PATH)
+    cv.fill_rect(13 * t * sx, 7 * t * sy, 4 * t * sx, 4 * t * sy, PLAZA)
+    cv.dot(_js_round(22 * t * sx), _js_round(13 * t * sy), pond_r, POND)
+
+
+def _checker(cv: Canvas, world: dict, sx: float, sy: float) -> None:
+    """Darker grass on tiles with even tx + ty (the server's per-tile fill, as two span masks)."""
+    np = _numpy()
+    t = world["tileSize"]
+
+    def spans(n_tiles: int, scale: float, size: int):
+        # pixel -> covered by an even tile / an odd tile, with the server's floor/clamp edges
+        start = np.arange(n_tiles, dtype=np.float64) * t * scale
+        lo = np.clip(np.floor(start), 0, size).astype(np.int64)
+        hi = np.clip(np.floor(start + t * scale), 0, size).astype(np.int64)
+        cover = np.zeros((2, size + 1), dtype=np.int32)
+        parity = np.arange(n_tiles) % 2
+        np.add.at(cover, (parity, lo), 1)
+        np.add.at(cover, (parity, hi), -1)
+        return np.cumsum(cover, axis=1)[:, :size] > 0
+
+    cols = spans(world["width"], sx, cv.width)
+    rows = spans(world["height"], sy, cv.height)
+    mask = (rows[0][:, None] & cols[0][None, :]) | (rows[1][:, None] & cols[1][None, :])
+    cv.px[mask] = GRASS_DARK
+
+
+def _setup(snapshot: dict, w, h, default_w: int, default_h: int, lo: Tuple[int, int], hi: int):
+    world = _world(snapshot)
+    width = _dim(w, default_w, lo[0], hi)
+    height = _dim(h, default_h, lo[1], hi)
+    cv = Canvas(width, height)
+    sx = width / (world["width"] * world["tileSize"])
+    sy = height / (world["height"] * world["tileSize"])
+    return world, cv, sx, sy
+
+
+def _you_id(snapshot: dict, you: Optional[dict]):
+    you = you if you is not None else (snapshot or {}).get("you")
+    return you.get("id") if you else None
+
+
+def render_minimap(snapshot: dict, you: Optional[dict] = None, w=None, h=None) -> bytes:
+    """Port of the server's renderMinimapPng. `you` defaults to `snapshot["you"]`."""
+    world, cv, sx, sy = _setup(snapshot, w, h, 480, 288, (180, 120), 1024)
+    cv.px[:] = GRASS
+    _landmarks(cv, world, sx, sy, max(6, _js_round(38 * sx)))
+
+    marks = []
+    for m in snapshot.get("monsters") or []:
+        pos = m and m.get("alive") and _pos(m, sx, sy)
+        if pos:
+            marks.append((*pos, 3, _monster_rgba(m)))
+    _draw_runs(cv, marks)
+
+    you_id = _you_id(snapshot, you)
+    marks = []
+    for p in snapshot.get("players") or []:
+        pos = p and _pos(p, sx, sy)
+        if not pos:
+            continue
+        is_you = you_id is not None and p.get("id") == you_id
+        marks.append((*pos, 5 if is_you else 3, YOU if is_you else OTHER_MINIMAP))
+    _draw_runs(cv, marks)
+    return cv.png()
+
+
+def render_map(snapshot: dict, you: Optional[dict] = None, w=None, h=None) -> bytes:
+    """Port of the server's renderMapPng (map-only screenshot, defaults to the world's pixel size)."""
+    world0 = _world(snapshot)
+    world_w, world_h = world0["width"] * world0["tileSize"], world0["height"] * world0["tileSize"]
+    world, cv, sx, sy = _setup(snapshot, w, h, world_w, world_h, (320, 240), 2048)
+    k = min(sx, sy)
+    cv.px[:] = GRASS
+    _checker(cv, world, sx, sy)
+    _landmarks(cv, world, sx, sy, max(16, _js_round(52 * k)))
+
+    s = max(3, _js_round(4 * k))
+    for d in snapshot.get("drops") or []:
+        pos = d and _pos(d, sx, sy)
+        if not pos:
+            continue
+        x, y = pos
+        cv.fill_rect(x - s, y - s, s * 2, s * 2, DROP)
+
+    r = max(8, _js_round(10 * k))
+    bar_w = max(18, _js_round(34 * sx))
+    bar_h = max(3, _js_round(4 * sy))
+    gap = max(2, _js_round(2 * sy))
+    for m in snapshot.get("monsters") or []:
+        pos = m and m.get("alive") and _pos(m, sx, sy)
+        if not pos:
+            continue
+        x, y = pos
+        cv.dot(x, y, r, _monster_rgba(m))
+        hp = max(0.0, float(m.get("hp") or 0))
+        frac = _clamp(hp / max(1.0, float(m.get("maxHp") or 1)), 0.0, 1.0)
+        bx, by = x - bar_w // 2, y - r - bar_h - gap
+        cv.fill_rect(bx, by, bar_w, bar_h, HP_BACK)
+        cv.fill_rect(bx, by, math.floor(bar_w * frac), bar_h, HP_FILL)
+
+    you_id = _you_id(snapshot, you)
+    marks = []
+    for p in snapshot.get("players") or []:
+        pos = p and _pos(p, sx, sy)
+        if not pos:
+            continue
+        x, y = pos
+        if you_id is not None and p.get("id") == you_id:
+            pr = max(9, _js_round(12 * k))
+            marks.append((x, y, pr, YOU))
+            marks.append((x, y, max(1, pr + 4), YOU_RING))
+        else:
+            marks.append((x, y, max(9, _js_round(10 * k)), OTHER_MAP))
+    _draw_runs(cv, marks)
+    return cv.png()
+
+
+def main(argv: List[str]) -> int:
+    args = list(argv[1:])
+    opts = {"w": None, "h": None}
+    minimap = "--minimap" in args
+    if minimap:
+        args.remove("--minimap")
+    for k in ("w", "h"):
+        if f"--{k}" in args:
+            i = args.index(f"--{k}")
+            opts[k] = args[i + 1] if i + 1 < len(args) else None
+            del args[i : i + 2]
+    if len(args) != 2:
+        print("Usage: python3 examples/python-agent/render.py world.json out.png [--minimap] [--w 960] [--h 576]", file=sys.stderr)
+        return 2
+    with open(args[0], "r", encoding="utf-8") as f:
+        doc = json.load(f)
+    snap = doc.get("snapshot", doc) if isinstance(doc, dict) else {}
+    png = (render_minimap if minimap else render_map)(snap, **opts)
+    with open(args[1], "wb") as f:
+        f.write(png)
+    print(f"{args[1]}: {len(png)} bytes")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
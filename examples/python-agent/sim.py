@@ -0,0 +1,582 @@
+#!/usr/bin/env python3
+"""
+Headless, in-process stand-in for the Clawtown bot REST surface.
+
+`SimWorld` reproduces the parts of server/index.js a bot can observe: the
+30x18 tile world, the seven plaza slimes (wandering, 6 s respawn), goal
+movement at the server tick rate (6 px per 100 ms tick), melee/AoE casts with
+the cast cooldown, drops + auto pickup, XP/levels, bot events and the
+per-endpoint `rateLimitBot` buckets. Time is virtual: nothing sleeps, so
+thousands of agent-seconds run per wall-clock second.
+
+`SimClient` has the same `request(method, url, ...)` contract as
+`http_pool.HttpClient`, so `api_json(url, client=SimClient(world))` and any
+policy built on it run unchanged offline.
+
+Usage:
+  python3 examples/python-agent/sim.py [--bots 20] [--seconds 600] [--pollMs 1200] [--seed 1]
+"""
+
+from __future__ import annotations
+
+import heapq
+import json
+import math
+import random
+import sys
+import time
+import urllib.parse
+from typing import Callable, Dict, Optional, Tuple
+
+
+WORLD_W = 30
+WORLD_H = 18
+TILE = 32
+TICK_MS = 100
+
+PLAYER_SPEED = 6
+MONSTER_SPEED = 1.4
+RESPAWN_MS = 6000
+MELEE_RANGE = 120
+PICKUP_R = 22
+DROP_TTL_MS = 45_000
+BOT_EVENT_MAX = 240
+
+# Same table as rateLimitBot() calls in server/index.js (intervalMs, burst).
+SERVER_LIMITS: Dict[str, Tuple[int, int]] = {
+    "world": (250, 6),
+    "status": (250, 6),
+    "goal": (220, 6),
+    "cast": (220, 6),
+    "intent": (500, 3),
+    "chat": (1200, 2),
+    "thought": (2500, 2),
+    "events": (700, 3),
+    "mode": (700, 2),
+}
+
+_SLIMES = [
+    ("m_slime_1", "Poring", 13 * TILE + 28, 9 * TILE + 18, 18),
+    ("m_slime_2", "Drops", 17 * TILE + 18, 9 * TILE + 6, 14),
+    ("m_slime_3", "Poporing", 15 * TILE + 70, 11 * TILE + 18, 20),
+    ("m_slime_4", "Marin", 12 * TILE + 18, 11 * TILE + 26, 16),
+    ("m_slime_5", "Metaling", 18 * TILE + 22, 7 * TILE + 18, 22),
+    ("m_slime_6", "Ghostring", 14 * TILE + 48, 8 * TILE + 12, 17),
+    ("m_slime_7", "Angeling", 16 * TILE + 32, 10 * TILE + 24, 19),
+]
+_SPAWN_POINTS = [
+    (13 * TILE + 24, 9 * TILE + 18),
+    (17 * TILE + 18, 9 * TILE + 6),
+    (15 * TILE + 70, 11 * TILE + 18),
+    (12 * TILE + 18, 11 * TILE + 26),
+    (18 * TILE + 22, 7 * TILE + 18),
+    (14 * TILE + 48, 8 * TILE + 12),
+    (16 * TILE + 32, 10 * TILE + 24),
+]
+
+
+def _clamp(n, lo, hi):
+    return max(lo, min(hi, n))
+
+
+def level_for_xp(xp: int) -> int:
+    level, need, remaining = 1, 10, xp
+    while remaining >= need:
+        remaining -= need
+        level += 1
+        need = 10 + (level - 1) * 5
+        if level >= 50:
+            break
+    return level
+
+
+class SimWorld:
+    def __init__(self, seed: int = 0, start_ms: int = 1_000_000):
+        self.rng = random.Random(seed)
+        self.now_ms = int(start_ms)
+        self._next_tick_ms = self.now_ms + TICK_MS
+        self._seq = 0
+        self.players: Dict[str, dict] = {}
+        self.monsters: Dict[str, dict] = {}
+        self.drops: Dict[str, dict] = {}
+        self.join_codes: Dict[str, str] = {}
+        self.bot_tokens: Dict[str, str] = {}
+        self.ticks = 0
+        self.requests: Dict[str, int] = {}
+        self.rejected: Dict[str, int] = {}
+        for mid, name, x, y, hp in _SLIMES:
+            self.spawn_monster(mid, name, x, y, hp)
+
+    # --- clock ---------------------------------------------------------
+
+    def clock(self) -> float:
+        return float(self.now_ms)
+
+    def advance_to(self, t_ms: float) -> None:
+        t_ms = int(t_ms)
+        while self._next_tick_ms <= t_ms:
+            self.now_ms = self._next_tick_ms
+            self.tick()
+            self._next_tick_ms += TICK_MS
+        self.now_ms = max(self.now_ms, t_ms)
+
+    def advance(self, ms: float) -> None:
+        self.advance_to(self.now_ms + ms)
+
+    def _id(self, prefix: str) -> str:
+        self._seq += 1
+        return f"{prefix}_{self._seq}"
+
+    # --- world setup -------------------------------------------------
+
+    def spawn_monster(self, mid: str, name: str, x: float, y: float, max_hp: int, kind: str = "slime") -> dict:
+        m = {
+            "id": mid,
+            "kind": kind,
+            "name": name,
+            "x": float(x),
+            "y": float(y),
+            "hp": max_hp,
+            "maxHp": max_hp,
+            "alive": True,
+            "respawnAt": None,
+            "vx": self.rng.choice((-1, 1)),
+            "vy": self.rng.choice((-1, 1)),
+            "nextWanderAt": self.now_ms + 500 + self.rng.randrange(1500),
+        }
+        self.monsters[mid] = m
+        return m
+
+    def add_player(self, name: str = "SimBot") -> Tuple[str, str]:
+        """Create a character; returns `(playerId, joinToken)`."""
+        pid = self._id("p")
+        self.players[pid] = {
+            "id": pid,
+            "name": name,
+            "x": float((WORLD_W // 2) * TILE),
+            "y": float((WORLD_H // 2) * TILE),
+            "facing": "down",
+            "mode": "manual",
+            "goal": None,
+            "hp": 30,
+            "maxHp": 30,
+            "level": 1,
+            "xp": 0,
+            "zenny": 0,
+            "inventory": {},
+            "meta": {"kills": 0, "crafts": 0, "pickups": 0},
+            "lastCastAt": 0,
+            "botEvents": [],
+            "botEventSeq": 0,
+            "botThought": {"text": "", "at": 0},
+            "rate": {},
+        }
+        code = f"SIM{self._seq:05d}"
+        self.join_codes[code] = pid
+        return pid, f"CT1|http://sim.local|{code}"
+
+    # --- simulation --------------------------------------------------
+
+    def tick(self) -> None:
+        self.ticks += 1
+        t = self.now_ms
+        for m in self.monsters.values():
+            if not m["alive"]:
+                if m["respawnAt"] and t >= m["respawnAt"]:
+                    m["alive"] = True
+                    m["hp"] = m["maxHp"]
+                    m["respawnAt"] = None
+                    m["x"], m["y"] = map(float, self.rng.choice(_SPAWN_POINTS))
+                continue
+            if m["kind"] == "elite":
+                continue
+            if t >= m["nextWanderAt"]:
+                r = self.rng.random()
+                if r < 0.33:
+                    m["vx"] = self.rng.choice((-1, 1))
+                if r > 0.66:
+                    m["vy"] = self.rng.choice((-1, 1))
+                m["nextWanderAt"] = t + 700 + self.rng.randrange(1400)
+            m["x"] += m["vx"] * MONSTER_SPEED
+            m["y"] += m["vy"] * MONSTER_SPEED
+            if m["x"] < TILE:
+                m["x"], m["vx"] = float(TILE), 1
+            if m["x"] > (WORLD_W - 2) * TILE:
+                m["x"], m["vx"] = float((WORLD_W - 2) * TILE), -1
+            if m["y"] < TILE:
+                m["y"], m["vy"] = float(TILE), 1
+            if m["y"] > (WORLD_H - 2) * TILE:
+                m["y"], m["vy"] = float((WORLD_H - 2) * TILE), -1
+
+        for did in [d for d, v in self.drops.items() if t > v["expiresAt"]]:
+            del self.drops[did]
+
+        max_x = (WORLD_W - 1) * TILE
+        max_y = (WORLD_H - 1) * TILE
+        for p in self.players.values():
+            g = p["goal"]
+            if p["mode"] == "agent" and g:
+                dx = g[0] - p["x"]
+                dy = g[1] - p["y"]
+                sx = dx if abs(dx) <= PLAYER_SPEED else math.copysign(PLAYER_SPEED, dx)
+                sy = dy if abs(dy) <= PLAYER_SPEED else math.copysign(PLAYER_SPEED, dy)
+                if abs(dx) > abs(dy):
+                    p["facing"] = "right" if sx > 0 else "left"
+                elif dy != 0:
+                    p["facing"] = "down" if sy > 0 else "up"
+                p["x"] = _clamp(p["x"] + sx, 0, max_x)
+                p["y"] = _clamp(p["y"] + sy, 0, max_y)
+                if abs(dx) <= PLAYER_SPEED and abs(dy) <= PLAYER_SPEED:
+                    p["goal"] = None
+                    self._gain_xp(p, 1, event=False)
+            self._auto_pickup(p)
+
+    def _push_event(self, p: dict, kind: str, text: str, data=None, important: bool = False) -> None:
+        p["botEventSeq"] += 1
+        p["botEvents"].append(
+            {"id": p["botEventSeq"], "at": self.now_ms, "kind": kind, "text": text, "important": important, "data": data}
+        )
+        if len(p["botEvents"]) > BOT_EVENT_MAX:
+            del p["botEvents"][: len(p["botEvents"]) - BOT_EVENT_MAX]
+
+    def _gain_xp(self, p: dict, xp: int, event: bool = True, heal: bool = False) -> None:
+        p["xp"] += xp
+        lvl = level_for_xp(p["xp"])
+        if lvl > p["level"]:
+            p["level"] = lvl
+            max_hp = 30 + (lvl - 1) * 2
+            p["hp"] = min(max_hp, p["hp"] + max_hp - p["maxHp"])
+            p["maxHp"] = max_hp
+            if heal:
+                p["hp"] = max_hp
+            if event:
+                self._push_event(p, "level", f"Level up: {lvl}", {"level": lvl}, important=True)
+
+    def _auto_pickup(self, p: dict) -> None:
+        for did, d in list(self.drops.items()):
+            if (d["x"] - p["x"]) ** 2 + (d["y"] - p["y"]) ** 2 > PICKUP_R * PICKUP_R:
+                continue
+            del self.drops[did]
+            inv = p["inventory"]
+            inv[d["itemId"]] = inv.get(d["itemId"], 0) + d["qty"]
+            p["meta"]["pickups"] += 1
+            self._push_event(p, "loot", f"Picked up {d['itemId']}.", {"itemId": d["itemId"], "qty": d["qty"]})
+            self._gain_xp(p, 1)
+
+    def _damage(self, p: dict, m: dict, dmg: int) -> dict:
+        m["hp"] = max(0, m["hp"] - dmg)
+        killed = m["hp"] <= 0
+        if killed:
+            m["alive"] = False
+            m["respawnAt"] = self.now_ms + RESPAWN_MS
+            xp = 30 if m["kind"] == "elite" else 8
+            p["meta"]["kills"] += 1
+            for item, qty in (("zenny", 1 + self.rng.randrange(3)),) + ((("jelly", 1),) if self.rng.random() < 0.55 else ()):
+                did = self._id("drop")
+                self.drops[did] = {
+                    "id": did,
+                    "itemId": item,
+                    "x": _clamp(m["x"] + (self.rng.random() - 0.5) * 16, 0, (WORLD_W - 1) * TILE),
+                    "y": _clamp(m["y"] + (self.rng.random() - 0.5) * 16, 0, (WORLD_H - 1) * TILE),
+                    "qty": qty,
+                    "expiresAt": self.now_ms + DROP_TTL_MS,
+                }
+            self._gain_xp(p, xp, heal=True)
+            self._push_event(p, "kill", f"Defeated {m['name']}. (+{xp} XP)", {"monster": {"id": m["id"], "name": m["name"]}, "xp": xp})
+        return {"ok": True, "dealt": dmg, "hp": m["hp"], "alive": m["alive"], "killed": killed}
+
+    def cast(self, p: dict, spell: str, x=None, y=None) -> dict:
+        s = str(spell or "signature").strip().lower()
+        cd = 520 if s == "flurry" else 700
+        gap = self.now_ms - p["lastCastAt"]
+        if gap < cd:
+            return {"ok": False, "reason": "cooldown", "retryInMs": cd - gap}
+        p["lastCastAt"] = self.now_ms
+        if s in ("fireball", "hail"):
+            cx = float(x) if x is not None else p["x"]
+            cy = float(y) if y is not None else p["y"]
+            radius, base = (130, 5) if s == "fireball" else (150, 4)
+            hits = [
+                self._damage(p, m, base)
+                for m in list(self.monsters.values())
+                if m["alive"] and (m["x"] - cx) ** 2 + (m["y"] - cy) ** 2 <= radius * radius
+            ]
+            return {"ok": True, "spell": s, "hits": len(hits)}
+        # signature / attack (and, in the sim, every single-target skill): nearest within melee range.
+        best, best_d2 = None, MELEE_RANGE * MELEE_RANGE
+        for m in self.monsters.values():
+            if not m["alive"]:
+                continue
+            d2 = (m["x"] - p["x"]) ** 2 + (m["y"] - p["y"]) ** 2
+            if d2 <= best_d2:
+                best, best_d2 = m, d2
+        if best is None:
+            return {"ok": False, "reason": "no target"}
+        out = self._damage(p, best, 2)
+        return {"ok": True, "target": best["id"], "hp": out["hp"], "alive": out["alive"]}
+
+    # --- REST surface ------------------------------------------------
+
+    def _rate_limit(self, p: dict, key: str) -> Optional[int]:
+        """rateLimitBot(): returns retryInMs when rejected, else None."""
+        interval, cap = SERVER_LIMITS[key]
+        st = p["rate"].get(key) or {"tokens": float(cap), "lastAt": self.now_ms}
+        tokens = min(cap, st["tokens"] + max(0, self.now_ms - st["lastAt"]) / interval)
+        if tokens < 1:
+            p["rate"][key] = {"tokens": tokens, "lastAt": self.now_ms}
+            return max(50, int(math.ceil((1 - tokens) * interval)))
+        p["rate"][key] = {"tokens": tokens - 1, "lastAt": self.now_ms}
+        return None
+
+    def _public_player(self, p: dict) -> dict:
+        return {
+            "id": p["id"],
+            "name": p["name"],
+            "x": round(p["x"]),
+            "y": round(p["y"]),
+            "facing": p["facing"],
+            "mode": p["mode"],
+            "hp": p["hp"],
+            "maxHp": p["maxHp"],
+            "level": p["level"],
+            "xp": p["xp"],
+            "xpToNext": 10 + (p["level"] - 1) * 5,
+            "meta": dict(p["meta"]),
+            "partyId": None,
+            "job": "novice",
+            "linkedBot": True,
+            "bot": {"thought": p["botThought"]["text"], "thoughtAt": p["botThought"]["at"] or None},
+        }
+
+    @staticmethod
+    def _public_monster(m: dict) -> dict:
+        return {
+            "id": m["id"],
+            "kind": m["kind"],
+            "name": m["name"],
+            "x": round(m["x"]),
+            "y": round(m["y"]),
+            "hp": m["hp"],
+            "maxHp": m["maxHp"],
+            "alive": m["alive"],
+            "color": None,
+        }
+
+    def handle(self, method: str, path: str, query: Dict[str, str], headers: Dict[str, str], body) -> Tuple[int, dict]:
+        route = path.rsplit("/", 1)[-1]
+        self.requests[route] = self.requests.get(route, 0) + 1
+        body = body if isinstance(body, dict) else {}
+
+        if method == "POST" and path == "/api/bot/link":
+            code = str(body.get("joinCode") or "").strip().upper()
+            if not code and body.get("joinToken"):
+                parts = str(body["joinToken"]).split("|")
+                code = parts[2].strip().upper() if len(parts) == 3 else ""
+            pid = self.join_codes.get(code)
+            if not pid:
+                return 404, {"ok": False, "error": "invalid joinCode"}
+            token = next((t for t, v in self.bot_tokens.items() if v == pid), None) or self._id("ctbot")
+            self.bot_tokens[token] = pid
+            return 200, {"ok": True, "botToken": token, "playerId": pid}
+
+        auth = str(headers.get("Authorization") or headers.get("authorization") or "")
+        p = self.players.get(self.bot_tokens.get(auth[7:].strip() if auth.lower().startswith("bearer ") else "", ""))
+        if p is None:
+            return 401, {"ok": False, "error": "unauthorized"}
+
+        if route in SERVER_LIMITS and path.startswith("/api/bot/"):
+            retry = self._rate_limit(p, route)
+            if retry is not None:
+                self.rejected[route] = self.rejected.get(route, 0) + 1
+                return 429, {"ok": False, "error": "rate limited", "retryInMs": retry}
+
+        if method == "GET" and route == "world":
+            snap = {
+                "world": {"width": WORLD_W, "height": WORLD_H, "tileSize": TILE},
+                "you": self._public_player(p),
+                "players": [self._public_player(pp) for pp in self.players.values()],
+                "monsters": [self._public_monster(m) for m in self.monsters.values()],
+                "drops": [
+                    {"id": d["id"], "itemId": d["itemId"], "x": round(d["x"]), "y": round(d["y"]), "qty": d["qty"], "expiresAt": d["expiresAt"]}
+                    for d in self.drops.values()
+                ],
+                "parties": [],
+                "board": [],
+                "chats": [],
+            }
+            return 200, {"ok": True, "snapshot": snap}
+        if method == "GET" and route in ("me", "status"):
+            return 200, {"ok": True, "player" if route == "me" else "you": self._public_player(p)}
+        if method == "GET" and route == "events":
+            cursor = max(0, int(float(query.get("cursor") or 0)))
+            limit = max(1, min(60, int(float(query.get("limit") or 20))))
+            evs = [e for e in p["botEvents"] if e["id"] > cursor][:limit]
+            return 200, {"ok": True, "events": evs, "nextCursor": max([e["id"] for e in evs], default=cursor)}
+        if method == "POST" and route == "mode":
+            mode = str(body.get("mode") or "").lower()
+            if mode not in ("manual", "agent"):
+                return 400, {"ok": False, "error": "invalid mode"}
+            p["mode"] = mode
+            if mode == "manual":
+                p["goal"] = None
+            return 200, {"ok": True, "player": self._public_player(p)}
+        if method == "POST" and route == "goal":
+            try:
+                x, y = float(body.get("x")), float(body.get("y"))
+            except (TypeError, ValueError):
+                return 400, {"ok": False, "error": "invalid coords"}
+            if not (math.isfinite(x) and math.isfinite(y)):
+                return 400, {"ok": False, "error": "invalid coords"}
+            p["goal"] = (_clamp(x, 0, (WORLD_W - 1) * TILE), _clamp(y, 0, (WORLD_H - 1) * TILE))
+            return 200, {"ok": True}
+        if method == "POST" and route == "cast":
+            return 200, {"ok": True, "result": self.cast(p, body.get("spell"), body.get("x"), body.get("y"))}
+        if method == "POST" and route == "thought":
+            text = str(body.get("text") or "").strip()[:180]
+            if not text:
+                return 400, {"ok": False, "error": "missing text"}
+            p["botThought"] = {"text": text, "at": self.now_ms}
+            self._push_event(p, "thought", text, {"text": text})
+            return 200, {"ok": True, "thoughtAt": self.now_ms}
+        if method == "POST" and route in ("intent", "chat"):
+            return 200, {"ok": True}
+        return 404, {"ok": False, "error": "not found"}
+
+
+class SimClient:
+    """Drop-in for `HttpClient`: routes requests into a `SimWorld` without sockets."""
+
+    def __init__(self, world: SimWorld):
+        self.world = world
+
+    def request(self, method: str, url: str, headers=None, body=None, timeout=None):
+        u = urllib.parse.urlsplit(url)
+        query = dict(urllib.parse.parse_qsl(u.query))
+        # Round-trip through JSON like the real wire, so policies can't share mutable state with the sim.
+        payload = json.loads(json.dumps(body)) if body is not None else None
+        st, out = self.world.handle(method.upper(), u.path or "/", query, dict(headers or {}), payload)
+        return st, json.loads(json.dumps(out))
+
+    def stats(self) -> dict:
+        return {"requests": dict(self.world.requests), "rejected": dict(self.world.rejected)}
+
+    def close(self) -> None:
+        pass
+
+
+def run_policy(
+    world: SimWorld,
+    n_bots: int,
+    seconds: float,
+    poll_ms: int = 1200,
+    decide: Optional[Callable] = None,
+) -> dict:
+    """
+    Run `n_bots` copies of the bot.py loop (world → decide → scheduled actions)
+    in virtual time. Returns per-bot results plus request/429 counts.
+    """
+    from bot import AgentState, api_json, decide as default_decide, link_and_enable_agent
+    from ratelimit import ActionScheduler, RateLimiter
+    from snapshot import SnapshotStore
+
+    decide = decide or default_decide
+    client = SimClient(world)
+    base = "http://sim.local"
+    bots = []
+    for i in range(n_bots):
+        pid, token = world.add_player(f"SimBot{i + 1}")
+        _linked, headers, err = link_and_enable_agent(base, token, client=client)
+        if err:
+            raise RuntimeError(err)
+        sched = ActionScheduler(RateLimiter(clock=world.clock))
+        bots.append({"pid": pid, "headers": headers, "state": AgentState(), "store": SnapshotStore(), "sched": sched})
+
+    start = world.now_ms
+    end = start + seconds * 1000.0
+    # (wake time, tie-breaker, bot index); stagger starts across one poll interval.
+    queue = [(start + world.rng.uniform(0, poll_ms), i, i) for i in range(n_bots)]
+    heapq.heapify(queue)
+    seq = n_bots
+    wall0 = time.perf_counter()
+    while queue:
+        t, _, i = heapq.heappop(queue)
+        if t > end:
+            break
+        world.advance_to(t)
+        b = bots[i]
+        sched = b["sched"]
+        limiter = sched.limiter
+
+        def send(endpoint, body, headers=b["headers"]):
+            return api_json(f"{base}/api/bot/{endpoint}", method="POST", headers=headers, body=body, client=client)
+
+        wait = limiter.wait_ms("world")
+        if wait <= 0:
+            limiter.try_take("world")
+            st, w = api_json(b["store"].world_url(base), headers=b["headers"], client=client)
+            if st == 429:
+                limiter.note_retry("world", w.get("retryInMs"))
+            elif 200 <= st < 300 and w.get("ok"):
+                snap = b["store"].apply(w.get("snapshot") or {})
+                for endpoint, body in decide(snap, b["state"], world.now_ms / 1000.0):
+                    sched.submit(endpoint, body)
+        sched.pump(send)
+
+        nxt = t + max(wait, poll_ms)
+        if sched.pending():
+            nxt = min(nxt, t + max(1.0, sched.next_due_ms() or 0.0))
+        seq += 1
+        heapq.heappush(queue, (nxt, seq, i))
+    world.advance_to(end)
+    wall = time.perf_counter() - wall0
+
+    per_bot = []
+    for b in bots:
+        p = world.players[b["pid"]]
+        per_bot.append({"playerId": b["pid"], "level": p["level"], "xp": p["xp"], "kills": p["meta"]["kills"], "pickups": p["meta"]["pickups"]})
+    return {
+        "bots": n_bots,
+        "simSeconds": seconds,
+        "agentSeconds": n_bots * seconds,
+        "wallSeconds": round(wall, 3),
+        "agentSecondsPerWallSecond": round(n_bots * seconds / wall, 1) if wall > 0 else None,
+        "ticks": world.ticks,
+        "requests": dict(world.requests),
+        "rejected": dict(world.rejected),
+        "kills": sum(x["kills"] for x in per_bot),
+        "xp": sum(x["xp"] for x in per_bot),
+        "perBot": per_bot,
+    }
+
+
+def main(argv):
+    n_bots = 20
+    seconds = 600.0
+    poll_ms = 1200
+    seed = 1
+
+    i = 1
+    while i < len(argv):
+        a = argv[i]
+        if a == "--bots" and i + 1 < len(argv):
+            i += 1
+            n_bots = int(float(argv[i] or "0"))
+        elif a == "--seconds" and i + 1 < len(argv):
+            i += 1
+            seconds = float(argv[i] or "0")
+        elif a == "--pollMs" and i + 1 < len(argv):
+            i += 1
+            poll_ms = int(float(argv[i] or "0"))
+        elif a == "--seed" and i + 1 < len(argv):
+            i += 1
+            seed = int(float(argv[i] or "0"))
+        i += 1
+
+    out = run_policy(SimWorld(seed=seed), max(1, n_bots), max(1.0, seconds), poll_ms=max(100, poll_ms))
+    out.pop("perBot")
+    print(json.dumps(out, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+"""
+Client-side merge for delta world snapshots (`GET /api/bot/world?since=<version>`).
+
+The server stamps every entity with the world version it last changed at. After
+the first full snapshot the agent only asks for what changed since its last
+version and patches its local copy in place:
+
+    store = SnapshotStore()
+    st, w = api_json(store.world_url(base_url), headers=headers)
+    snap = store.apply(w["snapshot"])   # same shape as a full /api/bot/world snapshot
+
+Older servers ignore `since` and always answer with a full snapshot; `apply`
+then simply replaces everything, so the store is safe to use unconditionally.
+
+`SlotStore` is a drop-in variant for large fleets: players, monsters, drops
+and parties are kept as `__slots__` records (ids, kinds, positions as floats,
+HP, alive; strings interned) instead of the server's full dicts, which for
+players carry inventory/stats/equipment. Records answer `.get()` / `[]` with
+the JSON key names, so `decide` and `spatial.WorldIndex` work unchanged.
+Board posts, chats and hat data are dropped unless listed in `keep`, and the
+per-kind lists of the returned view are only built when read.
+`bench_snapshot.py` compares decode time and memory with the dict store.
+"""
+
+from __future__ import annotations
+
+import sys
+from abc import ABC, abstractmethod
+from collections.abc import Mapping
+from typing import Dict, Iterable, List, Optional, Type
+
+
+ENTITY_KINDS = ("players", "monsters", "drops", "parties", "board")
+
+# Same windows the server uses for full snapshots.
+BOARD_KEEP = 20
+CHATS_KEEP = 25
+RAW_SECTIONS = ("board", "chats", "hat")
+
+
+class SnapshotStore:
+    keep = frozenset(RAW_SECTIONS)
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self.entities: Dict[str, Dict[str, dict]] = {k: {} for k in ENTITY_KINDS}
+        self.chats: Dict[str, dict] = {}
+        self.you: Optional[dict] = None
+        self.world: Optional[dict] = None
+        self.hat: Optional[dict] = None
+        self.counters = {"full": 0, "delta": 0, "upserts": 0, "removals": 0}
+
+    def world_url(self, base_url: str) -> str:
+        if self.version is None:
+            return f"{base_url}/api/bot/world"
+        return f"{base_url}/api/bot/world?since={self.version}"
+
+    def reset(self) -> None:
+        self.version = None
+        for m in self.entities.values():
+            m.clear()
+        self.chats.clear()
+
+    def apply(self, snap: dict) -> dict:
+        """Merge one `/api/bot/world` snapshot (full or delta) and return the merged view."""
+        if not snap.get("delta"):
+            for m in self.entities.values():
+                m.clear()
+            self.chats.clear()
+            self.counters["full"] += 1
+        else:
+            self.counters["delta"] += 1
+            # Removals first: an id can be removed and re-added within one delta window.
+            removed = snap.get("removed") or {}
+            for kind in ENTITY_KINDS:
+                m = self.entities[kind]
+                for eid in removed.get(kind) or []:
+                    if m.pop(eid, None) is not None:
+                        self.counters["removals"] += 1
+
+        for kind in ENTITY_KINDS:
+            m = self.entities[kind]
+            for e in snap.get(kind) or []:
+                if not e or e.get("id") is None:
+                    continue
+                self._upsert(m, kind, e)
+                self.counters["upserts"] += 1
+
+        if "chats" in self.keep:
+            for c in snap.get("chats") or []:
+                if c and c.get("id") is not None:
+                    self.chats.pop(c["id"], None)
+                    self.chats[c["id"]] = c
+            _trim(self.chats, CHATS_KEEP)
+        _trim(self.entities["board"], BOARD_KEEP)
+
+        if snap.get("you") is not None:
+            self.you = snap["you"]
+        if snap.get("world") is not None:
+            self.world = snap["world"]
+        if "hat" in snap and "hat" in self.keep:
+            self.hat = snap["hat"]
+        v = snap.get("version")
+        self.version = int(v) if isinstance(v, (int, float)) else None
+        return self.snapshot()
+
+    def _upsert(self, m: Dict[str, dict], kind: str, e: dict) -> None:
+        m[e["id"]] = e
+
+    def snapshot(self) -> dict:
+        out: Dict[str, object] = {kind: list(self.entities[kind].values()) for kind in ENTITY_KINDS}
+        out["world"] = self.world
+        out["you"] = self.you
+        out["chats"] = list(self.chats.values())
+        out["hat"] = self.hat
+        out["version"] = self.version
+        return out
+
+    def list(self, kind: str) -> List[dict]:
+        return list(self.entities[kind].values())
+
+
+def _trim(d: Dict[str, dict], keep: int) -> None:
+    extra = len(d) - keep
+    if extra <= 0:
+        return
+    for k in list(d.keys())[:extra]:
+        del d[k]
+
+
+def _str(v):
+    return sys.intern(v) if isinstance(v, str) else v
+
+
+def _num(v) -> float:
+    try:
+        return float(v or 0)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+class Record(ABC):
+    """Slot-backed entity with dict-style reads under the server's JSON key names."""
+
+    __slots__ = ()
+    KEYS: Dict[str, str] = {}  # JSON key -> attribute
+
+    def __init__(self, e: dict):
+        self.update(e)
+
+    @abstractmethod
+    def update(self, e: dict) -> None:
+        """Copy the fields present in the server entity `e` into the slots."""
+
+    def get(self, key: str, default=None):
+        attr = self.KEYS.get(key)
+        if attr is None:
+            return default
+        v = getattr(self, attr)
+        return default if v is None else v
+
+    def __getitem__(self, key: str):
+        attr = self.KEYS.get(key)
+        if attr is None:
+            raise KeyError(key)
+        return getattr(self, attr)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self.KEYS
+
+    def to_dict(self) -> dict:
+        return {k: getattr(self, a) for k, a in self.KEYS.items()}
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({self.to_dict()!r})"
+
+
+class PlayerRecord(Record):
+    __slots__ = ("id", "name", "x", "y", "hp", "max_hp", "level", "party_id", "mode", "job")
+    KEYS = {
+        "id": "id",
+        "name": "name",
+        "x": "x",
+        "y": "y",
+        "hp": "hp",
+        "maxHp": "max_hp",
+        "level": "level",
+        "partyId": "party_id",
+        "mode": "mode",
+        "job": "job",
+    }
+
+    def update(self, e: dict) -> None:
+        g = e.get
+        self.id = _str(g("id"))
+        self.name = _str(g("name"))
+        self.x = _num(g("x"))
+        self.y = _num(g("y"))
+        self.hp = g("hp")
+        self.max_hp = g("maxHp")
+        self.level = g("level")
+        self.party_id = _str(g("partyId"))
+        self.mode = _str(g("mode"))
+        self.job = _str(g("job"))
+
+
+class MonsterRecord(Record):
+    __slots__ = ("id", "kind", "name", "x", "y", "hp", "max_hp", "alive", "color")
+    KEYS = {
+        "id": "id",
+        "kind": "kind",
+        "name": "name",
+        "x": "x",
+        "y": "y",
+        "hp": "hp",
+        "maxHp": "max_hp",
+        "alive": "alive",
+        "color": "color",
+    }
+
+    def update(self, e: dict) -> None:
+        g = e.get
+        self.id = _str(g("id"))
+        self.kind = _str(g("kind"))
+        self.name = _str(g("name"))
+        self.x = _num(g("x"))
+        self.y = _num(g("y"))
+        self.hp = g("hp")
+        self.max_hp = g("maxHp")
+        a = g("alive")
+        self.alive = None if a is None else bool(a)
+        self.color = _str(g("color"))
+
+
+class DropRecord(Record):
+    __slots__ = ("id", "item_id", "name", "rarity", "x", "y", "qty")
+    KEYS = {"id": "id", "itemId": "item_id", "name": "name", "rarity": "rarity", "x": "x", "y": "y", "qty": "qty"}
+
+    def update(self, e: dict) -> None:
+        g = e.get
+        self.id = _str(g("id"))
+        self.item_id = _str(g("itemId"))
+        self.name = _str(g("name"))
+        self.rarity = _str(g("rarity"))
+        self.x = _num(g("x"))
+        self.y = _num(g("y"))
+        self.qty = g("qty")
+
+
+class PartyRecord(Record):
+    """Parties keep member ids only (`memberIds`); member details are on the player records."""
+
+    __slots__ = ("id", "leader_id", "member_ids")
+    KEYS = {"id": "id", "leaderId": "leader_id", "memberIds": "member_ids"}
+
+    def update(self, e: dict) -> None:
+        self.id = _str(e.get("id"))
+        self.leader_id = _str(e.get("leaderId"))
+        self.member_ids = tuple(_str(m.get("id")) for m in e.get("members") or [] if m)
+
+
+RECORDS: Dict[str, Type[Record]] = {"players": PlayerRecord, "monsters": MonsterRecord, "drops": DropRecord, "parties": PartyRecord}
+SNAPSHOT_KEYS = ENTITY_KINDS + ("world", "you", "chats", "hat", "version")
+_MISSING = object()
+
+
+class SlotStore(SnapshotStore):
+    """
+    `SnapshotStore` with slot records for players/monsters/drops/parties.
+    Records are updated in place on deltas. `keep` lists the raw sections
+    ("board", "chats", "hat") to retain; the rest are discarded on arrival.
+    """
+
+    def __init__(self, keep: Iterable[str] = ()):
+        super().__init__()
+        self.keep = frozenset(keep)
+        unknown = self.keep - set(RAW_SECTIONS)
+        if unknown:
+            raise ValueError(f"unknown raw sections: {sorted(unknown)}")
+        self._gen = 0
+
+    def _upsert(self, m: Dict[str, Record], kind: str, e: dict) -> None:
+        cls = RECORDS.get(kind)
+        if cls is None:
+            if kind in self.keep:
+                m[e["id"]] = e
+            return
+        rec = m.get(e["id"])
+        if rec is None:
+            rec = cls(e)
+            m[rec.id] = rec
+        else:
+            rec.update(e)
+
+    def apply(self, snap: dict) -> "SlotSnapshot":
+        self._gen += 1
+        return super().apply(snap)
+
+    def snapshot(self) -> "SlotSnapshot":
+        return SlotSnapshot(self)
+
+
+class SlotSnapshot(Mapping):
+    """
+    Read-only view of a `SlotStore` for one tick, with the same keys as
+    `SnapshotStore.snapshot()`. Lists are built on first access; the view
+    must not be used after the store's next `apply`.
+    """
+
+    __slots__ = ("_store", "_gen", "_cache")
+
+    def __init__(self, store: SlotStore):
+        self._store = store
+        self._gen = store._gen
+        self._cache: Dict[str, object] = {}
+
+    def __getitem__(self, key: str):
+        v = self._cache.get(key, _MISSING)
+        if v is not _MISSING:
+            return v
+        st = self._store
+        if st._gen != self._gen:
+            raise RuntimeError("snapshot view used after the store applied a newer snapshot")
+        if key in ENTITY_KINDS:
+            v = list(st.entities[key].values())
+        elif key == "chats":
+            v = list(st.chats.values())
+        elif key in ("world", "you", "hat", "version"):
+            v = getattr(st, key)
+        else:
+            raise KeyError(key)
+        self._cache[key] = v
+        return v
+
+    def __iter__(self):
+        return iter(SNAPSHOT_KEYS)
+
+    def __len__(self) -> int:
+        return len(SNAPSHOT_KEYS)
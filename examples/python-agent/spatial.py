@@ -0,0 +1,236 @@
+#!/usr/bin/env python3
+"""
+Uniform-grid spatial index for agent target selection.
+
+Entities are bucketed by `WORLD.tileSize` cells (32 px by default). Queries
+walk rings of cells outward from the query point and stop as soon as nothing
+outside the searched square can beat the current answer, so nearest / k-nearest
+/ radius lookups touch only nearby buckets instead of every entity.
+
+`WorldIndex` keeps one grid per kind (monsters, drops, players) and updates
+them incrementally from successive `/api/bot/world` snapshots: only entities
+whose position changed are re-bucketed, and `x`/`y` are parsed once.
+"""
+
+from __future__ import annotations
+
+import heapq
+import math
+from typing import Callable, Dict, Hashable, Iterable, List, Optional, Tuple
+
+
+Pred = Optional[Callable[[dict], bool]]
+
+
+class GridIndex:
+    def __init__(self, cell: float = 32.0):
+        self.cell = float(cell) if cell and cell > 0 else 32.0
+        self._buckets: Dict[Tuple[int, int], Dict[Hashable, Tuple[float, float, dict]]] = {}
+        self._where: Dict[Hashable, Tuple[int, int]] = {}
+        self._bounds: Optional[List[int]] = None  # [min_cx, min_cy, max_cx, max_cy]
+
+    def __len__(self) -> int:
+        return len(self._where)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._where
+
+    def _cell_of(self, x: float, y: float) -> Tuple[int, int]:
+        return (int(math.floor(x / self.cell)), int(math.floor(y / self.cell)))
+
+    def clear(self) -> None:
+        self._buckets.clear()
+        self._where.clear()
+        self._bounds = None
+
+    def insert(self, key: Hashable, x: float, y: float, item: dict) -> None:
+        if key in self._where:
+            self.remove(key)
+        c = self._cell_of(x, y)
+        self._buckets.setdefault(c, {})[key] = (x, y, item)
+        self._where[key] = c
+        b = self._bounds
+        if b is None:
+            self._bounds = [c[0], c[1], c[0], c[1]]
+        else:
+            if c[0] < b[0]:
+                b[0] = c[0]
+            if c[1] < b[1]:
+                b[1] = c[1]
+            if c[0] > b[2]:
+                b[2] = c[0]
+            if c[1] > b[3]:
+                b[3] = c[1]
+
+    def remove(self, key: Hashable) -> None:
+        c = self._where.pop(key, None)
+        if c is None:
+            return
+        bucket = self._buckets.get(c)
+        if bucket is not None:
+            bucket.pop(key, None)
+            if not bucket:
+                del self._buckets[c]
+        if not self._where:
+            self._bounds = None
+
+    def move(self, key: Hashable, x: float, y: float, item: dict) -> None:
+        """Update position/payload; only re-buckets when the cell changed."""
+        c = self._where.get(key)
+        if c is not None and c == self._cell_of(x, y):
+            self._buckets[c][key] = (x, y, item)
+            return
+        self.insert(key, x, y, item)
+
+    def _max_ring(self, cx: int, cy: int) -> int:
+        b = self._bounds
+        if b is None:
+            return -1
+        return max(cx - b[0], b[2] - cx, cy - b[1], b[3] - cy, 0)
+
+    def _ring(self, cx: int, cy: int, r: int) -> Iterable[Dict[Hashable, Tuple[float, float, dict]]]:
+        buckets = self._buckets
+        if r == 0:
+            b = buckets.get((cx, cy))
+            if b:
+                yield b
+            return
+        for ix in range(cx - r, cx + r + 1):
+            for iy in (cy - r, cy + r):
+                b = buckets.get((ix, iy))
+                if b:
+                    yield b
+        for iy in range(cy - r + 1, cy + r):
+            for ix in (cx - r, cx + r):
+                b = buckets.get((ix, iy))
+                if b:
+                    yield b
+
+    def _outside_d(self, x: float, y: float, cx: int, cy: int, r: int) -> float:
+        # Distance from (x, y) to the outside of the (2r+1)^2 cell square already searched.
+        s = self.cell
+        return min(x - (cx - r) * s, (cx + r + 1) * s - x, y - (cy - r) * s, (cy + r + 1) * s - y)
+
+    def k_nearest(self, x: float, y: float, k: int = 1, pred: Pred = None, max_dist: Optional[float] = None) -> List[Tuple[dict, float]]:
+        """Up to `k` `(item, d2)` pairs, closest first."""
+        if k <= 0 or not self._where:
+            return []
+        cx, cy = self._cell_of(x, y)
+        limit2 = max_dist * max_dist if max_dist is not None else math.inf
+        heap: List[Tuple[float, int, dict]] = []  # max-heap via negated d2
+        seq = 0
+        for r in range(self._max_ring(cx, cy) + 1):
+            for bucket in self._ring(cx, cy, r):
+                for (ex, ey, item) in bucket.values():
+                    dx = ex - x
+                    dy = ey - y
+                    d2 = dx * dx + dy * dy
+                    if d2 > limit2:
+                        continue
+                    if len(heap) >= k and d2 >= -heap[0][0]:
+                        continue
+                    if pred is not None and not pred(item):
+                        continue
+                    seq += 1
+                    if len(heap) < k:
+                        heapq.heappush(heap, (-d2, seq, item))
+                    else:
+                        heapq.heapreplace(heap, (-d2, seq, item))
+            od = self._outside_d(x, y, cx, cy, r)
+            if od > 0 and od * od > limit2:
+                break
+            if len(heap) >= k and od > 0 and -heap[0][0] <= od * od:
+                break
+        return [(item, -nd2) for (nd2, _, item) in sorted(heap, key=lambda t: (-t[0], t[1]))]
+
+    def nearest(self, x: float, y: float, pred: Pred = None, max_dist: Optional[float] = None) -> Optional[Tuple[dict, float]]:
+        out = self.k_nearest(x, y, 1, pred=pred, max_dist=max_dist)
+        return out[0] if out else None
+
+    def within(self, x: float, y: float, radius: float, pred: Pred = None) -> List[Tuple[dict, float]]:
+        """All `(item, d2)` with distance <= radius, closest first."""
+        if not self._where or radius < 0:
+            return []
+        r2 = radius * radius
+        c0x, c0y = self._cell_of(x - radius, y - radius)
+        c1x, c1y = self._cell_of(x + radius, y + radius)
+        out = []
+        buckets = self._buckets
+        for ix in range(c0x, c1x + 1):
+            for iy in range(c0y, c1y + 1):
+                b = buckets.get((ix, iy))
+                if not b:
+                    continue
+                for (ex, ey, item) in b.values():
+                    dx = ex - x
+                    dy = ey - y
+                    d2 = dx * dx + dy * dy
+                    if d2 <= r2 and (pred is None or pred(item)):
+                        out.append((item, d2))
+        out.sort(key=lambda t: t[1])
+        return out
+
+
+def _xy(e: dict) -> Tuple[float, float]:
+    return float(e.get("x") or 0), float(e.get("y") or 0)
+
+
+class WorldIndex:
+    """
+    Per-kind grids kept in sync with world snapshots.
+    Dead monsters are not indexed, so every monster hit is a valid target.
+    """
+
+    KINDS = ("monsters", "drops", "players")
+
+    def __init__(self, cell: float = 32.0):
+        self.cell = float(cell)
+        self.grids: Dict[str, GridIndex] = {k: GridIndex(self.cell) for k in self.KINDS}
+
+    def update(self, snap: dict) -> "WorldIndex":
+        tile = float(((snap.get("world") or {}).get("tileSize")) or self.cell)
+        if tile != self.cell:
+            self.cell = tile
+            self.grids = {k: GridIndex(tile) for k in self.KINDS}
+        for kind in self.KINDS:
+            self._sync(self.grids[kind], snap.get(kind) or [], alive_only=(kind == "monsters"))
+        return self
+
+    @staticmethod
+    def _sync(grid: GridIndex, entities: List[dict], alive_only: bool) -> None:
+        seen = set()
+        for e in entities:
+            if not e or e.get("id") is None:
+                continue
+            if alive_only and e.get("alive") is False:
+                continue
+            key = e["id"]
+            seen.add(key)
+            x, y = _xy(e)
+            grid.move(key, x, y, e)
+        if len(seen) != len(grid):
+            for key in [k for k in grid._where if k not in seen]:
+                grid.remove(key)
+
+    def nearest(self, kind: str, x: float, y: float, pred: Pred = None, max_dist: Optional[float] = None):
+        return self.grids[kind].nearest(x, y, pred=pred, max_dist=max_dist)
+
+    def k_nearest(self, kind: str, x: float, y: float, k: int, pred: Pred = None, max_dist: Optional[float] = None):
+        return self.grids[kind].k_nearest(x, y, k, pred=pred, max_dist=max_dist)
+
+    def within(self, kind: str, x: float, y: float, radius: float, pred: Pred = None):
+        return self.grids[kind].within(x, y, radius, pred=pred)
+
+    def nearest_party_member(self, you: dict, max_dist: Optional[float] = None):
+        party_id = (you or {}).get("partyId")
+        if not party_id:
+            return None
+        x, y = _xy(you)
+        you_id = you.get("id")
+        return self.nearest(
+            "players",
+            x,
+            y,
+            pred=lambda p: p.get("partyId") == party_id and p.get("id") != you_id,
+            max_dist=max_dist,
+        )
@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Streaming mode for the Python agent: follow the server's `/ws` feed instead of
+polling `/api/bot/world`.
+
+The server broadcasts a full `state` message every tick (`WORLD.tickMs`,
+100 ms) plus `fx` messages as they happen. A reader thread folds those into a
+`WorldModel`; the decision loop wakes on every update (conflating bursts, so
+it never works on a stale backlog) and sends goal/cast/thought over HTTP,
+because the WS protocol has no bot-authenticated equivalent for them.
+
+If the socket drops, the loop keeps acting from `/api/bot/world` polls while
+it reconnects with backoff.
+"""
+
+from __future__ import annotations
+
+import collections
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from typing import Callable, Optional
+
+from ratelimit import ActionScheduler
+from ws_client import WebSocket, WebSocketError
+
+
+def ws_url_for(base_url: str, linked: Optional[dict] = None) -> str:
+    url = str((linked or {}).get("wsUrl") or "")
+    if not url:
+        url = ("wss://" if base_url.startswith("https://") else "ws://") + base_url.split("://", 1)[-1] + "/ws"
+    return url
+
+
+class WorldModel:
+    """
+    Latest world state as seen on the WS feed, shaped like a `/api/bot/world`
+    snapshot so `decide()` works on either source.
+    """
+
+    def __init__(self, player_id: str, fx_keep: int = 50):
+        self.player_id = str(player_id or "")
+        self.state: dict = {}
+        self.you: Optional[dict] = None
+        self.fx = collections.deque(maxlen=fx_keep)
+        self.version = 0
+        self.updated_at = 0.0
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+
+    def apply(self, msg: dict) -> bool:
+        """Fold one WS message in. Returns True when the world state changed."""
+        t = msg.get("type")
+        with self._lock:
+            if t == "hello":
+                self.state = msg.get("state") or {}
+                self.you = msg.get("you") or None
+                for fx in msg.get("recentFx") or []:
+                    self.fx.append(fx)
+            elif t == "state":
+                self.state = msg.get("state") or {}
+            elif t == "fx":
+                if msg.get("fx"):
+                    self.fx.append(msg["fx"])
+                return False
+            else:
+                return False
+            for p in self.state.get("players") or []:
+                if p and p.get("id") == self.player_id:
+                    self.you = p
+                    break
+            self.version += 1
+            self.updated_at = time.time()
+            self._changed.notify_all()
+        return True
+
+    def replace(self, snap: dict) -> None:
+        """Seed from an HTTP `/api/bot/world` snapshot (poll fallback)."""
+        with self._lock:
+            self.state = snap
+            self.you = snap.get("you") or self.you
+            self.version += 1
+            self.updated_at = time.time()
+            self._changed.notify_all()
+
+    def wait(self, after_version: int, timeout: float) -> int:
+        with self._lock:
+            if self.version == after_version:
+                self._changed.wait(timeout)
+            return self.version
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            snap = dict(self.state)
+            snap["you"] = self.you
+            return snap
+
+
+class WorldStream:
+    """
+    Background reader: keeps a WS connection to `/ws?playerId=...` alive and
+    feeds a `WorldModel`. `connected` reflects whether updates are flowing.
+    """
+
+    def __init__(self, ws_url: str, model: WorldModel, verbose: bool = False, max_backoff: float = 10.0):
+        q = urllib.parse.urlencode({"playerId": model.player_id})
+        self.url = ws_url + ("&" if "?" in ws_url else "?") + q
+        self.model = model
+        self.verbose = verbose
+        self.max_backoff = max_backoff
+        self.connected = False
+        self.messages = 0
+        self.reconnects = 0
+        self._stop = threading.Event()
+        self._ws: Optional[WebSocket] = None
+        self._thread = threading.Thread(target=self._run, name="ct-ws", daemon=True)
+
+    def start(self) -> "WorldStream":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        ws = self._ws
+        if ws:
+            ws.close()
+
+    def _run(self) -> None:
+        backoff = 0.5
+        while not self._stop.is_set():
+            try:
+                ws = WebSocket.connect(self.url, timeout=10)
+                self._ws = ws
+                # A tick arrives every 100 ms; silence for this long means the link is dead.
+                ws.settimeout(15)
+                self.connected = True
+                backoff = 0.5
+                while not self._stop.is_set():
+                    text = ws.recv()
+                    if text is None:
+                        break
+                    try:
+                        msg = json.loads(text)
+                    except ValueError:
+                        continue
+                    self.messages += 1
+                    self.model.apply(msg)
+            except (OSError, WebSocketError) as e:
+                if self.verbose and not self._stop.is_set():
+                    print("ws error", e, file=sys.stderr)
+            finally:
+                self.connected = False
+                if self._ws:
+                    self._ws.close()
+                    self._ws = None
+            if self._stop.is_set():
+                break
+            self.reconnects += 1
+            self._stop.wait(backoff)
+            backoff = min(self.max_backoff, backoff * 2)
+
+
+def run_stream(
+    base_url: str,
+    headers: dict,
+    linked: dict,
+    decide: Callable,
+    state,
+    api_json: Callable,
+    poll_ms: int = 1200,
+    run_for_sec: int = 0,
+    verbose: bool = False,
+    scheduler: Optional[ActionScheduler] = None,
+    after_decide: Optional[Callable[[dict], None]] = None,
+) -> dict:
+    """
+    Decision loop driven by WS updates. Falls back to `/api/bot/world` polls
+    (every `poll_ms`) whenever the stream is down. Actions go through
+    `scheduler` so they respect the server's per-endpoint buckets.
+    `after_decide(snapshot)` runs after each decision (status PNGs, event feed).
+    """
+    sched = scheduler or ActionScheduler()
+    limiter = sched.limiter
+
+    def send(endpoint, body):
+        return api_json(f"{base_url}/api/bot/{endpoint}", method="POST", headers=headers, body=body)
+
+    model = WorldModel(str(linked.get("playerId") or ""))
+    stream = WorldStream(ws_url_for(base_url, linked), model, verbose=verbose).start()
+    started = time.time()
+    seen = 0
+    decisions = 0
+    polls = 0
+    last_poll = 0.0
+    try:
+        while True:
+            if run_for_sec > 0 and (time.time() - started) > run_for_sec:
+                break
+            wait_ms = poll_ms
+            if sched.pending():
+                wait_ms = min(wait_ms, max(1.0, sched.next_due_ms() or 0.0))
+            version = model.wait(seen, timeout=wait_ms / 1000.0)
+            if version == seen:
+                sched.pump(send)
+                if stream.connected or (time.time() - last_poll) * 1000 < poll_ms or limiter.wait_ms("world") > 0:
+                    continue
+                last_poll = time.time()
+                limiter.try_take("world")
+                st, w = api_json(f"{base_url}/api/bot/world", headers=headers)
+                polls += 1
+                if st == 429:
+                    limiter.note_retry("world", w.get("retryInMs"))
+                    continue
+                if st < 200 or st >= 300 or not w.get("ok"):
+                    if verbose:
+                        print("world error", st, w, file=sys.stderr)
+                    continue
+                model.replace(w.get("snapshot") or {})
+                version = model.version
+            seen = version
+
+            decisions += 1
+            snap = model.snapshot()
+            for endpoint, body in decide(snap, state, time.time()):
+                sched.submit(endpoint, body)
+            for endpoint, st2, r in sched.pump(send):
+                if verbose and endpoint != "thought":
+                    print(endpoint, st2, ("ok" if r.get("ok") else r), file=sys.stderr)
+            if after_decide:
+                after_decide(snap)
+    finally:
+        stream.stop()
+    return {"messages": stream.messages, "reconnects": stream.reconnects, "decisions": decisions, "polls": polls}
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+Shared `/api/bot/world` cache for bots running on the same host.
+
+Most of a world snapshot is the same for every bot on a server: players,
+monsters, drops, parties and the board. Only `you`, the filtered `chats` and
+`hat` are personal. Bots sharing a cache fetch that global part once per
+server per `ttl_ms` and each add their own `you` from `GET /api/bot/me`, which
+is small and not rate limited. (`/api/bot/status` would also return `you`, but
+it has its own rate limit and computes nearby counts the policy does not need.)
+Chats and hat are not available in shared mode; use `--events` for mentions.
+
+    cache = WorldCache(fetch=api_json)                     # process-local, threads
+    st, w = cache.world(base_url, headers)                 # reply shaped like /api/bot/world
+    st, w = with_you(st, w, *api_json(f"{base_url}/api/bot/me", headers=headers))
+
+    AsyncWorldCache(fetch=lambda url, headers=None: client.request("GET", url, headers=headers))  # asyncio (fleet.py)
+
+Host-local daemon, so separate bot processes share one fetch:
+
+    python3 examples/python-agent/world_cache.py --port 8788 [--ttlMs 250]
+    python3 examples/python-agent/bot.py "CT1|..." --sharedWorld http://127.0.0.1:8788
+
+`GET /world?base=<baseUrl>` with the bot's own `Authorization` header; the
+daemon uses whichever bot's token arrives when a refresh is due, merges delta
+snapshots, and serves the same encoded bytes to every bot until the next
+refresh. It only listens on 127.0.0.1. `GET /stats` shows fetch/hit counters.
+
+Only one request per server per tick leaves the host for the world; the
+per-bot calls that remain are the light `/me` reads.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import sys
+import threading
+import time
+import urllib.parse
+from typing import Awaitable, Callable, Dict, Optional, Tuple
+
+from snapshot import SnapshotStore
+
+GLOBAL_KEYS = ("version", "world", "players", "monsters", "drops", "parties", "board")
+DEFAULT_TTL_MS = 250  # the server's per-bot `world` interval
+STALE_MS = 5000  # on 429/errors keep serving the last snapshot for this long
+
+Reply = Tuple[int, dict]
+
+
+def global_part(snap: dict) -> dict:
+    """The player-independent slice of a merged snapshot, as a full (non-delta) snapshot."""
+    out = {k: snap.get(k) for k in GLOBAL_KEYS}
+    out["delta"] = False
+    return out
+
+
+def with_you(st: int, w: dict, me_st: int, me: dict) -> Reply:
+    """Combine a shared world reply with this bot's `/api/bot/me` reply."""
+    if st < 200 or st >= 300 or not w.get("ok"):
+        return st, w
+    if me_st < 200 or me_st >= 300 or not me.get("ok"):
+        return me_st, me
+    snap = dict(w.get("snapshot") or {})
+    snap["you"] = me.get("player")
+    snap["chats"] = []
+    snap["hat"] = None
+    return st, dict(w, snapshot=snap)
+
+
+class _Entry:
+    __slots__ = ("store", "reply", "body", "fetched_at", "lock", "alock")
+
+    def __init__(self):
+        self.store = SnapshotStore()
+        self.reply: Optional[dict] = None
+        self.body: Optional[bytes] = None
+        self.fetched_at = 0.0
+        self.lock = threading.Lock()
+        self.alock: Optional[asyncio.Lock] = None
+
+    def age_ms(self) -> float:
+        return (time.monotonic() - self.fetched_at) * 1000.0
+
+    def absorb(self, st: int, w: dict, stale_ms: float) -> Reply:
+        """Fold one upstream reply in; on failure fall back to a recent snapshot."""
+        if 200 <= st < 300 and w.get("ok"):
+            merged = self.store.apply(w.get("snapshot") or {})
+            self.reply = {"ok": True, "snapshot": global_part(merged)}
+            self.body = None
+            self.fetched_at = time.monotonic()
+            return 200, self.reply
+        if self.reply is not None and self.age_ms() <= stale_ms:
+            return 200, self.reply
+        return st, w
+
+
+class _Base:
+    def __init__(self, ttl_ms: float = DEFAULT_TTL_MS, stale_ms: float = STALE_MS):
+        self.ttl_ms = float(ttl_ms)
+        self.stale_ms = float(stale_ms)
+        self._entries: Dict[str, _Entry] = {}
+        self._lock = threading.Lock()
+        self.counters = {"fetches": 0, "hits": 0, "errors": 0}
+
+    def _entry(self, base_url: str) -> _Entry:
+        with self._lock:
+            e = self._entries.get(base_url)
+            if e is None:
+                e = self._entries[base_url] = _Entry()
+            return e
+
+    def _fresh(self, e: _Entry) -> bool:
+        if e.reply is not None and e.age_ms() < self.ttl_ms:
+            with self._lock:
+                self.counters["hits"] += 1
+            return True
+        return False
+
+    def _count(self, st: int) -> None:
+        with self._lock:
+            self.counters["fetches"] += 1
+            if st < 200 or st >= 300:
+                self.counters["errors"] += 1
+
+
+class WorldCache(_Base):
+    """
+    Process-local cache for threaded bots. `fetch(url, headers=...)` returns
+    `(status, json)` like `bot.api_json`; concurrent callers for the same
+    server wait for the one in-flight fetch instead of starting their own.
+    """
+
+    def __init__(self, fetch: Callable[..., Reply], ttl_ms: float = DEFAULT_TTL_MS, stale_ms: float = STALE_MS):
+        super().__init__(ttl_ms, stale_ms)
+        self.fetch = fetch
+
+    def world(self, base_url: str, headers: dict) -> Reply:
+        e = self._entry(base_url)
+        with e.lock:
+            if self._fresh(e):
+                return 200, e.reply
+            st, w = self.fetch(e.store.world_url(base_url), headers=headers)
+            self._count(st)
+            return e.absorb(st, w, self.stale_ms)
+
+    def world_bytes(self, base_url: str, headers: dict) -> Tuple[int, bytes, float]:
+        """Encoded reply (encoded once per refresh) and its age in ms, for the daemon."""
+        st, w = self.world(base_url, headers)
+        e = self._entry(base_url)
+        with e.lock:
+            if st == 200 and w is e.reply:
+                if e.body is None:
+                    e.body = json.dumps(e.reply, separators=(",", ":")).encode("utf-8")
+                return st, e.body, e.age_ms()
+        return st, json.dumps(w).encode("utf-8"), 0.0
+
+
+class AsyncWorldCache(_Base):
+    """asyncio twin of `WorldCache`; `fetch` is awaitable, e.g. `Fleet.call` bound to GET."""
+
+    def __init__(self, fetch: Callable[..., Awaitable[Reply]], ttl_ms: float = DEFAULT_TTL_MS, stale_ms: float = STALE_MS):
+        super().__init__(ttl_ms, stale_ms)
+        self.fetch = fetch
+
+    async def world(self, base_url: str, headers: dict) -> Reply:
+        e = self._entry(base_url)
+        if e.alock is None:
+            e.alock = asyncio.Lock()
+        async with e.alock:
+            if self._fresh(e):
+                return 200, e.reply
+            st, w = await self.fetch(e.store.world_url(base_url), headers=headers)
+            self._count(st)
+            return e.absorb(st, w, self.stale_ms)
+
+
+class DaemonWorld:
+    """Client for the host-local daemon, with the same `world()` contract as `WorldCache`."""
+
+    def __init__(self, daemon_url: str, fetch: Callable[..., Reply]):
+        self.daemon_url = daemon_url.rstrip("/")
+        self.fetch = fetch
+
+    def world(self, base_url: str, headers: dict) -> Reply:
+        url = f"{self.daemon_url}/world?base={urllib.parse.quote(base_url, safe='')}"
+        return self.fetch(url, headers=headers)
+
+
+def serve(port: int, ttl_ms: float = DEFAULT_TTL_MS, host: str = "127.0.0.1"):
+    """Threaded HTTP daemon around one `WorldCache`; upstream calls go through a shared keep-alive pool."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    from http_pool import HttpClient
+
+    client = HttpClient(timeouts={"/api/bot/world": 6})
+    cache = WorldCache(lambda url, headers=None: client.request("GET", url, headers=headers), ttl_ms=ttl_ms)
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, code: int, body: bytes, headers: Optional[dict] = None) -> None:
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, str(v))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            url = urllib.parse.urlsplit(self.path)
+            if url.path == "/stats":
+                return self._send(200, json.dumps(dict(cache.counters, servers=len(cache._entries))).encode("utf-8"))
+            if url.path != "/world":
+                return self._send(404, b'{"ok":false,"error":"not found"}')
+            base = (urllib.parse.parse_qs(url.query).get("base") or [""])[0].rstrip("/")
+            auth = self.headers.get("Authorization")
+            if not base.startswith(("http://", "https://")) or not auth:
+                return self._send(400, b'{"ok":false,"error":"need ?base=<baseUrl> and Authorization"}')
+            st, body, age = cache.world_bytes(base, {"Authorization": auth})
+            self._send(st or 502, body, {"X-World-Age-Ms": int(age)})
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, int(port)), Handler)
+
+
+def main(argv) -> int:
+    port = 8788
+    ttl_ms = DEFAULT_TTL_MS
+    i = 1
+    while i < len(argv):
+        a = argv[i]
+        if a == "--port" and i + 1 < len(argv):
+            i += 1
+            port = int(float(argv[i] or "0"))
+        elif a == "--ttlMs" and i + 1 < len(argv):
+            i += 1
+            ttl_ms = float(argv[i] or "0")
+        else:
+            print("Usage: python3 examples/python-agent/world_cache.py [--port 8788] [--ttlMs 250]", file=sys.stderr)
+            return 2
+        i += 1
+    srv = serve(port, ttl_ms)
+    print(f"World cache on http://127.0.0.1:{port}/world?base=<baseUrl> (ttl {ttl_ms:.0f} ms). Ctrl+C to stop.")
+    try:
+        srv.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main(sys.argv))
@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Tiny RFC 6455 WebSocket client (stdlib only) for reading the Clawtown `/ws` feed.
+
+Only what the agent needs: text frames, fragmentation, ping/pong and close.
+No extensions are negotiated, so frames are never compressed.
+"""
+
+from __future__ import annotations
+
+import base64
+import hashlib
+import os
+import socket
+import ssl
+import struct
+import urllib.parse
+from typing import Optional
+
+
+_GUID = "258EAFA5-E914-47DA-95CA-C5AB0DC85B11"
+
+OP_CONT = 0x0
+OP_TEXT = 0x1
+OP_BINARY = 0x2
+OP_CLOSE = 0x8
+OP_PING = 0x9
+OP_PONG = 0xA
+
+
+class WebSocketError(Exception):
+    pass
+
+
+class WebSocket:
+    def __init__(self, sock: socket.socket):
+        self.sock = sock
+        self._buf = bytearray()
+        self.closed = False
+
+    @classmethod
+    def connect(cls, url: str, timeout: float = 10.0, headers: Optional[dict] = None) -> "WebSocket":
+        u = urllib.parse.urlsplit(url)
+        secure = u.scheme in ("wss", "https")
+        host = u.hostname or ""
+        port = u.port or (443 if secure else 80)
+        path = (u.path or "/") + (f"?{u.query}" if u.query else "")
+
+        sock = socket.create_connection((host, port), timeout=timeout)
+        if secure:
+            sock = ssl.create_default_context().wrap_socket(sock, server_hostname=host)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+
+        key = base64.b64encode(os.urandom(16)).decode("ascii")
+        default_port = 443 if secure else 80
+        lines = [
+            f"GET {path} HTTP/1.1",
+            f"Host: {host if port == default_port else f'{host}:{port}'}",
+            "Upgrade: websocket",
+            "Connection: Upgrade",
+            f"Sec-WebSocket-Key: {key}",
+            "Sec-WebSocket-Version: 13",
+        ]
+        for k, v in (headers or {}).items():
+            lines.append(f"{k}: {v}")
+        sock.sendall(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+
+        ws = cls(sock)
+        head = ws._read_until(b"\r\n\r\n").decode("latin-1")
+        status_line, _, rest = head.partition("\r\n")
+        if " 101 " not in f"{status_line} ":
+            sock.close()
+            raise WebSocketError(f"handshake failed: {status_line}")
+        resp_headers = {}
+        for line in rest.split("\r\n"):
+            k, _, v = line.partition(":")
+            resp_headers[k.strip().lower()] = v.strip()
+        expect = base64.b64encode(hashlib.sha1((key + _GUID).encode("ascii")).digest()).decode("ascii")
+        if resp_headers.get("sec-websocket-accept") != expect:
+            sock.close()
+            raise WebSocketError("handshake failed: bad Sec-WebSocket-Accept")
+        return ws
+
+    def settimeout(self, timeout: Optional[float]) -> None:
+        self.sock.settimeout(timeout)
+
+    def _read_until(self, marker: bytes) -> bytes:
+        while True:
+            i = self._buf.find(marker)
+            if i >= 0:
+                out = bytes(self._buf[:i])
+                del self._buf[: i + len(marker)]
+                return out
+            self._fill()
+
+    def _read_exact(self, n: int) -> bytes:
+        while len(self._buf) < n:
+            self._fill()
+        out = bytes(self._buf[:n])
+        del self._buf[:n]
+        return out
+
+    def _fill(self) -> None:
+        chunk = self.sock.recv(65536)
+        if not chunk:
+            self.closed = True
+            raise WebSocketError("connection closed")
+        self._buf += chunk
+
+    def _send_frame(self, opcode: int, payload: bytes) -> None:
+        # Client frames must be masked.
+        header = bytearray([0x80 | opcode])
+        n = len(payload)
+        if n < 126:
+            header.append(0x80 | n)
+        elif n < 65536:
+            header.append(0x80 | 126)
+            header += struct.pack("!H", n)
+        else:
+            header.append(0x80 | 127)
+            header += struct.pack("!Q", n)
+        mask = os.urandom(4)
+        header += mask
+        key = (mask * (n // 4 + 1))[:n]
+        masked = (int.from_bytes(payload, "big") ^ int.from_bytes(key, "big")).to_bytes(n, "big") if n else b""
+        self.sock.sendall(bytes(header) + masked)
+
+    def send_text(self, text: str) -> None:
+        self._send_frame(OP_TEXT, text.encode("utf-8"))
+
+    def recv(self) -> Optional[str]:
+        """
+        Next complete text message, or None once the server closed the socket.
+        Control frames are handled inline.
+        """
+        parts = []
+        msg_op = None
+        while True:
+            b0, b1 = self._read_exact(2)
+            fin = bool(b0 & 0x80)
+            opcode = b0 & 0x0F
+            n = b1 & 0x7F
+            if n == 126:
+                (n,) = struct.unpack("!H", self._read_exact(2))
+            elif n == 127:
+                (n,) = struct.unpack("!Q", self._read_exact(8))
+            mask = self._read_exact(4) if (b1 & 0x80) else None
+            payload = self._read_exact(n) if n else b""
+            if mask:
+                payload = bytes(c ^ mask[i % 4] for i, c in enumerate(payload))
+
+            if opcode == OP_PING:
+                self._send_frame(OP_PONG, payload)
+                continue
+            if opcode == OP_PONG:
+                continue
+            if opcode == OP_CLOSE:
+                try:
+                    self._send_frame(OP_CLOSE, payload[:2])
+                except OSError:
+                    pass
+                self.close()
+                return None
+
+            if opcode != OP_CONT:
+                msg_op = opcode
+                parts = []
+            parts.append(payload)
+            if fin:
+                data = b"".join(parts)
+                if msg_op == OP_BINARY:
+                    return data.decode("utf-8", errors="replace")
+                return data.decode("utf-8")
+
+    def close(self) -> None:
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.close()
+        except OSError:
+            pass
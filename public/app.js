@@ -28,18 +28,27 @@ avatarSprite.onload = () => {
   avatarSpriteReady = true;
 };
 
-function loadSprite(src) {
+function loadSprite(src, rec = {}) {
   const img = new Image();
-  const rec = { img, ready: false };
+  rec.img = img;
+  rec.ready = false;
   img.onload = () => { rec.ready = true; };
   img.onerror = () => { rec.ready = false; };
   img.src = src;
   return rec;
 }
 
+// Sprites are loaded lazily: from the packed atlas (scripts/asset_atlas.py) when it
+// lists them, otherwise from their own PNG. See loadSpriteAtlas().
+const SPRITE_ATLAS_DIR = "/assets/atlas/";
+function spriteRecord(src) {
+  const m = /^\/assets\/(.+)\.png$/.exec(src);
+  return { src, atlasKey: m ? m[1] : "", img: null, ready: false, atlas: null };
+}
+
 function makeFxSprite(src, opts = {}) {
   return {
-    ...loadSprite(src),
+    ...spriteRecord(src),
     frames: 8,
     frameW: 256,
     frameH: 256,
@@ -83,12 +92,54 @@ const fxSprites = {
 
 const USE_MONSTER_SPRITES = false;
 const monsterSprites = USE_MONSTER_SPRITES ? {
-  stage1: loadSprite("/assets/monsters/poring_pink.png"),
-  stage2: loadSprite("/assets/monsters/poring_green.png"),
-  stage3: loadSprite("/assets/monsters/poring_blue.png"),
-  elite: loadSprite("/assets/monsters/poring_elite.png"),
+  stage1: spriteRecord("/assets/monsters/poring_pink.png"),
+  stage2: spriteRecord("/assets/monsters/poring_green.png"),
+  stage3: spriteRecord("/assets/monsters/poring_blue.png"),
+  elite: spriteRecord("/assets/monsters/poring_elite.png"),
 } : {};
 
+async function loadSpriteAtlas(recs) {
+  let index = null;
+  try {
+    const res = await fetch(`${SPRITE_ATLAS_DIR}atlas.json`, { cache: "no-cache" });
+    if (res.ok) index = await res.json();
+  } catch {
+    index = null;
+  }
+  const sprites = (index && index.version === 1 && index.sprites) || {};
+  const pages = [];
+  for (const rec of recs) {
+    const entry = sprites[rec.atlasKey];
+    if (!entry || !Array.isArray(entry.frames) || !entry.frames.length) {
+      loadSprite(rec.src, rec);
+      continue;
+    }
+    if (!pages.length) for (const p of index.pages || []) pages.push(loadSprite(SPRITE_ATLAS_DIR + p.image));
+    rec.atlas = { pages, frames: entry.frames, w: entry.w, h: entry.h };
+    rec.frames = entry.frames.length;
+    rec.frameW = entry.w;
+    rec.frameH = entry.h;
+  }
+}
+
+// Source rect of one frame plus where it sits inside its logical cell (trimmed atlas
+// frames are offset by ox/oy). Returns null while the image is still loading.
+function spriteFrame(rec, index) {
+  if (!rec) return null;
+  if (rec.atlas) {
+    const f = rec.atlas.frames[Math.max(0, Math.min(rec.atlas.frames.length - 1, index))];
+    const page = rec.atlas.pages[f[0]];
+    if (!page || !page.ready || !page.img.complete || page.img.naturalWidth <= 0) return null;
+    return { img: page.img, sx: f[1], sy: f[2], sw: f[3], sh: f[4], ox: f[5], oy: f[6], cellW: rec.atlas.w, cellH: rec.atlas.h };
+  }
+  if (!rec.ready || !rec.img || !rec.img.complete || rec.img.naturalWidth <= 0) return null;
+  const fw = Math.max(1, Math.floor(Number(rec.frameW) || rec.img.naturalWidth));
+  const fh = Math.max(1, Math.floor(Number(rec.frameH) || rec.img.naturalHeight));
+  return { img: rec.img, sx: index * fw, sy: 0, sw: fw, sh: fh, ox: 0, oy: 0, cellW: fw, cellH: fh };
+}
+
+loadSpriteAtlas([...Object.values(fxSprites), ...Object.values(monsterSprites)]);
+
 const monsterSpriteById = {
   m_slime_1: "stage1",
   m_slime_2: "stage3",
@@ -3351,14 +3402,16 @@ function renderInventory() {
 function drawFxSprite(fx, ageMs, alpha) {
   const type = String(fx?.type || "");
   const meta = fxSprites[type];
-  if (!meta || !meta.ready || !meta.img || !meta.img.complete || meta.img.naturalWidth <= 0) return false;
+  if (!meta) return false;
 
   const duration = Math.max(120, Number(meta.duration) || 900);
   const prog = clamp01(ageMs / duration);
   const frames = Math.max(1, Math.floor(Number(meta.frames) || 1));
-  const frameW = Math.max(1, Math.floor(Number(meta.frameW) || 1));
-  const frameH = Math.max(1, Math.floor(Number(meta.frameH) || 1));
   const frame = Math.min(frames - 1, Math.floor(prog * frames));
+  const src = spriteFrame(meta, frame);
+  if (!src) return false;
+  const frameW = src.cellW;
+  const frameH = src.cellH;
 
   let x = Number(fx.x) || 0;
   let y = Number(fx.y) || 0;
@@ -3413,7 +3466,9 @@ function drawFxSprite(fx, ageMs, alpha) {
   ctx.globalAlpha = clamp01(alpha);
   ctx.translate(x, y + (Number(meta.offsetY) || 0));
   if (rotation) ctx.rotate(rotation);
-  ctx.drawImage(meta.img, frame * frameW, 0, frameW, frameH, dx, dy, dw, dh);
+  if (src.sw > 0 && src.sh > 0) {
+    ctx.drawImage(src.img, src.sx, src.sy, src.sw, src.sh, dx + src.ox * scale, dy + src.oy * scale, src.sw * scale, src.sh * scale);
+  }
   ctx.restore();
   return true;
 }
@@ -3931,8 +3986,8 @@ function drawMonsters() {
     const x = m.x;
     const y = m.y;
 
-    const sprite = getMonsterSprite(m);
-    const spriteReady = sprite && sprite.ready && sprite.img && sprite.img.complete && sprite.img.naturalWidth > 0;
+    const sprite = spriteFrame(getMonsterSprite(m), 0);
+    const spriteReady = !!sprite;
 
     // shadow
     ctx.beginPath();
@@ -3944,7 +3999,8 @@ function drawMonsters() {
       const size = m.kind === "elite" ? 86 : 64;
       const dx = x - size / 2;
       const dy = y - size / 2 - 8;
-      ctx.drawImage(sprite.img, dx, dy, size, size);
+      const k = size / sprite.cellW;
+      if (sprite.sw > 0) ctx.drawImage(sprite.img, sprite.sx, sprite.sy, sprite.sw, sprite.sh, dx + sprite.ox * k, dy + sprite.oy * k, sprite.sw * k, sprite.sh * k);
     } else {
       // fallback: simple blob
       const fill = (m.color && typeof m.color === 'string')
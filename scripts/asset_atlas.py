@@ -0,0 +1,316 @@
+#!/usr/bin/env python3
+"""
+Pack sprite outputs (public/assets/vfx/*.png strips, public/assets/monsters/*.png)
+into a few power-of-two atlas pages plus a JSON frame index for public/app.js.
+
+Each frame cell is trimmed to its alpha bounding box, identical trimmed frames
+are stored once, and the trimmed rects are packed with a skyline bottom-left
+packer. The pixels are copied unchanged from the written outputs, so drawing a
+frame from the atlas looks exactly like drawing the cell from the strip.
+
+  python3 scripts/asset_atlas.py                       # public/assets -> public/assets/atlas
+  python3 scripts/process_generated_assets.py --atlas  # same, after a pipeline run
+
+Index format (atlas.json):
+  {"version": 1,
+   "pages": [{"image": "atlas-0.png", "w": 2048, "h": 1024}],
+   "sprites": {"vfx/fireball": {"w": 256, "h": 256, "pivot": [0.5, 0.5],
+                                "frames": [[page, x, y, w, h, ox, oy], ...]}}}
+
+`w`/`h` is the logical cell size (what the strip used per frame); a frame's
+trimmed rect sits at (ox, oy) inside that cell. A fully transparent frame has
+w = h = 0. `pivot` is the cell-relative anchor (the pipeline centres frames).
+"""
+
+from __future__ import annotations
+
+import argparse
+import hashlib
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from PIL import Image
+
+from asset_cache import BuildManifest, params_digest
+from asset_encode import encode_file
+
+
+ROOT = Path(__file__).resolve().parents[1]
+ASSETS = ROOT / "public" / "assets"
+ATLAS_DIR = ASSETS / "atlas"
+INDEX_NAME = "atlas.json"
+
+ATLAS_PARAMS = {
+    "max_size": 2048,  # largest page side (WebGL/canvas-safe everywhere)
+    "padding": 2,  # transparent gap between rects (no bleeding under filtering)
+    "pow2": True,
+}
+
+
+@dataclass
+class Frame:
+    image: Optional[Image.Image]  # trimmed; None when fully transparent
+    ox: int
+    oy: int
+    digest: str
+
+
+@dataclass
+class Sprite:
+    name: str
+    cell: Tuple[int, int]
+    frames: List[Frame]
+
+
+def trim(cell: Image.Image) -> Frame:
+    bb = cell.getchannel("A").getbbox()
+    if not bb:
+        return Frame(None, 0, 0, "")
+    crop = cell.crop(bb)
+    h = hashlib.sha1(crop.tobytes())
+    h.update(f"{crop.size}".encode())
+    return Frame(crop, bb[0], bb[1], h.hexdigest())
+
+
+def load_sprite(path: Path, root: Path) -> Sprite:
+    """A strip whose width is a multiple of its height is split into square cells; anything else is one frame."""
+    im = Image.open(path).convert("RGBA")
+    w, h = im.size
+    n = w // h if h and w % h == 0 else 1
+    cw = w // n
+    frames = [trim(im.crop((i * cw, 0, (i + 1) * cw, h))) for i in range(n)]
+    name = path.relative_to(root).with_suffix("").as_posix()
+    return Sprite(name, (cw, h), frames)
+
+
+class Skyline:
+    """Bottom-left skyline packer for one page."""
+
+    def __init__(self, w: int, h: int):
+        self.w = w
+        self.h = h
+        self.segs: List[List[int]] = [[0, 0, w]]  # x, y, width
+
+    def _fit(self, i: int, w: int, h: int) -> Optional[int]:
+        x = self.segs[i][0]
+        if x + w > self.w:
+            return None
+        y = 0
+        left = w
+        while left > 0:
+            if i >= len(self.segs):
+                return None
+            y = max(y, self.segs[i][1])
+            left -= self.segs[i][2]
+            i += 1
+        return y if y + h <= self.h else None
+
+    def insert(self, w: int, h: int) -> Optional[Tuple[int, int]]:
+        best = None
+        for i in range(len(self.segs)):
+            y = self._fit(i, w, h)
+            if y is not None and (best is None or (y + h, self.segs[i][0]) < (best[1] + h, best[2])):
+                best = (i, y, self.segs[i][0])
+        if best is None:
+            return None
+        i, y, x = best
+        self.segs.insert(i, [x, y + h, w])
+        j = i + 1
+        while j < len(self.segs):
+            sx, sy, sw = self.segs[j]
+            if sx >= x + w:
+                break
+            cut = x + w - sx
+            if cut >= sw:
+                del self.segs[j]
+                continue
+            self.segs[j] = [sx + cut, sy, sw - cut]
+            break
+        k = 0
+        while k + 1 < len(self.segs):
+            if self.segs[k][1] == self.segs[k + 1][1]:
+                self.segs[k][2] += self.segs.pop(k + 1)[2]
+            else:
+                k += 1
+        return x, y
+
+
+def _page_sizes(min_w: int, min_h: int, max_size: int, pow2: bool) -> List[Tuple[int, int]]:
+    if pow2:
+        sides = [1 << k for k in range(4, max_size.bit_length()) if (1 << k) <= max_size]
+    else:
+        sides = list(range(16, max_size + 1, 16))
+    out = [(w, h) for w in sides for h in sides if w >= min_w and h >= min_h]
+    return sorted(out, key=lambda s: (s[0] * s[1], abs(s[0] - s[1]), -s[0]))
+
+
+def _try_pack(sizes: Sequence[Tuple[int, int]], order: Sequence[int], w: int, h: int, partial: bool):
+    sky = Skyline(w, h)
+    placed: Dict[int, Tuple[int, int]] = {}
+    for i in order:
+        pos = sky.insert(*sizes[i])
+        if pos is None:
+            if not partial:
+                return None
+            continue
+        placed[i] = pos
+    return placed
+
+
+def _pages_for(padded: Sequence[Tuple[int, int]], todo: List[int], max_size: int, pow2: bool):
+    min_w = max(padded[i][0] for i in todo)
+    min_h = max(padded[i][1] for i in todo)
+    area = sum(padded[i][0] * padded[i][1] for i in todo)
+    sizes = _page_sizes(min_w, min_h, max_size, pow2)
+    whole = None
+    for pw, ph in sizes:
+        if pw * ph >= area:
+            placed = _try_pack(padded, todo, pw, ph, partial=False)
+            if placed is not None:
+                whole = (pw, ph, placed)
+                break
+    limit = whole[0] * whole[1] if whole else max_size * max_size
+    best = [whole] if whole else None
+    # A page of half the size plus a small page for the rest often beats one big page.
+    for pw, ph in sizes:
+        if pw * ph * 2 != limit and not (whole is None and pw * ph == limit):
+            continue
+        placed = _try_pack(padded, todo, pw, ph, partial=True)
+        if not placed or len(placed) == len(todo):
+            continue
+        rest = _pages_for(padded, [i for i in todo if i not in placed], max_size, pow2)
+        cand = [(pw, ph, placed)] + rest
+        if best is None or (sum(p[0] * p[1] for p in cand), len(cand)) < (sum(p[0] * p[1] for p in best), len(best)):
+            best = cand
+    return best
+
+
+def pack(sizes: Sequence[Tuple[int, int]], max_size: int = 2048, padding: int = 2, pow2: bool = True):
+    """
+    Pack rects into pages of (power-of-two) sizes, picking the split with the
+    least total page area. Returns [(page_w, page_h, {rect index: (x, y)})].
+    """
+    padded = [(w + padding, h + padding) for w, h in sizes]
+    too_big = [i for i, (w, h) in enumerate(padded) if w > max_size or h > max_size]
+    if too_big:
+        raise ValueError(f"frame larger than the {max_size}px page limit: {[sizes[i] for i in too_big]}")
+    if not sizes:
+        return []
+    todo = sorted(range(len(sizes)), key=lambda i: (-padded[i][1], -padded[i][0]))
+    return _pages_for(padded, todo, max_size, pow2)
+
+
+def build_atlas(sprites: Sequence[Sprite], out_dir: Path, params: Optional[dict] = None) -> dict:
+    """Write atlas-N.png pages + atlas.json into `out_dir` and return the index."""
+    P = dict(ATLAS_PARAMS, **(params or {}))
+    unique: Dict[str, int] = {}
+    images: List[Image.Image] = []
+    for s in sprites:
+        for f in s.frames:
+            if f.image is not None and f.digest not in unique:
+                unique[f.digest] = len(images)
+                images.append(f.image)
+
+    pages = pack([im.size for im in images], max_size=int(P["max_size"]), padding=int(P["padding"]), pow2=bool(P["pow2"]))
+    where: Dict[int, Tuple[int, int, int]] = {}
+    out_dir.mkdir(parents=True, exist_ok=True)
+    index = {"version": 1, "pages": [], "sprites": {}}
+    for n, (pw, ph, placed) in enumerate(pages):
+        page = Image.new("RGBA", (pw, ph), (0, 0, 0, 0))
+        for i, (x, y) in placed.items():
+            page.paste(images[i], (x, y))
+            where[i] = (n, x, y)
+        name = f"atlas-{n}.png"
+        page.save(out_dir / name)
+        index["pages"].append({"image": name, "w": pw, "h": ph})
+    for stale in out_dir.glob("atlas-*.png"):
+        if stale.name not in {p["image"] for p in index["pages"]}:
+            stale.unlink()
+
+    for s in sprites:
+        rows = []
+        for f in s.frames:
+            if f.image is None:
+                rows.append([0, 0, 0, 0, 0, 0, 0])
+                continue
+            n, x, y = where[unique[f.digest]]
+            rows.append([n, x, y, f.image.width, f.image.height, f.ox, f.oy])
+        index["sprites"][s.name] = {"w": s.cell[0], "h": s.cell[1], "pivot": [0.5, 0.5], "frames": rows}
+    (out_dir / INDEX_NAME).write_text(json.dumps(index, separators=(",", ":")) + "\n", encoding="utf-8")
+    return index
+
+
+def texture_bytes(sizes: Iterable[Tuple[int, int]]) -> int:
+    """Decoded RGBA size, which is what the browser keeps per image."""
+    return sum(w * h * 4 for w, h in sizes)
+
+
+def build_from_outputs(
+    paths: Sequence[Path],
+    root: Path = ASSETS,
+    out_dir: Path = ATLAS_DIR,
+    build: Optional[BuildManifest] = None,
+    force: bool = False,
+    params: Optional[dict] = None,
+    encode: Optional[dict] = None,
+) -> Optional[dict]:
+    """
+    Atlas stage of the pipeline. With a `BuildManifest`, nothing is rewritten
+    while the member files and parameters are unchanged (returns None then).
+    With `encode`, pages go through asset_encode; their reports are returned
+    under the (unsaved) "encoded" key.
+    """
+    P = dict(ATLAS_PARAMS, **(params or {}))
+    paths = sorted(Path(p) for p in paths)
+    index_path = out_dir / INDEX_NAME
+    key = ""
+    if build:
+        key = params_digest("atlas", P, encode, [(p.relative_to(root).as_posix(), build.input_digest(p)) for p in paths])
+        if not force and build.is_fresh(index_path, key):
+            return None
+    index = build_atlas([load_sprite(p, root) for p in paths], out_dir, P)
+    if encode:
+        index["encoded"] = [encode_file(out_dir / page["image"], encode) for page in index["pages"]]
+    if build:
+        build.record(index_path, key)
+        build.save()
+    return index
+
+
+def default_members(root: Path = ASSETS) -> List[Path]:
+    return sorted((root / "vfx").glob("*.png")) + sorted((root / "monsters").glob("*.png"))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Pack sprite outputs into power-of-two atlases with a JSON frame index.")
+    ap.add_argument("--src", type=Path, default=ASSETS, help="asset root (default: public/assets)")
+    ap.add_argument("--out", type=Path, help="atlas directory (default: <src>/atlas)")
+    ap.add_argument("--max-size", type=int, default=ATLAS_PARAMS["max_size"], help="largest page side")
+    ap.add_argument("--padding", type=int, default=ATLAS_PARAMS["padding"], help="px between rects")
+    ap.add_argument("files", nargs="*", type=Path, help="PNG outputs to pack (default: <src>/vfx/*.png + <src>/monsters/*.png)")
+    args = ap.parse_args(argv)
+
+    src = args.src.resolve()
+    files = [p.resolve() for p in args.files] or default_members(src)
+    if not files:
+        print("Nothing to pack under", args.src)
+        return 2
+    outside = [p for p in files if not p.is_relative_to(src)]
+    if outside:
+        ap.error(f"files must be under --src {args.src}: {', '.join(map(str, outside))}")
+    out_dir = args.out or src / "atlas"
+    index = build_from_outputs(files, root=src, out_dir=out_dir, params={"max_size": args.max_size, "padding": args.padding})
+    before = texture_bytes(Image.open(p).size for p in files)
+    after = texture_bytes((p["w"], p["h"]) for p in index["pages"])
+    n_frames = sum(len(s["frames"]) for s in index["sprites"].values())
+    print(f"Packed {n_frames} frames from {len(files)} file(s) into {len(index['pages'])} page(s):")
+    for p in index["pages"]:
+        print(f" - {out_dir / p['image']} ({p['w']}x{p['h']})")
+    print(f"Decoded texture memory: {before / 2**20:.1f} MB -> {after / 2**20:.1f} MB; requests: {len(files)} -> {len(index['pages']) + 1}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Incremental build support for scripts/process_generated_assets.py.
+
+Two pieces:
+
+- `BuildManifest`: remembers, per output file, the build key it was produced
+  with (content hash of the input sheet + every parameter that affects its
+  pixels) and the output's size/mtime. An output is rebuilt only when its key
+  changed or the file on disk was touched/removed. Input hashes are reused while
+  the input's size and mtime are unchanged, so a no-op rebuild never reads a
+  sheet.
+
+- `DiskCache`: content-addressed intermediates (the matted RGBA sheet as .npy,
+  the `Strip` layout as JSON) shared between runs, so a parameter change that
+  only affects frame packing does not redo matting/segmentation. Least recently
+  used blobs are evicted once the cache grows past `max_bytes`.
+
+Both live under `.cache/assets/` by default (git-ignored).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+ROOT = Path(__file__).resolve().parents[1]
+CACHE_DIR = ROOT / ".cache" / "assets"
+DEFAULT_MAX_BYTES = 1 << 30
+
+# Bump when the processing code changes in a way the parameters don't capture.
+PIPELINE_VERSION = 1
+
+
+def file_digest(path: Path, chunk: int = 1 << 20) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        while True:
+            b = f.read(chunk)
+            if not b:
+                break
+            h.update(b)
+    return h.hexdigest()
+
+
+def params_digest(*parts) -> str:
+    """Stable hash of JSON-able values (dict key order does not matter)."""
+    text = json.dumps([PIPELINE_VERSION, *parts], sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, data: bytes) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def _stat_sig(path: Path) -> Optional[List[int]]:
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    return [st.st_size, st.st_mtime_ns]
+
+
+class BuildManifest:
+    def __init__(self, path: Path):
+        self.path = Path(path)
+        self.inputs: Dict[str, dict] = {}
+        self.outputs: Dict[str, dict] = {}
+        try:
+            saved = json.loads(self.path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            saved = {}
+        if isinstance(saved, dict) and saved.get("version") == PIPELINE_VERSION:
+            self.inputs = dict(saved.get("inputs") or {})
+            self.outputs = dict(saved.get("outputs") or {})
+
+    def input_digest(self, path: Path) -> str:
+        key = str(Path(path).resolve())
+        sig = _stat_sig(Path(path))
+        rec = self.inputs.get(key)
+        if rec and sig and rec.get("sig") == sig:
+            return rec["sha256"]
+        digest = file_digest(Path(path))
+        self.inputs[key] = {"sig": sig, "sha256": digest}
+        return digest
+
+    def is_fresh(self, out: Path, key: str) -> bool:
+        rec = self.outputs.get(str(Path(out).resolve()))
+        return bool(rec) and rec.get("key") == key and rec.get("sig") == _stat_sig(Path(out))
+
+    def record(self, out: Path, key: str) -> None:
+        self.outputs[str(Path(out).resolve())] = {"key": key, "sig": _stat_sig(Path(out)), "at": int(time.time())}
+
+    def save(self) -> None:
+        data = {"version": PIPELINE_VERSION, "inputs": self.inputs, "outputs": self.outputs}
+        _write_atomic(self.path, (json.dumps(data, indent=1, sort_keys=True) + "\n").encode("utf-8"))
+
+
+class DiskCache:
+    """Flat directory of blobs named by key. Safe to share between worker processes."""
+
+    def __init__(self, root: Path, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.root = Path(root)
+        self.max_bytes = max(0, int(max_bytes))
+
+    def _path(self, key: str, ext: str) -> Path:
+        return self.root / "blobs" / key[:2] / f"{key}{ext}"
+
+    @staticmethod
+    def _touch(path: Path) -> None:
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+
+    def get_array(self, key: str) -> Optional[np.ndarray]:
+        p = self._path(key, ".npy")
+        try:
+            arr = np.load(p, allow_pickle=False)
+        except (OSError, ValueError):
+            return None
+        self._touch(p)
+        return arr
+
+    def put_array(self, key: str, arr: np.ndarray) -> None:
+        p = self._path(key, ".npy")
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_name(f"{p.name}.{os.getpid()}.tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, np.ascontiguousarray(arr), allow_pickle=False)
+        os.replace(tmp, p)
+
+    def get_json(self, key: str):
+        p = self._path(key, ".json")
+        try:
+            out = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        self._touch(p)
+        return out
+
+    def put_json(self, key: str, obj) -> None:
+        _write_atomic(self._path(key, ".json"), json.dumps(obj).encode("utf-8"))
+
+    def _blobs(self) -> List[os.DirEntry]:
+        out: List[os.DirEntry] = []
+        base = self.root / "blobs"
+        if not base.is_dir():
+            return out
+        for sub in os.scandir(base):
+            if sub.is_dir():
+                out.extend(e for e in os.scandir(sub.path) if e.is_file() and not e.name.endswith(".tmp"))
+        return out
+
+    def size(self) -> int:
+        return sum(e.stat().st_size for e in self._blobs())
+
+    def evict(self) -> int:
+        """Drop least recently used blobs until the cache fits `max_bytes`. Returns bytes freed."""
+        blobs = [(e.stat().st_mtime_ns, e.stat().st_size, e.path) for e in self._blobs()]
+        total = sum(b[1] for b in blobs)
+        freed = 0
+        for _, size, path in sorted(blobs):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+            freed += size
+        return freed
@@ -0,0 +1,243 @@
+#!/usr/bin/env python3
+"""
+PNG encoding stage for the asset pipeline: re-encode written outputs smaller.
+
+- lossless: chosen zlib level + Pillow's `optimize` flag; never grows a file
+- metadata strip: only pixel data (and palette transparency) is written, no
+  text/time/ICC/EXIF chunks
+- optional palette quantization (RGBA -> 8-bit palette with alpha). A
+  candidate palette is kept only if its perceptual error stays within
+  `max_error`: the 99th percentile over visible pixels of CIELAB dE76 between
+  the alpha-premultiplied colours, with alpha error counted as dE 100 per full
+  step. dE ~2.3 is a just-noticeable difference on flat opaque colour; the
+  default bound is looser because the outputs are mostly soft, additive VFX
+  where octree palettes land around p50 ~1 / p99 ~10 (tighten it for UI art).
+  Fewer colours are tried while the bound holds; the smallest passing file
+  wins, else the PNG stays lossless.
+- optional WebP / AVIF siblings next to each PNG (same name, other suffix)
+
+Standalone (in place, prints a size report):
+  python3 scripts/asset_encode.py                          # public/assets/**/*.png, lossless
+  python3 scripts/asset_encode.py public/assets/vfx --quantize --max-error 8 --webp --report sizes.json
+  python3 scripts/asset_encode.py --dry-run --quantize     # report only
+
+In the pipeline: `process_generated_assets.py --encode [--quantize ...]`.
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+from PIL import Image, features
+
+
+ROOT = Path(__file__).resolve().parents[1]
+ASSETS = ROOT / "public" / "assets"
+
+ENCODE_PARAMS = {
+    "compress_level": 9,
+    "optimize": True,
+    "quantize": False,
+    "max_colors": 256,
+    "max_error": 12.0,  # p99 dE (see module docstring)
+    "webp": False,
+    "webp_quality": 90,  # 100 + "webp_lossless" for exact pixels
+    "webp_lossless": False,
+    "avif": False,
+    "avif_quality": 80,
+}
+
+
+@dataclass
+class EncodeResult:
+    path: str
+    before: int
+    after: int
+    mode: str  # "lossless" or "palette<N>"
+    error: Optional[float] = None  # p99 dE of the chosen palette
+    siblings: Dict[str, int] = field(default_factory=dict)
+    skipped: List[str] = field(default_factory=list)
+
+
+def _srgb_to_lab(rgb: np.ndarray) -> np.ndarray:
+    """float sRGB in [0, 1], shape (n, 3) -> CIELAB (D65)."""
+    lin = np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+    m = np.array(
+        [[0.4124564, 0.3575761, 0.1804375], [0.2126729, 0.7151522, 0.0721750], [0.0193339, 0.1191920, 0.9503041]]
+    )
+    xyz = lin @ m.T / np.array([0.95047, 1.0, 1.08883])
+    e = 216 / 24389
+    f = np.where(xyz > e, np.cbrt(xyz), (24389 / 27 * xyz + 16) / 116)
+    return np.stack([116 * f[:, 1] - 16, 500 * (f[:, 0] - f[:, 1]), 200 * (f[:, 1] - f[:, 2])], axis=1)
+
+
+def perceptual_error(a: Image.Image, b: Image.Image, q: float = 99.0) -> float:
+    """Percentile dE between two RGBA images over pixels visible in either (see module docstring)."""
+    x = np.asarray(a.convert("RGBA"), dtype=np.float64).reshape(-1, 4) / 255.0
+    y = np.asarray(b.convert("RGBA"), dtype=np.float64).reshape(-1, 4) / 255.0
+    vis = (x[:, 3] > 0) | (y[:, 3] > 0)
+    if not vis.any():
+        return 0.0
+    x, y = x[vis], y[vis]
+    de = np.linalg.norm(_srgb_to_lab(x[:, :3] * x[:, 3:]) - _srgb_to_lab(y[:, :3] * y[:, 3:]), axis=1)
+    de = np.maximum(de, np.abs(x[:, 3] - y[:, 3]) * 100.0)
+    return float(np.percentile(de, q))
+
+
+def _clean(im: Image.Image) -> Image.Image:
+    """Copy without metadata (keeps palette transparency, which is pixel data)."""
+    out = im.copy()
+    keep = {"transparency": out.info["transparency"]} if "transparency" in out.info else {}
+    out.info = keep
+    return out
+
+
+def _png_bytes(im: Image.Image, P: dict) -> bytes:
+    buf = io.BytesIO()
+    _clean(im).save(buf, "PNG", optimize=bool(P["optimize"]), compress_level=int(P["compress_level"]))
+    return buf.getvalue()
+
+
+def _quantized(im: Image.Image, P: dict) -> Optional[Tuple[bytes, int, float]]:
+    """Smallest palette encoding within the error bound, as (png bytes, colours, error)."""
+    rgba = im.convert("RGBA")
+    best = None
+    colors = int(P["max_colors"])
+    while colors >= 16:
+        pal = rgba.quantize(colors=colors, method=Image.Quantize.FASTOCTREE, dither=Image.Dither.NONE)
+        err = perceptual_error(rgba, pal)
+        if err > float(P["max_error"]):
+            break
+        data = _png_bytes(pal, P)
+        if best is None or len(data) < len(best[0]):
+            best = (data, colors, err)
+        colors //= 2
+    return best
+
+
+def encode_file(path: Path, params: Optional[dict] = None, dry_run: bool = False) -> EncodeResult:
+    """Re-encode one PNG in place (plus siblings). `before` is the size of the file as found."""
+    P = dict(ENCODE_PARAMS, **(params or {}))
+    path = Path(path)
+    raw = path.read_bytes()
+    with Image.open(io.BytesIO(raw)) as src:
+        src.load()
+        im = src if src.mode in ("RGBA", "RGB", "L", "LA", "P") else src.convert("RGBA")
+        data = _png_bytes(im, P)
+        res = EncodeResult(str(path), len(raw), len(data), "lossless")
+        if P["quantize"] and im.mode != "P":
+            q = _quantized(im, P)
+            if q and len(q[0]) < len(data):
+                data = q[0]
+                res.after, res.mode, res.error = len(data), f"palette{q[1]}", round(q[2], 3)
+        if len(data) >= len(raw) and res.mode == "lossless":
+            data, res.after = raw, len(raw)  # never grow a file that is already tighter
+
+        rgba = im.convert("RGBA")
+        for fmt, ext, ok, kwargs in (
+            ("WEBP", ".webp", P["webp"], {"quality": int(P["webp_quality"]), "method": 6, "lossless": bool(P["webp_lossless"])}),
+            ("AVIF", ".avif", P["avif"], {"quality": int(P["avif_quality"])}),
+        ):
+            if not ok:
+                continue
+            if not features.check(fmt.lower()):
+                res.skipped.append(f"{fmt} (Pillow built without {fmt.lower()} support)")
+                continue
+            buf = io.BytesIO()
+            rgba.save(buf, fmt, **kwargs)
+            res.siblings[ext] = buf.tell()
+            if not dry_run:
+                path.with_suffix(ext).write_bytes(buf.getvalue())
+
+    if not dry_run and data is not raw:
+        tmp = path.with_name(path.name + ".tmp")
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    return res
+
+
+def find_pngs(targets: Iterable[Path]) -> List[Path]:
+    out: List[Path] = []
+    for t in targets:
+        t = Path(t)
+        out.extend(sorted(t.rglob("*.png")) if t.is_dir() else [t])
+    return out
+
+
+def print_report(results: List[EncodeResult], root: Path = ROOT) -> None:
+    def rel(p: str) -> str:
+        pp = Path(p)
+        return str(pp.relative_to(root)) if pp.is_relative_to(root) else p
+
+    w = max([len(rel(r.path)) for r in results] + [4])
+    print(f"{'file':<{w}} {'before':>10} {'after':>10} {'saved':>7}  mode")
+    for r in results:
+        saved = 100.0 * (r.before - r.after) / r.before if r.before else 0.0
+        extra = f" dE99={r.error}" if r.error is not None else ""
+        extra += "".join(f" {ext}={n}" for ext, n in r.siblings.items())
+        print(f"{rel(r.path):<{w}} {r.before:>10} {r.after:>10} {saved:>6.1f}%  {r.mode}{extra}")
+        for s in r.skipped:
+            print(f"{'':<{w}}   skipped {s}")
+    before = sum(r.before for r in results)
+    after = sum(r.after for r in results)
+    if before:
+        print(f"{'total':<{w}} {before:>10} {after:>10} {100.0 * (before - after) / before:>6.1f}%")
+
+
+def add_arguments(ap: argparse.ArgumentParser) -> None:
+    """Encoding options, shared with process_generated_assets.py."""
+    ap.add_argument("--level", type=int, default=ENCODE_PARAMS["compress_level"], help="zlib level 0-9")
+    ap.add_argument("--no-optimize", action="store_true", help="skip Pillow's optimize pass (faster)")
+    ap.add_argument("--quantize", action="store_true", help="try an 8-bit palette within --max-error")
+    ap.add_argument("--max-colors", type=int, default=ENCODE_PARAMS["max_colors"])
+    ap.add_argument("--max-error", type=float, default=ENCODE_PARAMS["max_error"], help="p99 dE bound for --quantize")
+    ap.add_argument("--webp", action="store_true", help="also write a .webp sibling")
+    ap.add_argument("--webp-quality", type=int, default=ENCODE_PARAMS["webp_quality"])
+    ap.add_argument("--webp-lossless", action="store_true")
+    ap.add_argument("--avif", action="store_true", help="also write an .avif sibling")
+    ap.add_argument("--avif-quality", type=int, default=ENCODE_PARAMS["avif_quality"])
+
+
+def params_from_args(args: argparse.Namespace) -> dict:
+    return {
+        "compress_level": args.level,
+        "optimize": not args.no_optimize,
+        "quantize": args.quantize,
+        "max_colors": args.max_colors,
+        "max_error": args.max_error,
+        "webp": args.webp,
+        "webp_quality": args.webp_quality,
+        "webp_lossless": args.webp_lossless,
+        "avif": args.avif,
+        "avif_quality": args.avif_quality,
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Re-encode PNG assets smaller (lossless or palette) with a size report.")
+    ap.add_argument("targets", nargs="*", type=Path, help="PNG files or directories (default: public/assets)")
+    add_arguments(ap)
+    ap.add_argument("--dry-run", action="store_true", help="report sizes without writing")
+    ap.add_argument("--report", type=Path, help="also write the report as JSON")
+    args = ap.parse_args(argv)
+
+    files = find_pngs(args.targets or [ASSETS])
+    if not files:
+        print("No PNGs found.")
+        return 2
+    P = params_from_args(args)
+    results = [encode_file(p, P, dry_run=args.dry_run) for p in files]
+    print_report(results)
+    if args.report:
+        args.report.write_text(json.dumps([asdict(r) for r in results], indent=1) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
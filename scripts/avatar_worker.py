@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+Avatar normalization on top of the asset pipeline's matting code.
+
+Library:
+  from avatar_worker import normalize_avatar
+  res = normalize_avatar(open("upload.png", "rb").read(), size=64)
+  res.png          # square RGBA PNG bytes (fits the server's 220 KB cap)
+  res.source       # "alpha" | "checkerboard" | "solid"
+
+Long-running worker (interpreter + NumPy stay warm, images run on a thread pool):
+  python3 scripts/avatar_worker.py --stdio [--threads 4]
+      one JSON object per line in, one per line out (possibly out of order; match on "id"):
+      {"id": 1, "path": "in.png", "out": "out.png", "size": 64}
+      {"id": 2, "data": "<base64 image>"}            -> reply carries "png": "<base64>"
+  python3 scripts/avatar_worker.py --http 8790
+      POST /normalize?size=64&mode=auto  (body: image bytes) -> image/png,
+      with X-Avatar-Source / X-Avatar-Ms headers; GET /healthz
+  python3 scripts/avatar_worker.py in.png -o out.png
+
+Already-transparent uploads are detected from alpha extrema/histograms (no
+pixel copies) and skip matting entirely; only opaque images are matted.
+"""
+
+from __future__ import annotations
+
+import argparse
+import base64
+import io
+import json
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, TextIO
+from urllib.parse import parse_qs, urlsplit
+
+from PIL import Image, ImageOps
+
+from process_generated_assets import (
+    MatteEngine,
+    _center_fit,
+    ensure_alpha,
+    has_transparency,
+    remove_checkerboard_to_alpha,
+    remove_solid_color_to_alpha,
+)
+
+
+AVATAR_SIZE = 64  # what public/app.js uploads
+MAX_UPLOAD_BYTES = 8 << 20
+MAX_OUTPUT_BYTES = 220 * 1024  # server cap for /api/players/avatar
+MAX_PIXELS = 24_000_000
+# Matting works on at most this many px per side; NEAREST keeps checkerboard squares pure.
+WORK_MAX_SIDE = 768
+MODES = ("auto", "checkerboard", "solid", "none")
+
+
+class AvatarError(ValueError):
+    pass
+
+
+@dataclass
+class AvatarResult:
+    png: bytes
+    size: int
+    source: str
+    ms: float
+
+
+_local = threading.local()
+
+
+def _engine() -> MatteEngine:
+    """One MatteEngine per thread, so scratch buffers stay allocated between images."""
+    eng = getattr(_local, "engine", None)
+    if eng is None:
+        eng = _local.engine = MatteEngine()
+    return eng
+
+
+def normalize_avatar(data: bytes, size: int = AVATAR_SIZE, mode: str = "auto", margin: int = 2) -> AvatarResult:
+    """
+    Decode an uploaded image, give it real alpha, crop to the visible subject
+    and centre it in a `size` x `size` PNG.
+
+    mode: "auto" (keep existing alpha, else checkerboard with solid-color
+    fallback), "checkerboard", "solid", or "none" (just crop + fit).
+    """
+    t0 = time.perf_counter()
+    if mode not in MODES:
+        raise AvatarError(f"unknown mode {mode!r}")
+    if not data or len(data) > MAX_UPLOAD_BYTES:
+        raise AvatarError("empty or oversized upload")
+    size = max(8, min(512, int(size)))
+    try:
+        im = Image.open(io.BytesIO(data))
+        if im.width * im.height > MAX_PIXELS:
+            raise AvatarError(f"image too large ({im.width}x{im.height})")
+        im = ImageOps.exif_transpose(im)
+        im.load()
+    except AvatarError:
+        raise
+    except Exception as e:
+        raise AvatarError(f"not a readable image: {e}") from None
+
+    if max(im.size) > WORK_MAX_SIDE:
+        k = WORK_MAX_SIDE / max(im.size)
+        im = im.resize((max(1, round(im.width * k)), max(1, round(im.height * k))), Image.Resampling.NEAREST)
+
+    eng = _engine()
+    if mode == "auto":
+        rgba, source = ensure_alpha(im, engine=eng)
+    elif mode == "none" or has_transparency(im):
+        rgba, source = im.convert("RGBA"), "alpha"
+    elif mode == "checkerboard":
+        rgba, source = remove_checkerboard_to_alpha(im, engine=eng), "checkerboard"
+    else:
+        rgba, source = remove_solid_color_to_alpha(im, engine=eng), "solid"
+
+    bbox = rgba.getchannel("A").getbbox()
+    if bbox:
+        rgba = rgba.crop(bbox)
+    out = _center_fit(rgba, out_size=(size, size), max_inner=max(1, size - 2 * margin))
+    buf = io.BytesIO()
+    out.save(buf, "PNG", optimize=True)
+    png = buf.getvalue()
+    if len(png) > MAX_OUTPUT_BYTES:
+        raise AvatarError("normalized avatar exceeds the upload cap")
+    return AvatarResult(png=png, size=size, source=source, ms=round((time.perf_counter() - t0) * 1000, 2))
+
+
+def _handle_job(job: dict) -> dict:
+    reply = {"id": job.get("id")}
+    try:
+        if job.get("path"):
+            data = Path(job["path"]).read_bytes()
+        elif job.get("data"):
+            data = base64.b64decode(job["data"], validate=True)
+        else:
+            raise AvatarError("job needs \"path\" or \"data\"")
+        res = normalize_avatar(data, size=int(job.get("size") or AVATAR_SIZE), mode=str(job.get("mode") or "auto"))
+        if job.get("out"):
+            out = Path(job["out"])
+            out.parent.mkdir(parents=True, exist_ok=True)
+            tmp = out.with_name(out.name + ".tmp")
+            tmp.write_bytes(res.png)
+            tmp.replace(out)
+            reply["out"] = str(out)
+        else:
+            reply["png"] = base64.b64encode(res.png).decode("ascii")
+        reply.update(ok=True, source=res.source, bytes=len(res.png), ms=res.ms)
+    except (AvatarError, OSError, ValueError) as e:
+        reply.update(ok=False, error=str(e))
+    except Exception as e:  # malformed job fields (e.g. "path": 5) must still get a reply
+        reply.update(ok=False, error=f"{type(e).__name__}: {e}")
+    return reply
+
+
+def serve_stdio(threads: int, inp: TextIO = sys.stdin, out: TextIO = sys.stdout) -> int:
+    """JSON-lines loop; jobs run concurrently, replies are written as they finish."""
+    lock = threading.Lock()
+
+    def emit(reply: dict) -> None:
+        line = json.dumps(reply, separators=(",", ":"))
+        with lock:
+            out.write(line + "\n")
+            out.flush()
+
+    def run(job: dict) -> None:
+        emit(_handle_job(job))
+
+    with ThreadPoolExecutor(max_workers=max(1, threads), thread_name_prefix="avatar") as pool:
+        for line in inp:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                job = json.loads(line)
+                if not isinstance(job, dict):
+                    raise ValueError("expected a JSON object")
+            except ValueError as e:
+                emit({"id": None, "ok": False, "error": f"bad request: {e}"})
+                continue
+            pool.submit(run, job)
+    return 0
+
+
+def serve_http(port: int, threads: int, host: str = "127.0.0.1"):
+    """Threaded HTTP server; at most `threads` images are normalized at once."""
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    slots = threading.BoundedSemaphore(max(1, threads))
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, code: int, body: bytes, ctype: str, headers: Optional[dict] = None) -> None:
+            self.send_response(code)
+            self.send_header("Content-Type", ctype)
+            self.send_header("Content-Length", str(len(body)))
+            for k, v in (headers or {}).items():
+                self.send_header(k, str(v))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _error(self, code: int, msg: str) -> None:
+            self._send(code, json.dumps({"ok": False, "error": msg}).encode("utf-8"), "application/json")
+
+        def do_GET(self):
+            if urlsplit(self.path).path != "/healthz":
+                return self._error(404, "not found")
+            self._send(200, b'{"ok":true}', "application/json")
+
+        def do_POST(self):
+            url = urlsplit(self.path)
+            if url.path != "/normalize":
+                return self._error(404, "not found")
+            n = int(self.headers.get("Content-Length") or 0)
+            if n <= 0 or n > MAX_UPLOAD_BYTES:
+                return self._error(413 if n > 0 else 400, "missing or oversized body")
+            data = self.rfile.read(n)
+            q = parse_qs(url.query)
+            try:
+                with slots:
+                    res = normalize_avatar(
+                        data, size=int((q.get("size") or [AVATAR_SIZE])[0]), mode=(q.get("mode") or ["auto"])[0]
+                    )
+            except (AvatarError, ValueError) as e:
+                return self._error(400, str(e))
+            except Exception as e:
+                return self._error(500, f"{type(e).__name__}: {e}")
+            self._send(200, res.png, "image/png", {"X-Avatar-Source": res.source, "X-Avatar-Ms": res.ms})
+
+        def log_message(self, *args):
+            pass
+
+    return ThreadingHTTPServer((host, int(port)), Handler)
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Normalize avatar uploads (transparent, cropped, square PNG).")
+    ap.add_argument("input", nargs="?", type=Path, help="one image to normalize (one-shot mode)")
+    ap.add_argument("-o", "--out", type=Path, help="output PNG (one-shot mode)")
+    ap.add_argument("--size", type=int, default=AVATAR_SIZE)
+    ap.add_argument("--mode", choices=MODES, default="auto")
+    ap.add_argument("--stdio", action="store_true", help="serve JSON lines on stdin/stdout")
+    ap.add_argument("--http", type=int, metavar="PORT", help="serve HTTP on 127.0.0.1:PORT")
+    ap.add_argument("--threads", type=int, default=4, help="images processed concurrently")
+    args = ap.parse_args(argv)
+
+    if args.stdio:
+        return serve_stdio(args.threads)
+    if args.http:
+        srv = serve_http(args.http, args.threads)
+        print(f"avatar worker on http://127.0.0.1:{args.http}/normalize", file=sys.stderr)
+        try:
+            srv.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        return 0
+    if not args.input or not args.out:
+        ap.error("give INPUT -o OUT, --stdio or --http PORT")
+    try:
+        res = normalize_avatar(args.input.read_bytes(), size=args.size, mode=args.mode)
+    except AvatarError as e:
+        print("error:", e, file=sys.stderr)
+        return 1
+    args.out.write_bytes(res.png)
+    print(f"{args.out}: {res.size}x{res.size}, {len(res.png)} bytes, {res.source}, {res.ms} ms")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,463 @@
+#!/usr/bin/env python3
+"""
+Benchmarks for the asset pipeline (scripts/process_generated_assets.py).
+
+Inputs are synthetic checkerboard or solid-key composites (deterministic,
+generated in memory), so no art files are needed:
+
+  python3 scripts/bench_assets.py                 # 4K + 8K
+  python3 scripts/bench_assets.py --sizes 4k --repeat 3 --json bench.json
+  python3 scripts/bench_assets.py --only matte --sizes 4k
+
+bg: background estimation (`_pick_bg_greys`) — the exact reference vs the
+packed-histogram mode, with and without subsampling. Reports wall time, peak
+traced memory (numpy allocations are visible to tracemalloc) and the largest
+per-channel difference to the exact estimate. That difference grows with
+sheet size mostly because the exact path averages millions of float32 pixels
+along axis 0 (naive accumulation drifts by several grey levels at 8K), while the
+histogram mode averages distinct colours in float64.
+
+matte: the matting kernels. The `ref-*` cases are the original
+allocate-per-step implementations (kept below, whole image at once); the
+others run on `MatteEngine` as one pass, in row bands (the default for large
+sheets) and with a warm engine reused from a previous call. Python cannot
+count numpy allocations directly, so peak traced memory stands in for them:
+with a warm engine the only large allocations left are the input conversion
+and the output image. Every case must match the reference pixel for pixel.
+
+  python3 scripts/bench_assets.py --only matte --sizes 1k
+  python3 scripts/bench_assets.py --inbox        # scripts/assets_inbox/*.png
+
+The inbox composites are not checked in (scripts/assets_inbox/ is a local
+drop folder), so `--inbox` only runs where someone has put sheets there; the
+synthetic sizes are the reproducible numbers.
+
+slice: strip/frame detection on the matted synthetic sheet, in a regular grid
+and with every other column shifted down half a row (sprites overlap
+diagonally). Reports time and how many of the generated sprites come out as
+their own frame: projection mode merges the staggered rows, components mode
+should find all of them.
+
+stages: one pass through the pipeline per stage, on a checkerboard and a
+solid-key composite: background estimate, both matting functions, the outline
+dilation (MatteEngine vs the old 9-way OR), both slice modes, frame
+extraction + `_center_fit` resizing, and PNG encoding (plain save, lossless
+level 9, palette). Pillow's own buffers are not visible to tracemalloc, so
+peak memory for the resize/encode stages only covers the numpy side.
+
+Golden outputs: small synthetic composites are run through matting, slicing
+and sheet building, and the results are compared with the PNGs stored in
+scripts/golden/ (alpha: max abs difference; colour: p99 dE, see
+asset_encode.perceptual_error). RGB under alpha 0 is ignored. Exits 1 when a
+case drifts past the tolerances, so it can gate threshold changes:
+
+  python3 scripts/bench_assets.py --golden
+  python3 scripts/bench_assets.py --update-golden   # after an intended change
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from PIL import Image
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+import asset_encode  # noqa: E402
+import process_generated_assets as pga  # noqa: E402
+
+
+SIZES: Dict[str, Tuple[int, int]] = {
+    "1k": (1920, 1080),
+    "4k": (3840, 2160),
+    "8k": (7680, 4320),
+}
+
+GOLDEN_DIR = Path(__file__).resolve().parent / "golden"
+GOLDEN_CASES: Dict[str, dict] = {
+    "checker": {"w": 512, "h": 288, "rows": 2, "cols": 4, "seed": 7, "background": "checker"},
+    "solid": {"w": 512, "h": 288, "rows": 2, "cols": 4, "seed": 11, "background": "solid"},
+}
+GOLDEN_FRAMES = 4
+
+
+def synthetic_sheet(
+    w: int,
+    h: int,
+    rows: int = 5,
+    cols: int = 8,
+    seed: int = 0,
+    stagger: bool = False,
+    background: str = "checker",
+) -> np.ndarray:
+    """
+    Checkerboard (two greys, 16 px squares) or solid green-screen background,
+    with mild noise, and coloured, outlined blobs in a grid; `stagger` shifts
+    odd columns down by half a row.
+    """
+    rng = np.random.default_rng(seed)
+    yy = np.arange(h, dtype=np.int32)[:, None]
+    xx = np.arange(w, dtype=np.int32)[None, :]
+    if background == "solid":
+        rgb = np.empty((h, w, 3), dtype=np.uint8)
+        rgb[:] = (40, 200, 90)
+    else:
+        checker = (((yy // 16) + (xx // 16)) % 2).astype(np.uint8)
+        grey = np.where(checker == 0, 102, 153).astype(np.uint8)
+        rgb = np.repeat(grey[:, :, None], 3, axis=2)
+    rgb = np.clip(rgb.astype(np.int16) + rng.integers(-3, 4, size=rgb.shape, dtype=np.int16), 0, 255).astype(np.uint8)
+    rh, cw = h // rows, w // cols
+    for r in range(rows):
+        for c in range(cols):
+            cy, cx = r * rh + rh // 2, c * cw + cw // 2
+            if stagger and c % 2:
+                cy += rh // 2
+                if cy + rh // 2 > h:
+                    continue
+            rad = int(rng.integers(min(rh, cw) // 6, min(rh, cw) // 2 - 4))
+            y0, y1 = max(0, cy - rad - 4), min(h, cy + rad + 4)
+            x0, x1 = max(0, cx - rad - 4), min(w, cx + rad + 4)
+            d2 = (yy[y0:y1] - cy) ** 2 + (xx[:, x0:x1] - cx) ** 2
+            sub = rgb[y0:y1, x0:x1]
+            sub[d2 < (rad + 3) ** 2] = (12, 12, 12)
+            base = rng.integers(0, 256, 3)
+            shade = rng.integers(-20, 21, size=(y1 - y0, x1 - x0, 1))
+            blob = np.clip(base[None, None, :] + shade, 0, 255).astype(np.uint8)
+            inside = d2 < rad**2
+            sub[inside] = blob[inside]
+    return rgb
+
+
+def measure(fn: Callable[[], object], repeat: int = 1) -> Tuple[object, float, int]:
+    """Best-of-`repeat` wall time (s) and peak traced memory (bytes) of one call."""
+    best = float("inf")
+    out = None
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        out = fn()
+        best = min(best, time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return out, best, peak
+
+
+def bench_bg(rgb: np.ndarray, repeat: int, subsample: int) -> List[dict]:
+    cases = [
+        ("exact", lambda: pga._pick_bg_greys(rgb, mode="exact")),
+        ("hist", lambda: pga._pick_bg_greys(rgb, mode="hist")),
+        (f"hist+sub{subsample // 1000}k", lambda: pga._pick_bg_greys(rgb, mode="hist", max_samples=subsample)),
+    ]
+    rows = []
+    ref = None
+    ref_t = None
+    for name, fn in cases:
+        out, t, peak = measure(fn, repeat)
+        got = np.stack(out)
+        if ref is None:
+            ref, ref_t = got, t
+        rows.append(
+            {
+                "case": name,
+                "seconds": round(t, 4),
+                "speedup": round(ref_t / t, 1) if t > 0 else None,
+                "peakMB": round(peak / 2**20, 1),
+                "maxAbsDiff": round(float(np.abs(got - ref).max()), 4),
+                "bg": [[round(float(v), 2) for v in c] for c in got],
+            }
+        )
+    return rows
+
+
+def ref_checkerboard(img: Image.Image) -> Image.Image:
+    """remove_checkerboard_to_alpha before MatteEngine (single pass, one temporary per step)."""
+    P = pga.CHECKERBOARD_PARAMS
+    arr = np.array(img.convert("RGBA"), dtype=np.uint8)
+    rgb = arr[:, :, :3]
+    bg1, bg2 = pga._pick_bg_greys(rgb, mode=P["bg_mode"], max_samples=P["bg_max_samples"])
+    d1 = pga._rgb_dist(rgb, bg1)
+    d2 = pga._rgb_dist(rgb, bg2)
+    dgrey = np.minimum(d1, d2)
+    bg = np.where((d1 <= d2)[:, :, None], bg1[None, None, :], bg2[None, None, :]).astype(np.float32)
+    lum = (0.2126 * rgb[:, :, 0] + 0.7152 * rgb[:, :, 1] + 0.0722 * rgb[:, :, 2]).astype(np.float32)
+    sat = (rgb.max(axis=2) - rgb.min(axis=2)).astype(np.float32)
+    strong = (dgrey >= P["strong_dist"]) & ((lum >= P["strong_lum"]) | (sat >= P["strong_sat"]))
+    keep = strong.copy()
+    for _ in range(int(P["dilate"])):
+        p = np.pad(keep, 1, mode="constant", constant_values=False)
+        keep = (
+            p[0:-2, 0:-2] | p[0:-2, 1:-1] | p[0:-2, 2:]
+            | p[1:-1, 0:-2] | p[1:-1, 1:-1] | p[1:-1, 2:]
+            | p[2:, 0:-2] | p[2:, 1:-1] | p[2:, 2:]
+        )
+    bg_black = (lum <= P["dark_lum"]) & (sat <= P["neutral_sat"]) & (~keep)
+    a = np.sqrt(np.clip((dgrey - P["t0"]) / (P["t1"] - P["t0"]), 0.0, 1.0))
+    a = np.where((dgrey <= P["bg_hard"]) | bg_black, 0.0, a)
+    a = np.where(keep & (~strong), np.maximum(a, P["keep_alpha"]), a)
+    a = np.where(strong, 1.0, a)
+    fg = (rgb.astype(np.float32) - (1.0 - a[:, :, None]) * bg) / np.maximum(a[:, :, None], 1e-6)
+    out = np.zeros_like(arr)
+    out[:, :, :3] = np.clip(fg, 0.0, 255.0).astype(np.uint8)
+    out[:, :, 3] = (a * 255.0).astype(np.uint8)
+    return Image.fromarray(out, mode="RGBA")
+
+
+def ref_solid(img: Image.Image) -> Image.Image:
+    """remove_solid_color_to_alpha before MatteEngine."""
+    P = pga.SOLID_PARAMS
+    arr = np.array(img.convert("RGBA"), dtype=np.uint8)
+    rgb = arr[:, :, :3]
+    key = pga._corner_mean(rgb)
+    a = np.sqrt(np.clip((pga._rgb_dist(rgb, key) - P["t0"]) / (P["t1"] - P["t0"]), 0.0, 1.0))
+    fg = (rgb.astype(np.float32) - (1.0 - a[:, :, None]) * key[None, None, :]) / np.maximum(a[:, :, None], 1e-6)
+    out = np.zeros_like(arr)
+    out[:, :, :3] = np.clip(fg, 0.0, 255.0).astype(np.uint8)
+    out[:, :, 3] = (a * 255.0).astype(np.uint8)
+    return Image.fromarray(out, mode="RGBA")
+
+
+def bench_matte(rgb: np.ndarray, repeat: int) -> List[dict]:
+    im = Image.fromarray(rgb)
+    h = rgb.shape[0]
+    warm = pga.MatteEngine()
+    pga.remove_checkerboard_to_alpha(im, engine=warm)
+    cases = [
+        ("ref-checkerboard", None, lambda: ref_checkerboard(im)),
+        ("single-pass", "ref-checkerboard", lambda: pga.remove_checkerboard_to_alpha(im, band_rows=h)),
+        ("banded", "ref-checkerboard", lambda: pga.remove_checkerboard_to_alpha(im)),
+        ("banded+warm", "ref-checkerboard", lambda: pga.remove_checkerboard_to_alpha(im, engine=warm)),
+        ("ref-solid", None, lambda: ref_solid(im)),
+        ("solid", "ref-solid", lambda: pga.remove_solid_color_to_alpha(im)),
+        ("solid+warm", "ref-solid", lambda: pga.remove_solid_color_to_alpha(im, engine=warm)),
+    ]
+    rows = []
+    refs: Dict[str, Tuple[np.ndarray, float, int]] = {}
+    for name, ref_name, fn in cases:
+        out, t, peak = measure(lambda: np.asarray(fn()), repeat)
+        row = {"case": name, "seconds": round(t, 4), "peakMB": round(peak / 2**20, 1)}
+        if ref_name is None:
+            refs[name] = (out, t, peak)
+        else:
+            ref, ref_t, ref_peak = refs[ref_name]
+            row["speedup"] = round(ref_t / t, 2) if t > 0 else None
+            row["memRatio"] = round(ref_peak / peak, 2) if peak > 0 else None
+            row["identical"] = bool(np.array_equal(out, ref))
+        rows.append(row)
+    return rows
+
+
+def bench_slice(w: int, h: int, repeat: int, rows: int = 5, cols: int = 8) -> List[dict]:
+    out = []
+    for stagger in (False, True):
+        rgba = pga.remove_checkerboard_to_alpha(Image.fromarray(synthetic_sheet(w, h, rows, cols, stagger=stagger)))
+        expected = rows * cols - (cols // 2 if stagger else 0)
+        for mode in ("projection", "components"):
+            strips, t, peak = measure(lambda: pga.slice_strips_and_frames(rgba, mode=mode), repeat)
+            out.append(
+                {
+                    "layout": "staggered" if stagger else "grid",
+                    "mode": mode,
+                    "seconds": round(t, 4),
+                    "peakMB": round(peak / 2**20, 1),
+                    "strips": len(strips),
+                    "frames": sum(len(s.frames) for s in strips),
+                    "expected": expected,
+                }
+            )
+    return out
+
+
+def _ref_dilate(mask: np.ndarray, steps: int) -> np.ndarray:
+    keep = mask.copy()
+    for _ in range(steps):
+        p = np.pad(keep, 1, mode="constant", constant_values=False)
+        keep = (
+            p[0:-2, 0:-2] | p[0:-2, 1:-1] | p[0:-2, 2:]
+            | p[1:-1, 0:-2] | p[1:-1, 1:-1] | p[1:-1, 2:]
+            | p[2:, 0:-2] | p[2:, 1:-1] | p[2:, 2:]
+        )
+    return keep
+
+
+def bench_stages(w: int, h: int, repeat: int) -> List[dict]:
+    P = pga.CHECKERBOARD_PARAMS
+    checker = synthetic_sheet(w, h)
+    solid = synthetic_sheet(w, h, background="solid")
+    im_checker = Image.fromarray(checker)
+    im_solid = Image.fromarray(solid)
+    matted = pga.remove_checkerboard_to_alpha(im_checker)
+    strong = np.asarray(matted)[:, :, 3] == 255
+    eng = pga.MatteEngine()
+    strips = pga.slice_strips_and_frames(matted)
+    sheet = pga.build_sheet_from_strip(matted, strips[0]) if strips else Image.new("RGBA", (2048, 256))
+    enc = dict(asset_encode.ENCODE_PARAMS, quantize=True)
+
+    def plain_png(im: Image.Image) -> int:
+        buf = io.BytesIO()
+        im.save(buf, "PNG")
+        return buf.tell()
+
+    stages: List[Tuple[str, Callable[[], object]]] = [
+        ("bg_greys", lambda: pga._pick_bg_greys(checker)),
+        ("matte/checkerboard", lambda: pga.remove_checkerboard_to_alpha(im_checker)),
+        ("matte/solid", lambda: pga.remove_solid_color_to_alpha(im_solid)),
+        ("dilate/engine", lambda: eng.dilate(strong, int(P["dilate"])).copy()),
+        ("dilate/ref-or9", lambda: _ref_dilate(strong, int(P["dilate"]))),
+        ("slice/projection", lambda: pga.slice_strips_and_frames(matted)),
+        ("slice/components", lambda: pga.slice_strips_and_frames(matted, mode="components")),
+        ("center_fit", lambda: [pga.build_sheet_from_strip(matted, st) for st in strips]),
+        ("encode/plain", lambda: plain_png(sheet)),
+        ("encode/lossless9", lambda: len(asset_encode._png_bytes(sheet, asset_encode.ENCODE_PARAMS))),
+        ("encode/palette", lambda: asset_encode._quantized(sheet, enc)),
+    ]
+    rows = []
+    for name, fn in stages:
+        out, t, peak = measure(fn, repeat)
+        row = {"stage": name, "seconds": round(t, 4), "peakMB": round(peak / 2**20, 1)}
+        if name.startswith("encode/"):
+            row["bytes"] = out if isinstance(out, int) else (len(out[0]) if out else None)
+        rows.append(row)
+    return rows
+
+
+def golden_outputs(case: dict) -> Dict[str, Image.Image]:
+    """Matte + one sheet per strip for a golden case, with RGB cleared under alpha 0."""
+    rgb = synthetic_sheet(case["w"], case["h"], case["rows"], case["cols"], seed=case["seed"], background=case["background"])
+    matted, _ = pga.ensure_alpha(Image.fromarray(rgb))
+    outs = {"matte": matted}
+    for i, st in enumerate(pga.slice_strips_and_frames(matted)):
+        outs[f"strip{i}"] = pga.build_sheet_from_strip(matted, st, frames_wanted=GOLDEN_FRAMES)
+    for k, im in outs.items():
+        a = np.array(im.convert("RGBA"))
+        a[a[:, :, 3] == 0] = 0
+        outs[k] = Image.fromarray(a, mode="RGBA")
+    return outs
+
+
+def check_golden(update: bool, alpha_tol: int, de_tol: float) -> int:
+    failed = 0
+    seen = set()
+    GOLDEN_DIR.mkdir(parents=True, exist_ok=True)
+    for name, case in GOLDEN_CASES.items():
+        for k, got in golden_outputs(case).items():
+            path = GOLDEN_DIR / f"{name}_{k}.png"
+            seen.add(path.name)
+            if update:
+                got.save(path, optimize=True)
+                print(f"  wrote {path.name}")
+                continue
+            if not path.exists():
+                print(f"  FAIL {path.name}: missing (run --update-golden)")
+                failed += 1
+                continue
+            want = Image.open(path).convert("RGBA")
+            if want.size != got.size:
+                print(f"  FAIL {path.name}: size {got.size} != golden {want.size}")
+                failed += 1
+                continue
+            da = int(np.abs(np.asarray(got)[:, :, 3].astype(np.int16) - np.asarray(want)[:, :, 3]).max())
+            de = asset_encode.perceptual_error(got, want)
+            ok = da <= alpha_tol and de <= de_tol
+            failed += 0 if ok else 1
+            print(f"  {'ok  ' if ok else 'FAIL'} {path.name}: alpha max diff {da}, dE99 {de:.3f}")
+    for extra in sorted(p.name for p in GOLDEN_DIR.glob("*.png") if p.name not in seen):
+        if update:
+            (GOLDEN_DIR / extra).unlink()
+            print(f"  removed {extra}")
+        else:
+            print(f"  FAIL {extra}: golden no longer produced")
+            failed += 1
+    if not update:
+        print("golden:", "ok" if not failed else f"{failed} failing")
+    return 1 if failed else 0
+
+
+def print_matte(rows: List[dict]) -> None:
+    print(f"  {'matte':<18}{'sec':>9}{'x':>7}{'peak MB':>10}{'mem x':>7}  identical")
+    for r in rows:
+        print(
+            f"  {r['case']:<18}{r['seconds']:>9.3f}{r.get('speedup') or 1.0:>7.2f}"
+            f"{r['peakMB']:>10.1f}{r.get('memRatio') or 1.0:>7.2f}  {r.get('identical', '-')}"
+        )
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description="Benchmark the asset pipeline on synthetic composites.")
+    ap.add_argument("--sizes", default="4k,8k", help=f"comma list of {', '.join(SIZES)}")
+    ap.add_argument("--repeat", type=int, default=1, help="best-of-N timing")
+    ap.add_argument("--subsample", type=int, default=2_000_000, help="max_samples for the subsampled case")
+    ap.add_argument("--only", default="bg,matte,slice,stages", help="comma list of sections: bg, matte, slice, stages")
+    ap.add_argument("--inbox", action="store_true", help="bench the matting kernels on scripts/assets_inbox/*.png instead")
+    ap.add_argument("--golden", action="store_true", help="compare against scripts/golden/ and exit")
+    ap.add_argument("--update-golden", action="store_true", help="rewrite scripts/golden/ from the current code")
+    ap.add_argument("--alpha-tol", type=int, default=2, help="golden: max abs alpha difference")
+    ap.add_argument("--de-tol", type=float, default=1.0, help="golden: max p99 dE")
+    ap.add_argument("--json", type=Path, help="also write results as JSON")
+    args = ap.parse_args(argv)
+
+    if args.golden or args.update_golden:
+        return check_golden(args.update_golden, args.alpha_tol, args.de_tol)
+
+    sections = {s.strip() for s in args.only.split(",") if s.strip()}
+    results = {}
+    if args.inbox:
+        paths = sorted(pga.INBOX.glob("*.png"))
+        if not paths:
+            print("no PNGs in", pga.INBOX)
+            return 2
+        for p in paths:
+            rgb = np.asarray(Image.open(p).convert("RGB"))
+            print(f"== {p.name} ({rgb.shape[1]}x{rgb.shape[0]})")
+            rows = bench_matte(rgb, args.repeat)
+            print_matte(rows)
+            results[p.name] = {"size": [rgb.shape[1], rgb.shape[0]], "matte": rows}
+    size_keys = [] if args.inbox else [s.strip().lower() for s in args.sizes.split(",") if s.strip()]
+    for key in size_keys:
+        if key not in SIZES:
+            print("unknown size:", key)
+            return 2
+        w, h = SIZES[key]
+        rgb = synthetic_sheet(w, h)
+        print(f"== {key} ({w}x{h}, {w * h / 1e6:.1f} MP)")
+        results[key] = {"size": [w, h]}
+        if "bg" in sections:
+            rows = bench_bg(rgb, args.repeat, args.subsample)
+            print(f"  {'bg':<18}{'sec':>9}{'x':>7}{'peak MB':>10}{'max diff':>10}")
+            for r in rows:
+                print(f"  {r['case']:<18}{r['seconds']:>9.3f}{r['speedup']:>7.1f}{r['peakMB']:>10.1f}{r['maxAbsDiff']:>10.4f}")
+            results[key]["bg"] = rows
+        if "matte" in sections:
+            rows = bench_matte(rgb, args.repeat)
+            print_matte(rows)
+            results[key]["matte"] = rows
+        if "slice" in sections:
+            rows = bench_slice(w, h, args.repeat)
+            print(f"  {'slice':<23}{'sec':>9}{'peak MB':>10}{'strips':>8}{'frames':>8}{'expected':>10}")
+            for r in rows:
+                label = f"{r['layout']}/{r['mode']}"
+                print(f"  {label:<23}{r['seconds']:>9.3f}{r['peakMB']:>10.1f}{r['strips']:>8}{r['frames']:>8}{r['expected']:>10}")
+            results[key]["slice"] = rows
+        if "stages" in sections:
+            rows = bench_stages(w, h, args.repeat)
+            print(f"  {'stage':<23}{'sec':>9}{'peak MB':>10}{'bytes':>10}")
+            for r in rows:
+                print(f"  {r['stage']:<23}{r['seconds']:>9.3f}{r['peakMB']:>10.1f}{r.get('bytes') or '':>10}")
+            results[key]["stages"] = rows
+        del rgb
+
+    if args.json:
+        args.json.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
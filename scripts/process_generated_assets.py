@@ -10,29 +10,81 @@ Outputs:
   - public/assets/vfx/*.png (sprite sheets)
   - public/assets/monsters/*.png (monster sprites)
 
+Batch mode (many composites, each with its own strip -> output mapping):
+  python3 scripts/process_generated_assets.py --manifest drop.json [--jobs 8]
+  python3 scripts/process_generated_assets.py --dir path/to/sheets [--out public/assets]
+
+Incremental: outputs are regenerated only when the input sheet's content hash or
+a parameter that affects them changed (see asset_cache.py; `--force` rebuilds all).
+The default run needs the scripts/assets_inbox sheets, which may not be present
+in a checkout; `--dir` on any folder of composites exercises the same path (a
+second run over it should print "Up to date").
+
+Atlas: `--atlas` also packs every output into <out>/atlas (see asset_atlas.py).
+Encoding: `--encode` re-encodes written PNGs smaller, optionally as palettes and
+with WebP/AVIF siblings, and prints a size report (see asset_encode.py).
+
+Manifest format (the default run is DEFAULT_MANIFEST below):
+  {"sheets": [{"src": "sheet.png", "minStrips": 3, "grid": [3, 8], "slice": "components",
+               "outputs": [{"strip": 0, "kind": "sheet", "out": "vfx/x.png"},
+                           {"strip": 2, "kind": "monsters", "out": ["monsters/a.png", ...]}]}]}
+
 This is intentionally dependency-light: Pillow + numpy (both commonly available).
 """
 
 from __future__ import annotations
 
+import argparse
+import json
 import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Iterable, List, Optional, Tuple
+from typing import Dict, Iterable, List, Optional, Tuple
 
 import numpy as np
 from PIL import Image
 
+from asset_atlas import build_from_outputs as build_atlas
+from asset_encode import EncodeResult, add_arguments as add_encode_arguments, encode_file, params_from_args, print_report
+from asset_cache import CACHE_DIR, DEFAULT_MAX_BYTES, BuildManifest, DiskCache, params_digest
+
 
 ROOT = Path(__file__).resolve().parents[1]
 INBOX = ROOT / "scripts" / "assets_inbox"
 OUT_VFX = ROOT / "public" / "assets" / "vfx"
 OUT_MON = ROOT / "public" / "assets" / "monsters"
 
-
-def _ensure_dirs() -> None:
-    OUT_VFX.mkdir(parents=True, exist_ok=True)
-    OUT_MON.mkdir(parents=True, exist_ok=True)
+# Everything that changes the pixels of an output. The build cache hashes these,
+# so tweaking a threshold here regenerates exactly the affected assets.
+CHECKERBOARD_PARAMS = {
+    "strong_dist": 34.0,  # "strong foreground": far from the checkerboard ...
+    "strong_lum": 42.0,  # ... and not too dark ...
+    "strong_sat": 18.0,  # ... or saturated enough
+    "dilate": 2,  # px of outline kept around strong pixels
+    "bg_hard": 14.0,  # distance under which a pixel is surely checkerboard
+    "dark_lum": 20.0,  # black background: dark ...
+    "neutral_sat": 8.0,  # ... and neutral
+    "t0": 14.0,  # soft alpha ramp over the checkerboard distance
+    "t1": 70.0,
+    "keep_alpha": 0.92,  # floor for the dilated outline ring
+    "bg_mode": "hist",  # background estimation, see _pick_bg_greys
+    "bg_max_samples": None,  # e.g. 2_000_000 to subsample huge sheets
+}
+SOLID_PARAMS = {"t0": 18.0, "t1": 70.0}
+# Sheets whose matte leaves less than this share of transparent pixels fall back to the solid-color key.
+MIN_TRANSPARENT_RATIO = 0.01
+SLICE_PARAMS = {
+    "min_sum": 2000.0,  # projection mode: row/column alpha sums that count as content ...
+    "rel": 0.08,  # ... or this share of the largest sum
+    "cc_alpha": 16,  # components mode: alpha above this is "sprite"
+    "cc_min_area": 64,  # components smaller than this (px) ...
+    "cc_rel_area": 0.02,  # ... or this share of the largest one are dropped as specks
+}
+SHEET_PAD = 8
+MONSTER_PAD = 10
+SHEET_MAX_INNER = 244
+MONSTER_MAX_INNER = 120
 
 
 def _quantize_rgb(arr: np.ndarray, bits: int = 5) -> np.ndarray:
@@ -40,10 +92,27 @@ def _quantize_rgb(arr: np.ndarray, bits: int = 5) -> np.ndarray:
     return (arr >> shift) << shift
 
 
-def _pick_bg_greys(arr_rgb: np.ndarray) -> List[np.ndarray]:
-    """
-    Pick the two most common "grey-ish" colors in the image as checkerboard background.
-    """
+def _order_dark_light(c1: np.ndarray, c2: np.ndarray) -> List[np.ndarray]:
+    l1 = float(0.2126 * c1[0] + 0.7152 * c1[1] + 0.0722 * c1[2])
+    l2 = float(0.2126 * c2[0] + 0.7152 * c2[1] + 0.0722 * c2[2])
+    if l1 <= l2:
+        return [c1.astype(np.float32), c2.astype(np.float32)]
+    return [c2.astype(np.float32), c1.astype(np.float32)]
+
+
+def _pick_seeds(colors: np.ndarray, counts: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Most common quantized colour, then the next one at least 10 away."""
+    idx = np.argsort(-counts)
+    seed1 = colors[idx[0]].astype(np.float32)
+    for i in idx[1:]:
+        c = colors[i].astype(np.float32)
+        if np.linalg.norm(c - seed1) >= 10:
+            return seed1, c
+    return seed1, seed1 + np.array([24, 24, 24], dtype=np.float32)
+
+
+def _pick_bg_greys_exact(arr_rgb: np.ndarray) -> List[np.ndarray]:
+    """Reference implementation: unique rows + k-means over every sampled pixel."""
     flat = arr_rgb.reshape(-1, 3).astype(np.uint8)
     mx = flat.max(axis=1).astype(np.int16)
     mn = flat.min(axis=1).astype(np.int16)
@@ -63,19 +132,8 @@ def _pick_bg_greys(arr_rgb: np.ndarray) -> List[np.ndarray]:
     # Use a quantized histogram to find two strong seeds, then refine via k-means (k=2).
     q = _quantize_rgb(sample, bits=6)
     colors, counts = np.unique(q, axis=0, return_counts=True)
-    idx = np.argsort(-counts)
-    seed1 = colors[idx[0]].astype(np.float32)
-    seed2 = None
-    for i in idx[1:]:
-        c = colors[i].astype(np.float32)
-        if np.linalg.norm(c - seed1) >= 10:
-            seed2 = c
-            break
-    if seed2 is None:
-        seed2 = seed1 + np.array([24, 24, 24], dtype=np.float32)
+    c1, c2 = _pick_seeds(colors, counts)
 
-    c1 = seed1
-    c2 = seed2
     pts = sample.astype(np.float32)
     for _ in range(12):
         d1 = np.sum((pts - c1[None, :]) ** 2, axis=1)
@@ -91,11 +149,104 @@ def _pick_bg_greys(arr_rgb: np.ndarray) -> List[np.ndarray]:
         c1, c2 = nc1, nc2
 
     # order by luminance (dark, light)
-    l1 = float(0.2126 * c1[0] + 0.7152 * c1[1] + 0.0722 * c1[2])
-    l2 = float(0.2126 * c2[0] + 0.7152 * c2[1] + 0.0722 * c2[2])
-    if l1 <= l2:
-        return [c1.astype(np.float32), c2.astype(np.float32)]
-    return [c2.astype(np.float32), c1.astype(np.float32)]
+    return _order_dark_light(c1, c2)
+
+
+# A grey-ish pixel has max-min <= 10, so g and b lie within r±10: (r, g-r, b-r)
+# packs every candidate colour exactly into 256*21*21 histogram bins.
+_GREY_SPAN = 21
+_GREY_BINS = 256 * _GREY_SPAN * _GREY_SPAN
+
+
+def _grey_histograms(arr_rgb: np.ndarray, max_samples: Optional[int] = None, chunk: int = 1 << 20):
+    """
+    One pass over the pixels (in chunks, bounded memory): exact colour histograms
+    of the mid-grey and fallback (darker-grey) masks, plus the pixel count.
+    With `max_samples`, a fixed-seed random subset of pixels is used instead.
+    """
+    flat = arr_rgb.reshape(-1, 3)
+    if max_samples and flat.shape[0] > max_samples:
+        pick = np.random.default_rng(0).integers(0, flat.shape[0], int(max_samples))
+        flat = flat[np.sort(pick)]
+    n = flat.shape[0]
+    hist_main = np.zeros(_GREY_BINS, dtype=np.int64)
+    hist_fb = np.zeros(_GREY_BINS, dtype=np.int64)
+    for i in range(0, n, chunk):
+        part = flat[i : i + chunk].astype(np.uint8)
+        mx = part.max(axis=1).astype(np.int16)
+        mn = part.min(axis=1).astype(np.int16)
+        grey = (mx - mn) <= 10
+        lum = (0.2126 * part[:, 0] + 0.7152 * part[:, 1] + 0.0722 * part[:, 2]).astype(np.float32)
+        r = part[:, 0].astype(np.int32)
+        code = r * (_GREY_SPAN * _GREY_SPAN) + (part[:, 1] - r + 10) * _GREY_SPAN + (part[:, 2] - r + 10)
+        m_fb = grey & (lum >= 35) & (lum <= 220)
+        m_main = m_fb & (lum >= 60) & (lum <= 210)
+        hist_main += np.bincount(code[m_main], minlength=_GREY_BINS)
+        hist_fb += np.bincount(code[m_fb], minlength=_GREY_BINS)
+    return hist_main, hist_fb, n
+
+
+def _pick_bg_greys_hist(arr_rgb: np.ndarray, max_samples: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Same estimate as `_pick_bg_greys_exact`, computed from a packed colour
+    histogram: seeds come from the same 6-bit quantized counts, and k-means runs
+    over the distinct colours weighted by their counts instead of every pixel.
+    """
+    hist_main, hist_fb, n = _grey_histograms(arr_rgb, max_samples=max_samples)
+    hist = hist_main
+    total = int(hist.sum())
+    if total == 0 or (n and total / n < 0.08):
+        # fallback: allow darker greys if we failed to sample enough
+        hist = hist_fb
+        total = int(hist.sum())
+    if total == 0:
+        return [np.array([80, 80, 80], dtype=np.float32), np.array([110, 110, 110], dtype=np.float32)]
+
+    codes = np.flatnonzero(hist)
+    weights = hist[codes]
+    r = codes // (_GREY_SPAN * _GREY_SPAN)
+    rem = codes % (_GREY_SPAN * _GREY_SPAN)
+    colors = np.stack([r, r + rem // _GREY_SPAN - 10, r + rem % _GREY_SPAN - 10], axis=1).astype(np.uint8)
+
+    # Seeds: collapse to 6-bit colours; packed codes sort like np.unique(axis=0) rows.
+    q = _quantize_rgb(colors, bits=6).astype(np.int32)
+    qcode = (q[:, 0] << 16) | (q[:, 1] << 8) | q[:, 2]
+    uq, inv = np.unique(qcode, return_inverse=True)
+    qcounts = np.bincount(inv, weights=weights).astype(np.int64)
+    qcolors = np.stack([uq >> 16, (uq >> 8) & 0xFF, uq & 0xFF], axis=1).astype(np.uint8)
+    c1, c2 = _pick_seeds(qcolors, qcounts)
+
+    pts = colors.astype(np.float32)
+    w = weights.astype(np.float64)
+    for _ in range(12):
+        d1 = np.sum((pts - c1[None, :]) ** 2, axis=1)
+        d2 = np.sum((pts - c2[None, :]) ** 2, axis=1)
+        m1 = d1 <= d2
+        w1 = float(w[m1].sum())
+        frac = w1 / total
+        if frac < 0.01 or frac > 0.99:
+            break
+        nc1 = ((pts[m1] * w[m1, None]).sum(axis=0) / w1).astype(np.float32)
+        nc2 = ((pts[~m1] * w[~m1, None]).sum(axis=0) / (total - w1)).astype(np.float32)
+        if np.linalg.norm(nc1 - c1) < 0.5 and np.linalg.norm(nc2 - c2) < 0.5:
+            c1, c2 = nc1, nc2
+            break
+        c1, c2 = nc1, nc2
+
+    return _order_dark_light(c1, c2)
+
+
+def _pick_bg_greys(arr_rgb: np.ndarray, mode: str = "hist", max_samples: Optional[int] = None) -> List[np.ndarray]:
+    """
+    Pick the two most common "grey-ish" colors in the image as checkerboard background.
+
+    mode="hist" (default) works from a packed colour histogram, optionally over
+    a random subsample of `max_samples` pixels; mode="exact" is the original
+    per-pixel version (kept as the reference for scripts/bench_assets.py).
+    """
+    if mode == "exact":
+        return _pick_bg_greys_exact(arr_rgb)
+    return _pick_bg_greys_hist(arr_rgb, max_samples=max_samples)
 
 
 def _rgb_dist(arr_rgb: np.ndarray, color: np.ndarray) -> np.ndarray:
@@ -103,77 +254,239 @@ def _rgb_dist(arr_rgb: np.ndarray, color: np.ndarray) -> np.ndarray:
     return np.sqrt(np.sum(d * d, axis=2))
 
 
-def remove_checkerboard_to_alpha(img: Image.Image) -> Image.Image:
+# Luminance as an exact integer (x10000), so thresholds don't depend on float rounding.
+_LUM_W = (2126, 7152, 722)
+
+
+class MatteEngine:
     """
-    Convert an opaque PNG that visually shows transparency via a checkerboard
-    into a real RGBA with alpha. Also removes large black background areas while
-    preserving dark outlines near foreground.
+    Scratch buffers + in-place kernels shared by the matting functions.
+
+    Buffers are allocated once per name at the largest band size seen and
+    handed out as views, so matting a sheet band by band (or many sheets with
+    one engine) does not allocate per step. Distances stay squared wherever
+    only a threshold is needed; the single sqrt left is the one the soft alpha
+    ramp actually uses. Not thread-safe: use one engine per thread.
     """
-    im = img.convert("RGBA")
-    arr = np.array(im, dtype=np.uint8)
-    rgb = arr[:, :, :3]
 
-    bg1, bg2 = _pick_bg_greys(rgb)
-    d1 = _rgb_dist(rgb, bg1)
-    d2 = _rgb_dist(rgb, bg2)
-    dgrey = np.minimum(d1, d2)
-    # best bg per pixel (for decontamination)
-    use_bg1 = d1 <= d2
-    bg = np.where(use_bg1[:, :, None], bg1[None, None, :], bg2[None, None, :]).astype(np.float32)
+    def __init__(self) -> None:
+        self._bufs: Dict[Tuple[str, str], np.ndarray] = {}
+
+    def buf(self, name: str, shape: Tuple[int, ...], dtype=np.float32) -> np.ndarray:
+        dt = np.dtype(dtype)
+        n = int(np.prod(shape))
+        key = (name, dt.str)
+        b = self._bufs.get(key)
+        if b is None or b.size < n:
+            b = np.empty(n, dtype=dt)
+            self._bufs[key] = b
+        return b[:n].reshape(shape)
+
+    def nbytes(self) -> int:
+        return sum(b.nbytes for b in self._bufs.values())
+
+    def planes(self, rgb: np.ndarray) -> np.ndarray:
+        """uint8 (h, w, 3) -> planar float32 (3, h, w) scratch."""
+        h, w = rgb.shape[:2]
+        pl = self.buf("planes", (3, h, w))
+        for c in range(3):
+            np.copyto(pl[c], rgb[:, :, c], casting="unsafe")
+        return pl
+
+    def dist2(self, planes: np.ndarray, color: np.ndarray, name: str) -> np.ndarray:
+        """Squared RGB distance of every pixel to `color` (summed r, g, b like _rgb_dist)."""
+        out = self.buf(name, planes.shape[1:])
+        tmp = self.buf("tmp", planes.shape[1:])
+        color = np.asarray(color, dtype=np.float32)
+        np.subtract(planes[0], color[0], out=out)
+        np.multiply(out, out, out=out)
+        for c in (1, 2):
+            np.subtract(planes[c], color[c], out=tmp)
+            np.multiply(tmp, tmp, out=tmp)
+            np.add(out, tmp, out=out)
+        return out
+
+    def luma(self, rgb: np.ndarray) -> np.ndarray:
+        """Integer luminance x10000 (int32)."""
+        out = self.buf("lum", rgb.shape[:2], np.int32)
+        tmp = self.buf("itmp", rgb.shape[:2], np.int32)
+        np.multiply(rgb[:, :, 0], _LUM_W[0], out=out, dtype=np.int32)
+        for c in (1, 2):
+            np.multiply(rgb[:, :, c], _LUM_W[c], out=tmp, dtype=np.int32)
+            np.add(out, tmp, out=out)
+        return out
+
+    def saturation(self, rgb: np.ndarray) -> np.ndarray:
+        """max(r, g, b) - min(r, g, b) as uint8."""
+        mx = self.buf("sat", rgb.shape[:2], np.uint8)
+        mn = self.buf("satmin", rgb.shape[:2], np.uint8)
+        np.maximum(rgb[:, :, 0], rgb[:, :, 1], out=mx)
+        np.maximum(mx, rgb[:, :, 2], out=mx)
+        np.minimum(rgb[:, :, 0], rgb[:, :, 1], out=mn)
+        np.minimum(mn, rgb[:, :, 2], out=mn)
+        np.subtract(mx, mn, out=mx)
+        return mx
+
+    def dilate(self, mask: np.ndarray, steps: int) -> np.ndarray:
+        """3x3 binary dilation repeated `steps` times, as separable row + column passes."""
+        cur = self.buf("dil_a", mask.shape, np.bool_)
+        tmp = self.buf("dil_b", mask.shape, np.bool_)
+        np.copyto(cur, mask)
+        for _ in range(max(0, int(steps))):
+            np.copyto(tmp, cur)
+            np.logical_or(tmp[:, 1:], cur[:, :-1], out=tmp[:, 1:])
+            np.logical_or(tmp[:, :-1], cur[:, 1:], out=tmp[:, :-1])
+            np.copyto(cur, tmp)
+            np.logical_or(cur[1:], tmp[:-1], out=cur[1:])
+            np.logical_or(cur[:-1], tmp[1:], out=cur[:-1])
+        return cur
+
+    def ramp(self, d2: np.ndarray, t0: float, t1: float) -> np.ndarray:
+        """Soft alpha sqrt(clip((d - t0) / (t1 - t0), 0, 1)) from squared distances, in place of `d2`."""
+        np.sqrt(d2, out=d2)
+        np.subtract(d2, np.float32(t0), out=d2)
+        np.divide(d2, np.float32(t1 - t0), out=d2)
+        np.clip(d2, 0.0, 1.0, out=d2)
+        np.sqrt(d2, out=d2)
+        return d2
+
+    def write(
+        self,
+        planes: np.ndarray,
+        a: np.ndarray,
+        out: np.ndarray,
+        bg: np.ndarray,
+        bg_alt: Optional[np.ndarray] = None,
+        use_alt: Optional[np.ndarray] = None,
+    ) -> None:
+        """
+        Store alpha and decontaminated colour fg = (obs - (1 - a) * bg) / max(a, 1e-6)
+        into the uint8 RGBA `out`. With `use_alt`, pixels where it is True use
+        `bg_alt` as their background instead of `bg`.
+        """
+        shape = a.shape
+        inv = self.buf("inv", shape)
+        aa = self.buf("aa", shape)
+        t = self.buf("tmp", shape)
+        np.multiply(a, np.float32(255.0), out=t)
+        np.copyto(out[:, :, 3], t, casting="unsafe")
+        np.subtract(np.float32(1.0), a, out=inv)
+        np.maximum(a, np.float32(1e-6), out=aa)
+        for c in range(3):
+            if use_alt is None:
+                np.multiply(inv, np.float32(bg[c]), out=t)
+            else:
+                t.fill(bg[c])
+                np.copyto(t, np.float32(bg_alt[c]), where=use_alt)
+                np.multiply(inv, t, out=t)
+            np.subtract(planes[c], t, out=t)
+            np.divide(t, aa, out=t)
+            np.clip(t, 0.0, 255.0, out=t)
+            np.copyto(out[:, :, c], t, casting="unsafe")
+
+
+# Images with more pixels than this are matted in row bands (see remove_checkerboard_to_alpha).
+BAND_PIXELS = 1 << 21
+
+
+def _band_ranges(h: int, w: int, band_rows: Optional[int]) -> Iterable[Tuple[int, int]]:
+    if band_rows is None:
+        band_rows = h if h * w <= BAND_PIXELS else max(16, BAND_PIXELS // max(1, w))
+    band_rows = max(1, int(band_rows))
+    for y0 in range(0, h, band_rows):
+        yield y0, min(h, y0 + band_rows)
+
+
+def _checkerboard_band(
+    eng: MatteEngine, rgb: np.ndarray, bg1: np.ndarray, bg2: np.ndarray, P: dict, out: np.ndarray, top: int
+) -> None:
+    """
+    Matte one band of rows. `rgb` may carry `top` halo rows above (and some below)
+    the rows of `out`; the halo only feeds the outline dilation and is not written.
+    """
+    rows = slice(top, top + out.shape[0])
+    shape = rgb.shape[:2]
+    planes = eng.planes(rgb)
+    d1 = eng.dist2(planes, bg1, "d1")
+    d2 = eng.dist2(planes, bg2, "d2")
+    # best bg per pixel (for decontamination): bg2 where strictly closer
+    use_bg2 = eng.buf("use_bg2", shape, np.bool_)
+    np.greater(d1, d2, out=use_bg2)
+    dgrey = np.minimum(d1, d2, out=d1)
 
     # Compute a "strong foreground" mask first (for outline preservation).
     # - far from checkerboard AND not too dark/neutral.
-    lum = (0.2126 * rgb[:, :, 0] + 0.7152 * rgb[:, :, 1] + 0.0722 * rgb[:, :, 2]).astype(np.float32)
-    sat = (rgb.max(axis=2) - rgb.min(axis=2)).astype(np.float32)
-    strong = (dgrey >= 34.0) & ((lum >= 42.0) | (sat >= 18.0))
+    lum = eng.luma(rgb)
+    sat = eng.saturation(rgb)
+    strong = eng.buf("strong", shape, np.bool_)
+    m = eng.buf("m", shape, np.bool_)
+    np.greater_equal(lum, P["strong_lum"] * 10000, out=strong)
+    np.greater_equal(sat, P["strong_sat"], out=m)
+    np.logical_or(strong, m, out=strong)
+    np.greater_equal(dgrey, np.float32(P["strong_dist"]) ** 2, out=m)
+    np.logical_and(strong, m, out=strong)
 
     # Dilate strong mask by 2px to keep outlines/shadows adjacent to colored pixels.
-    keep = strong.copy()
-    for _ in range(2):
-        p = np.pad(keep, 1, mode="constant", constant_values=False)
-        keep = (
-            p[0:-2, 0:-2]
-            | p[0:-2, 1:-1]
-            | p[0:-2, 2:]
-            | p[1:-1, 0:-2]
-            | p[1:-1, 1:-1]
-            | p[1:-1, 2:]
-            | p[2:, 0:-2]
-            | p[2:, 1:-1]
-            | p[2:, 2:]
-        )
+    keep = eng.dilate(strong, int(P["dilate"]))
+
+    # Everything below is per-pixel: drop the halo rows now.
+    planes, dgrey, use_bg2 = planes[:, rows], dgrey[rows], use_bg2[rows]
+    lum, sat, strong, keep, m = lum[rows], sat[rows], strong[rows], keep[rows], m[rows]
 
     # Background confidence: very close to checkerboard OR very dark and not near foreground.
-    bg_hard = dgrey <= 14.0
-    dark = lum <= 20.0
-    neutral = sat <= 8.0
-    bg_black = dark & neutral & (~keep)
+    clear = eng.buf("clear", dgrey.shape, np.bool_)
+    np.less_equal(lum, P["dark_lum"] * 10000, out=clear)
+    np.less_equal(sat, P["neutral_sat"], out=m)
+    np.logical_and(clear, m, out=clear)
+    np.logical_not(keep, out=m)
+    np.logical_and(clear, m, out=clear)
+    np.less_equal(dgrey, np.float32(P["bg_hard"]) ** 2, out=m)
+    np.logical_or(clear, m, out=clear)
 
     # Soft alpha based on distance to checkerboard; black background is fully transparent.
-    # Tight threshold to avoid leaving grey squares.
-    t0 = 14.0
-    t1 = 70.0
-    a = (dgrey - t0) / (t1 - t0)
-    a = np.clip(a, 0.0, 1.0)
-    # make edges a bit crisper
-    a = np.sqrt(a)
-    a = np.where(bg_hard | bg_black, 0.0, a)
+    # Tight threshold to avoid leaving grey squares; the sqrt makes edges a bit crisper.
+    a = eng.ramp(dgrey, P["t0"], P["t1"])
+    np.copyto(a, np.float32(0.0), where=clear)
     # Preserve foreground: strong pixels become fully opaque; the dilated "keep" area
     # becomes mostly opaque to retain outlines/shadows without leaving checkerboard.
-    a = np.where(keep & (~strong), np.maximum(a, 0.92), a)
-    a = np.where(strong, 1.0, a)
+    np.maximum(a, np.float32(P["keep_alpha"]), out=a, where=keep)
+    np.copyto(a, np.float32(1.0), where=strong)
 
-    alpha = (a * 255.0).astype(np.uint8)
+    eng.write(planes, a, out, bg1, bg2, use_bg2)
 
-    # Decontaminate edges by solving fg = (obs - (1-a)*bg)/a
-    obs = rgb.astype(np.float32)
-    aa = np.maximum(a[:, :, None], 1e-6)
-    fg = (obs - (1.0 - a[:, :, None]) * bg) / aa
-    fg = np.clip(fg, 0.0, 255.0).astype(np.uint8)
 
-    out = np.zeros_like(arr)
-    out[:, :, :3] = fg
-    out[:, :, 3] = alpha
+def remove_checkerboard_to_alpha(
+    img: Image.Image,
+    params: Optional[dict] = None,
+    band_rows: Optional[int] = None,
+    engine: Optional[MatteEngine] = None,
+) -> Image.Image:
+    """
+    Convert an opaque PNG that visually shows transparency via a checkerboard
+    into a real RGBA with alpha. Also removes large black background areas while
+    preserving dark outlines near foreground.
+
+    Large images are processed in bands of `band_rows` rows (default: about
+    BAND_PIXELS pixels per band) with a halo of `dilate` rows on each side, so
+    the float temporaries stay bounded by the band size; the background greys
+    are still estimated once over the whole image and results are identical to
+    a single pass. Pass an `engine` to reuse its scratch buffers across calls.
+    """
+    P = dict(CHECKERBOARD_PARAMS, **(params or {}))
+    eng = engine or MatteEngine()
+    im = img.convert("RGBA")
+    arr = np.asarray(im, dtype=np.uint8)
+    rgb = arr[:, :, :3]
+    h, w = rgb.shape[:2]
+
+    bg1, bg2 = _pick_bg_greys(rgb, mode=P["bg_mode"], max_samples=P["bg_max_samples"])
+    halo = int(P["dilate"])
+
+    out = np.empty((h, w, 4), dtype=np.uint8)
+    for y0, y1 in _band_ranges(h, w, band_rows):
+        hy0 = max(0, y0 - halo)
+        hy1 = min(h, y1 + halo)
+        _checkerboard_band(eng, rgb[hy0:hy1], bg1, bg2, P, out[y0:y1], top=y0 - hy0)
     return Image.fromarray(out, mode="RGBA")
 
 def _corner_mean(rgb: np.ndarray, k: int = 6) -> np.ndarray:
@@ -188,52 +501,103 @@ def _corner_mean(rgb: np.ndarray, k: int = 6) -> np.ndarray:
     pts = np.concatenate([c.reshape(-1, 3) for c in corners], axis=0)
     return pts.mean(axis=0).astype(np.float32)
 
-def remove_solid_color_to_alpha(img: Image.Image, key_rgb: Optional[Tuple[int, int, int]] = None) -> Image.Image:
+def remove_solid_color_to_alpha(
+    img: Image.Image,
+    key_rgb: Optional[Tuple[int, int, int]] = None,
+    params: Optional[dict] = None,
+    engine: Optional[MatteEngine] = None,
+) -> Image.Image:
     """
     Convert a solid-color background (e.g. green screen) to transparency.
     Uses the average corner color as the key if key_rgb is not provided.
     """
+    eng = engine or MatteEngine()
     im = img.convert("RGBA")
-    arr = np.array(im, dtype=np.uint8)
+    arr = np.asarray(im, dtype=np.uint8)
     rgb = arr[:, :, :3]
+    h, w = rgb.shape[:2]
 
     key = np.array(key_rgb, dtype=np.float32) if key_rgb else _corner_mean(rgb)
-    d = _rgb_dist(rgb, key)
 
     # tight threshold for solid backgrounds
-    t0 = 18.0
-    t1 = 70.0
-    a = (d - t0) / (t1 - t0)
-    a = np.clip(a, 0.0, 1.0)
-    a = np.sqrt(a)
-    alpha = (a * 255.0).astype(np.uint8)
-
-    # Decontaminate edges
-    obs = rgb.astype(np.float32)
-    aa = np.maximum(a[:, :, None], 1e-6)
-    fg = (obs - (1.0 - a[:, :, None]) * key[None, None, :]) / aa
-    fg = np.clip(fg, 0.0, 255.0).astype(np.uint8)
-
-    out = np.zeros_like(arr)
-    out[:, :, :3] = fg
-    out[:, :, 3] = alpha
+    P = dict(SOLID_PARAMS, **(params or {}))
+    out = np.empty((h, w, 4), dtype=np.uint8)
+    for y0, y1 in _band_ranges(h, w, None):
+        planes = eng.planes(rgb[y0:y1])
+        a = eng.ramp(eng.dist2(planes, key, "d1"), P["t0"], P["t1"])
+        eng.write(planes, a, out[y0:y1], key)
     return Image.fromarray(out, mode="RGBA")
 
 def _mask_segments_1d(values: np.ndarray, threshold: float) -> List[Tuple[int, int]]:
-    segs: List[Tuple[int, int]] = []
-    inside = values > threshold
-    n = int(inside.shape[0])
-    i = 0
-    while i < n:
-        if not inside[i]:
-            i += 1
-            continue
-        j = i
-        while j < n and inside[j]:
-            j += 1
-        segs.append((i, j))
-        i = j
-    return segs
+    inside = np.zeros(values.shape[0] + 2, dtype=np.int8)
+    inside[1:-1] = values > threshold
+    d = np.diff(inside)
+    return list(zip(np.flatnonzero(d == 1).tolist(), np.flatnonzero(d == -1).tolist()))
+
+
+def _row_runs(mask: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Horizontal runs of True in a 2-D mask as (row, start, end) arrays, row-major."""
+    h, w = mask.shape
+    p = np.zeros((h, w + 2), dtype=np.int8)
+    p[:, 1:-1] = mask
+    d = np.diff(p, axis=1)
+    starts = np.flatnonzero(d == 1)
+    ends = np.flatnonzero(d == -1)
+    return starts // (w + 1), starts % (w + 1), ends % (w + 1)
+
+
+def label_components(mask: np.ndarray) -> np.ndarray:
+    """
+    8-connected components of a 2-D mask, as an (n, 5) int64 array of
+    [x0, y0, x1, y1, area] boxes (exclusive ends), ordered by first pixel.
+
+    Works on row runs instead of pixels: runs in adjacent rows that touch are
+    linked with two searchsorted calls, then merged by vectorized union-find
+    (hook to the smaller root + pointer jumping), so cost scales with the
+    number of runs, not the image area.
+    """
+    row, s, e = _row_runs(mask)
+    n = row.size
+    if n == 0:
+        return np.zeros((0, 5), dtype=np.int64)
+    stride = mask.shape[1] + 2
+    start_key = row * stride + s
+    end_key = row * stride + e
+    # For each run, the previous row's runs with end >= start and start <= end (8-connectivity).
+    prev = (row - 1) * stride
+    lo = np.searchsorted(end_key, prev + s - 1, side="right")
+    hi = np.searchsorted(start_key, prev + e, side="right")
+    cnt = np.clip(hi - lo, 0, None)
+    cnt[row == 0] = 0
+    a = np.repeat(np.arange(n), cnt)
+    b = np.repeat(lo, cnt) + (np.arange(a.size) - np.repeat(np.cumsum(cnt) - cnt, cnt))
+
+    lab = np.arange(n)
+    while a.size:
+        ra, rb = lab[a], lab[b]
+        if np.array_equal(ra, rb):
+            break
+        m = np.minimum(ra, rb)
+        np.minimum.at(lab, ra, m)
+        np.minimum.at(lab, rb, m)
+        while True:
+            nxt = lab[lab]
+            if np.array_equal(nxt, lab):
+                break
+            lab = nxt
+
+    roots, comp = np.unique(lab, return_inverse=True)
+    k = roots.size
+    out = np.empty((k, 5), dtype=np.int64)
+    out[:, 0] = np.iinfo(np.int64).max
+    out[:, 1] = row[roots]
+    out[:, 2] = 0
+    out[:, 3] = 0
+    np.minimum.at(out[:, 0], comp, s)
+    np.maximum.at(out[:, 2], comp, e)
+    np.maximum.at(out[:, 3], comp, row + 1)
+    out[:, 4] = np.bincount(comp, weights=e - s, minlength=k).astype(np.int64)
+    return out
 
 
 @dataclass
@@ -241,23 +605,54 @@ class Strip:
     y0: int
     y1: int
     frames: List[Tuple[int, int]]
+    # Per-frame (y0, y1) when frames don't all span the strip's rows (components mode).
+    spans: Optional[List[Tuple[int, int]]] = None
+
+    def frame_rows(self, k: int) -> Tuple[int, int]:
+        return self.spans[k] if self.spans else (self.y0, self.y1)
+
+    def to_json(self) -> dict:
+        d = {"y0": self.y0, "y1": self.y1, "frames": self.frames}
+        if self.spans:
+            d["spans"] = self.spans
+        return d
+
+    @classmethod
+    def from_json(cls, d: dict) -> "Strip":
+        spans = [tuple(v) for v in d["spans"]] if d.get("spans") else None
+        return cls(y0=d["y0"], y1=d["y1"], frames=[tuple(f) for f in d["frames"]], spans=spans)
+
+    def shifted(self, dy: int) -> "Strip":
+        spans = [(a - dy, b - dy) for a, b in self.spans] if self.spans else None
+        return Strip(y0=self.y0 - dy, y1=self.y1 - dy, frames=list(self.frames), spans=spans)
+
+def _alpha_channel(im: Image.Image) -> Optional[Image.Image]:
+    """Alpha as an "L" image, or None for modes that can't be transparent (no pixel copy)."""
+    if im.mode in ("RGBA", "LA", "PA", "RGBa", "La"):
+        return im.getchannel("A")
+    if im.mode == "P" or "transparency" in im.info:
+        return im.convert("RGBA").getchannel("A")
+    return None
+
 
 def has_transparency(im: Image.Image) -> bool:
+    # Alpha extrema are computed in C on the band; opaque-only modes answer without reading pixels.
     try:
-        if im.mode != "RGBA":
-            im = im.convert("RGBA")
-        a = np.array(im, dtype=np.uint8)[:, :, 3]
-        mn, mx = int(a.min()), int(a.max())
+        a = _alpha_channel(im)
+        if a is None:
+            return False
+        mn, mx = a.getextrema()
         return mn < 250 or mx < 255
     except Exception:
         return False
 
 def transparency_ratio(im: Image.Image) -> float:
     try:
-        if im.mode != "RGBA":
-            im = im.convert("RGBA")
-        a = np.array(im, dtype=np.uint8)[:, :, 3]
-        return float((a < 5).mean())
+        a = _alpha_channel(im)
+        if a is None:
+            return 0.0
+        hist = a.histogram()
+        return float(sum(hist[:5])) / max(1, im.width * im.height)
     except Exception:
         return 0.0
 
@@ -280,14 +675,27 @@ def slice_grid(im: Image.Image, rows: int, cols: int) -> List[Strip]:
     return strips
 
 
-def slice_strips_and_frames(im: Image.Image) -> List[Strip]:
-    arr = np.array(im, dtype=np.uint8)
+def slice_strips_and_frames(im: Image.Image, mode: str = "projection") -> List[Strip]:
+    """
+    Find sprite rows (strips) and the frames in each.
+
+    "projection": alpha sums per row, then per column inside each row band.
+    Cheap, but sprites whose boxes overlap diagonally merge into one band.
+    "components": 8-connected sprites (see label_components), grouped into
+    strips by vertical centre and into frames by horizontal overlap; each
+    frame keeps its own rows in `Strip.spans`.
+    """
+    if mode == "components":
+        return _slice_components(np.asarray(im.getchannel("A")))
+    if mode != "projection":
+        raise ValueError(f"unknown slice mode: {mode!r}")
+    arr = np.asarray(im, dtype=np.uint8)
     a = arr[:, :, 3].astype(np.float32)
     row_sum = a.sum(axis=1)
     col_sum = a.sum(axis=0)
     # relative thresholds (robust across sizes)
-    row_thr = max(2000.0, row_sum.max() * 0.08)
-    col_thr = max(2000.0, col_sum.max() * 0.08)
+    row_thr = max(SLICE_PARAMS["min_sum"], row_sum.max() * SLICE_PARAMS["rel"])
+    col_thr = max(SLICE_PARAMS["min_sum"], col_sum.max() * SLICE_PARAMS["rel"])
     rows = _mask_segments_1d(row_sum, row_thr)
     strips: List[Strip] = []
     for (y0, y1) in rows:
@@ -300,6 +708,44 @@ def slice_strips_and_frames(im: Image.Image) -> List[Strip]:
     return strips
 
 
+def _slice_components(alpha: np.ndarray) -> List[Strip]:
+    boxes = label_components(alpha > SLICE_PARAMS["cc_alpha"])
+    if boxes.size == 0:
+        return []
+    min_area = max(SLICE_PARAMS["cc_min_area"], boxes[:, 4].max() * SLICE_PARAMS["cc_rel_area"])
+    boxes = boxes[boxes[:, 4] >= min_area]
+    # Strips: walk boxes by vertical centre; a box whose centre lies inside the current strip joins it.
+    boxes = boxes[np.argsort(boxes[:, 1] + boxes[:, 3], kind="stable")]
+    groups: List[List[np.ndarray]] = []
+    y1 = -1
+    for b in boxes:
+        if groups and (b[1] + b[3]) // 2 < y1:
+            groups[-1].append(b)
+            y1 = max(y1, int(b[3]))
+        else:
+            groups.append([b])
+            y1 = int(b[3])
+    strips: List[Strip] = []
+    for g in groups:
+        # Frames: boxes sorted by x; horizontally overlapping ones (one sprite in pieces) merge.
+        merged: List[List[int]] = []
+        for b in sorted(g, key=lambda b: int(b[0])):
+            if merged and b[0] < merged[-1][1]:
+                m = merged[-1]
+                m[1], m[2], m[3] = max(m[1], int(b[2])), min(m[2], int(b[1])), max(m[3], int(b[3]))
+            else:
+                merged.append([int(b[0]), int(b[2]), int(b[1]), int(b[3])])
+        strips.append(
+            Strip(
+                y0=min(m[2] for m in merged),
+                y1=max(m[3] for m in merged),
+                frames=[(m[0], m[1]) for m in merged],
+                spans=[(m[2], m[3]) for m in merged],
+            )
+        )
+    return strips
+
+
 def _bbox_alpha(arr_a: np.ndarray) -> Optional[Tuple[int, int, int, int]]:
     ys, xs = np.where(arr_a > 0)
     if ys.size == 0 or xs.size == 0:
@@ -350,9 +796,10 @@ def build_sheet_from_strip(
     frames_wanted: int = 8,
 ) -> Image.Image:
     frames: List[Image.Image] = []
-    for (x0, x1) in strip.frames:
-        f = _extract_frame(im, x0, strip.y0, x1, strip.y1, pad=8)
-        frames.append(_center_fit(f, out_size=frame_target))
+    for k, (x0, x1) in enumerate(strip.frames):
+        y0, y1 = strip.frame_rows(k)
+        f = _extract_frame(im, x0, y0, x1, y1, pad=SHEET_PAD)
+        frames.append(_center_fit(f, out_size=frame_target, max_inner=SHEET_MAX_INNER))
     if not frames:
         return Image.new("RGBA", (frame_target[0] * frames_wanted, frame_target[1]), (0, 0, 0, 0))
     # normalize to wanted count by repeating last frame
@@ -367,70 +814,456 @@ def build_sheet_from_strip(
 
 def extract_monsters_from_strip(im: Image.Image, strip: Strip) -> List[Image.Image]:
     mons: List[Image.Image] = []
-    for (x0, x1) in strip.frames:
-        f = _extract_frame(im, x0, strip.y0, x1, strip.y1, pad=10)
-        mons.append(_center_fit(f, out_size=(128, 128), max_inner=120))
+    for k, (x0, x1) in enumerate(strip.frames):
+        y0, y1 = strip.frame_rows(k)
+        f = _extract_frame(im, x0, y0, x1, y1, pad=MONSTER_PAD)
+        mons.append(_center_fit(f, out_size=(128, 128), max_inner=MONSTER_MAX_INNER))
     return mons
 
 
-def main() -> int:
-    _ensure_dirs()
+# Built-in manifest: the original two composites in scripts/assets_inbox.
+# Output paths are relative to the output root (public/assets).
+DEFAULT_MANIFEST = {
+    "sheets": [
+        {
+            "src": "vfx_v1.png",
+            # Fallback: strict grid (5 rows x 8 columns) if alpha segmentation finds < 4 strips.
+            "minStrips": 4,
+            "grid": [5, 8],
+            # v1 ordering in the provided composite:
+            # 0: fire rain, 1: hail, 2: arrow, 3: cleave, 4+: flurry/crit bits
+            "outputs": [
+                {"strip": 0, "kind": "sheet", "out": "vfx/fireball.png"},
+                {"strip": 1, "kind": "sheet", "out": "vfx/hail.png"},
+                {"strip": 2, "kind": "sheet", "out": "vfx/arrow.png"},
+                {"strip": 3, "kind": "sheet", "out": "vfx/cleave.png"},
+                {"strip": 4, "kind": "sheet", "out": "vfx/flurry.png"},
+            ],
+        },
+        {
+            "src": "vfx_v2.png",
+            "minStrips": 3,
+            "grid": [3, 8],
+            # v2 ordering:
+            # 0: level up starburst, 1: rare drop rainbow shine, 2: monsters row
+            # (expected monster ordering per the composite: pink, green, blue, crown)
+            "outputs": [
+                {"strip": 0, "kind": "sheet", "out": "vfx/level_up.png"},
+                {"strip": 1, "kind": "sheet", "out": "vfx/rare_drop.png"},
+                {
+                    "strip": 2,
+                    "kind": "monsters",
+                    "out": [
+                        "monsters/poring_pink.png",
+                        "monsters/poring_green.png",
+                        "monsters/poring_blue.png",
+                        "monsters/poring_elite.png",
+                    ],
+                },
+            ],
+        },
+    ]
+}
+
+
+@dataclass
+class SheetSpec:
+    src: Path
+    outputs: List[dict]
+    out_root: Path
+    min_strips: int = 1
+    grid: Optional[Tuple[int, int]] = None
+    slice: Optional[str] = None  # slice_strips_and_frames mode; None = projection
+
+
+@dataclass
+class StripJob:
+    """One manifest output: a strip cropped (with padding room) out of its matted sheet."""
+
+    sheet: int
+    index: int
+    kind: str
+    out: List[Path]
+    crop: Image.Image
+    strip: Strip
+    frames: int
+    frame_size: Tuple[int, int]
+    key: str = ""
 
-    src1 = INBOX / "vfx_v1.png"
-    src2 = INBOX / "vfx_v2.png"
-    if not src1.exists() or not src2.exists():
-        print("Missing inputs. Expected:")
-        print(" -", src1)
-        print(" -", src2)
-        return 2
 
-    im1_raw = Image.open(src1).convert("RGBA")
-    if has_transparency(im1_raw):
-        im1 = im1_raw
+def ensure_alpha(im: Image.Image, engine: Optional[MatteEngine] = None) -> Tuple[Image.Image, str]:
+    """
+    RGBA with real alpha, plus how it was obtained: "alpha" (already transparent,
+    no matting), "checkerboard" or "solid" (color key fallback).
+    """
+    if has_transparency(im):
+        return im.convert("RGBA"), "alpha"
+    raw = im.convert("RGBA")
+    cb = remove_checkerboard_to_alpha(raw, engine=engine)
+    if transparency_ratio(cb) >= MIN_TRANSPARENT_RATIO:
+        return cb, "checkerboard"
+    return remove_solid_color_to_alpha(raw, engine=engine), "solid"
+
+
+def load_alpha_image(path: Path) -> Image.Image:
+    """Open a composite and make sure it has real alpha (checkerboard or solid-color key)."""
+    return ensure_alpha(Image.open(path))[0]
+
+
+def slice_with_fallback(
+    im: Image.Image, min_strips: int, grid: Optional[Tuple[int, int]], mode: Optional[str] = None
+) -> List[Strip]:
+    strips = slice_strips_and_frames(im, mode=mode or "projection")
+    if grid and len(strips) < min_strips:
+        strips = slice_grid(im, rows=grid[0], cols=grid[1])
+    return strips
+
+
+def _parse_sheet(entry: dict, src_dir: Path, out_root: Path) -> SheetSpec:
+    src = Path(str(entry["src"]))
+    if not src.is_absolute():
+        src = src_dir / src
+    outputs = []
+    for o in entry.get("outputs") or []:
+        kind = str(o.get("kind") or "sheet")
+        if kind not in ("sheet", "monsters"):
+            raise ValueError(f"{src.name}: unknown output kind {kind!r}")
+        outs = o["out"] if isinstance(o.get("out"), list) else [o["out"]]
+        outputs.append(
+            {
+                "strip": int(o["strip"]),
+                "kind": kind,
+                "out": [out_root / str(x) for x in outs],
+                "frames": int(o.get("frames") or 8),
+                "frameSize": tuple(o.get("frameSize") or ((256, 256) if kind == "sheet" else (128, 128))),
+            }
+        )
+    grid = entry.get("grid")
+    mode = entry.get("slice")
+    if mode not in (None, "projection", "components"):
+        raise ValueError(f"{src.name}: unknown slice mode {mode!r}")
+    return SheetSpec(
+        src=src,
+        outputs=outputs,
+        out_root=out_root,
+        min_strips=int(entry.get("minStrips") or 1),
+        grid=(int(grid[0]), int(grid[1])) if grid else None,
+        slice=mode,
+    )
+
+
+def load_manifest(manifest: dict, src_dir: Path, out_root: Path) -> List[SheetSpec]:
+    sheets = [_parse_sheet(e, src_dir, out_root) for e in manifest.get("sheets") or []]
+    seen = {}
+    for sh in sheets:
+        for o in sh.outputs:
+            for path in o["out"]:
+                if path in seen:
+                    raise ValueError(f"{path} is written by both {seen[path].name} and {sh.src.name}")
+                seen[path] = sh.src
+    return sheets
+
+
+def manifest_from_dir(src_dir: Path, out_root: Path) -> List[SheetSpec]:
+    """
+    Every `*.png` in `src_dir` is a composite. A sidecar `<name>.json` holds its
+    manifest entry (without "src"); otherwise every strip becomes
+    `vfx/<name>_<i>.png`.
+    """
+    entries = []
+    for png in sorted(src_dir.glob("*.png")):
+        side = png.with_suffix(".json")
+        if side.exists():
+            entry = json.loads(side.read_text(encoding="utf-8"))
+            entry["src"] = png.name
+        else:
+            entry = {"src": png.name, "outputs": None}
+        entries.append(entry)
+    return load_manifest({"sheets": entries}, src_dir, out_root)
+
+
+def _default_outputs(spec: SheetSpec, n_strips: int) -> List[dict]:
+    return [
+        {"strip": k, "kind": "sheet", "out": [spec.out_root / "vfx" / f"{spec.src.stem}_{k}.png"], "frames": 8, "frameSize": (256, 256)}
+        for k in range(n_strips)
+    ]
+
+
+def _matte_key(digest: str) -> str:
+    return params_digest("matte", digest, CHECKERBOARD_PARAMS, SOLID_PARAMS, MIN_TRANSPARENT_RATIO)
+
+
+def _layout_key(matte_key: str, spec: SheetSpec) -> str:
+    return params_digest("layout", matte_key, SLICE_PARAMS, spec.min_strips, spec.grid, spec.slice or "projection")
+
+
+def _output_key(layout_key: str, o: dict) -> str:
+    if o["kind"] == "sheet":
+        fit = [SHEET_PAD, SHEET_MAX_INNER]
     else:
-        cb = remove_checkerboard_to_alpha(im1_raw)
-        im1 = cb if transparency_ratio(cb) >= 0.01 else remove_solid_color_to_alpha(im1_raw)
-    strips1 = slice_strips_and_frames(im1)
-    if len(strips1) < 4:
-        # Fallback: strict grid (5 rows x 8 columns) if alpha segmentation fails.
-        strips1 = slice_grid(im1, rows=5, cols=8)
-
-    # v1 ordering in the provided composite:
-    # 0: fire rain, 1: hail, 2: arrow, 3: cleave, 4+: flurry/crit bits
-    names1 = ["fireball", "hail", "arrow", "cleave", "flurry"]
-    for i, name in enumerate(names1):
-        if i >= len(strips1):
-            break
-        sheet = build_sheet_from_strip(im1, strips1[i], frame_target=(256, 256), frames_wanted=8)
-        sheet.save(OUT_VFX / f"{name}.png")
+        fit = [MONSTER_PAD, MONSTER_MAX_INNER]
+    return params_digest("output", layout_key, o["strip"], o["kind"], o["frames"], list(o["frameSize"]), fit, len(o["out"]))
+
 
-    im2_raw = Image.open(src2).convert("RGBA")
-    if has_transparency(im2_raw):
-        im2 = im2_raw
+def _prepare_sheet(
+    i: int,
+    spec: SheetSpec,
+    digest: Optional[str] = None,
+    cache_dir: Optional[Path] = None,
+    only: Optional[List[int]] = None,
+) -> Tuple[List[StripJob], List[str]]:
+    """
+    Worker: matte + slice one composite (or load both from the cache), then cut
+    out the strips the manifest asks for (`only`: output indexes; None = all).
+    """
+    cache = DiskCache(cache_dir) if (cache_dir and digest) else None
+    mkey = _matte_key(digest) if digest else ""
+    lkey = _layout_key(mkey, spec) if digest else ""
+
+    arr = cache.get_array(mkey) if cache else None
+    im = Image.fromarray(arr, mode="RGBA") if arr is not None else load_alpha_image(spec.src)
+    if cache and arr is None:
+        cache.put_array(mkey, np.asarray(im))
+    layout = cache.get_json(lkey) if cache else None
+    if layout is not None:
+        strips = [Strip.from_json(s) for s in layout]
     else:
-        cb = remove_checkerboard_to_alpha(im2_raw)
-        im2 = cb if transparency_ratio(cb) >= 0.01 else remove_solid_color_to_alpha(im2_raw)
-    strips2 = slice_strips_and_frames(im2)
-    if len(strips2) < 3:
-        # Fallback: strict grid (3 rows x 8 columns)
-        strips2 = slice_grid(im2, rows=3, cols=8)
-
-    # v2 ordering:
-    # 0: level up starburst, 1: rare drop rainbow shine, 2: monsters row
-    level_sheet = build_sheet_from_strip(im2, strips2[0], frame_target=(256, 256), frames_wanted=8)
-    level_sheet.save(OUT_VFX / "level_up.png")
-    rare_sheet = build_sheet_from_strip(im2, strips2[1], frame_target=(256, 256), frames_wanted=8)
-    rare_sheet.save(OUT_VFX / "rare_drop.png")
-
-    monsters = extract_monsters_from_strip(im2, strips2[2])
-    # expected ordering per the composite: pink, green, blue, crown
-    mon_names = ["poring_pink", "poring_green", "poring_blue", "poring_elite"]
-    for m, n in zip(monsters, mon_names):
-        m.save(OUT_MON / f"{n}.png")
-
-    print("Wrote:")
-    for p in sorted(list(OUT_VFX.glob("*.png")) + list(OUT_MON.glob("*.png"))):
-        print(" -", p.relative_to(ROOT))
+        strips = slice_with_fallback(im, spec.min_strips, spec.grid, spec.slice)
+        if cache:
+            cache.put_json(lkey, [s.to_json() for s in strips])
+
+    outputs = spec.outputs or _default_outputs(spec, len(strips))
+    w, h = im.size
+    jobs: List[StripJob] = []
+    skipped: List[str] = []
+    for k, o in enumerate(outputs):
+        if only is not None and k not in only:
+            continue
+        if o["strip"] >= len(strips):
+            skipped.append(f"{spec.src.name}: strip {o['strip']} not found ({len(strips)} strips)")
+            continue
+        st = strips[o["strip"]]
+        # Crop enough rows for _extract_frame's padding so results match the full-image path exactly.
+        pad = SHEET_PAD if o["kind"] == "sheet" else MONSTER_PAD
+        cy0 = max(0, st.y0 - pad)
+        cy1 = min(h, st.y1 + pad)
+        crop = im.crop((0, cy0, w, cy1))
+        jobs.append(
+            StripJob(
+                sheet=i,
+                index=k,
+                kind=o["kind"],
+                out=list(o["out"]),
+                crop=crop,
+                strip=st.shifted(cy0),
+                frames=o["frames"],
+                frame_size=tuple(o["frameSize"]),
+                key=_output_key(lkey, o) if digest else "",
+            )
+        )
+    return jobs, skipped
+
+
+def _render_strip(job: StripJob) -> List[Path]:
+    """Worker: build and save one output (sprite sheet or monster sprites)."""
+    written: List[Path] = []
+    if job.kind == "sheet":
+        sheet = build_sheet_from_strip(job.crop, job.strip, frame_target=job.frame_size, frames_wanted=job.frames)
+        job.out[0].parent.mkdir(parents=True, exist_ok=True)
+        sheet.save(job.out[0])
+        written.append(job.out[0])
+    else:
+        for m, path in zip(extract_monsters_from_strip(job.crop, job.strip), job.out):
+            path.parent.mkdir(parents=True, exist_ok=True)
+            m.save(path)
+            written.append(path)
+    return written
+
+
+@dataclass
+class BatchResult:
+    written: List[Path]
+    fresh: List[Path]
+    warnings: List[str]
+    encoded: List[EncodeResult]
+
+
+def _with_encode(key: str, encode: Optional[dict]) -> str:
+    return params_digest("encode", key, encode) if encode else key
+
+
+def _plan(
+    spec: SheetSpec, digest: str, build: BuildManifest, cache: Optional[DiskCache], encode: Optional[dict] = None
+) -> Tuple[List[Path], Optional[List[int]]]:
+    """Which outputs of a sheet are already up to date, and which must be (re)built (None = unknown, all)."""
+    outputs = spec.outputs
+    lkey = _layout_key(_matte_key(digest), spec)
+    if not outputs:
+        layout = cache.get_json(lkey) if cache else None
+        if layout is None:
+            return [], None
+        outputs = _default_outputs(spec, len(layout))
+    fresh: List[Path] = []
+    stale: List[int] = []
+    for k, o in enumerate(outputs):
+        key = _with_encode(_output_key(lkey, o), encode)
+        if all(build.is_fresh(p, key) for p in o["out"]):
+            fresh.extend(o["out"])
+        else:
+            stale.append(k)
+    return fresh, stale
+
+
+def run_batch(
+    sheets: List[SheetSpec],
+    jobs: int = 0,
+    build: Optional[BuildManifest] = None,
+    cache: Optional[DiskCache] = None,
+    force: bool = False,
+    encode: Optional[dict] = None,
+) -> BatchResult:
+    """
+    Process every sheet. File-level work (matting, slicing) and strip-level work
+    (frame extraction, resampling, PNG encoding) share one process pool; strips
+    are submitted as soon as their sheet is ready.
+
+    With a `BuildManifest`, outputs whose input hash and parameters are unchanged
+    (and whose files were not touched) are skipped, and sheets with nothing stale
+    are never opened. A `DiskCache` reuses the matted sheet and strip layout.
+    With `encode` (asset_encode params), each written PNG goes through the
+    encoding stage before it is recorded. Paths are returned in manifest order.
+    """
+    missing = [str(s.src) for s in sheets if not s.src.exists()]
+    if missing:
+        raise FileNotFoundError(", ".join(missing))
+
+    tasks = []
+    fresh: Dict[int, List[Path]] = {}
+    for i, spec in enumerate(sheets):
+        digest = build.input_digest(spec.src) if build else None
+        only = None
+        if build and digest and not force:
+            fresh[i], only = _plan(spec, digest, build, cache, encode)
+            if only == []:
+                continue
+        tasks.append((i, spec, digest, cache.root if cache else None, only))
+
+    results: Dict[Tuple[int, int], List[Path]] = {}
+    keys: Dict[Tuple[int, int], str] = {}
+    warnings: Dict[int, List[str]] = {}
+    encoded: Dict[Path, EncodeResult] = {}
+    n = min(jobs or os.cpu_count() or 1, max(1, sum(len(s.outputs) or 1 for s in sheets)))
+    if n <= 1 or not tasks:
+        for t in tasks:
+            strip_jobs, warnings[t[0]] = _prepare_sheet(*t)
+            for j in strip_jobs:
+                results[(j.sheet, j.index)] = _render_strip(j)
+                keys[(j.sheet, j.index)] = j.key
+                if encode:
+                    for p in results[(j.sheet, j.index)]:
+                        encoded[p] = encode_file(p, encode)
+    else:
+        with ProcessPoolExecutor(max_workers=n) as pool:
+            prep = {pool.submit(_prepare_sheet, *t): t[0] for t in tasks}
+            render = {}
+            for fut in as_completed(prep):
+                strip_jobs, warnings[prep[fut]] = fut.result()
+                for j in strip_jobs:
+                    render[pool.submit(_render_strip, j)] = (j.sheet, j.index)
+                    keys[(j.sheet, j.index)] = j.key
+            enc = {}
+            for fut in as_completed(render):
+                results[render[fut]] = fut.result()
+                if encode:
+                    for p in results[render[fut]]:
+                        enc[pool.submit(encode_file, p, encode)] = p
+            for fut in as_completed(enc):
+                encoded[enc[fut]] = fut.result()
+
+    if build:
+        for k, paths in results.items():
+            if keys.get(k):
+                for p in paths:
+                    build.record(p, _with_encode(keys[k], encode))
+        build.save()
+    if cache:
+        cache.evict()
+
+    return BatchResult(
+        written=[p for k in sorted(results) for p in results[k]],
+        fresh=[p for i in sorted(fresh) for p in fresh[i]],
+        warnings=[w for i in sorted(warnings) for w in warnings[i]],
+        encoded=[encoded[p] for k in sorted(results) for p in results[k] if p in encoded],
+    )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    ap = argparse.ArgumentParser(description="Turn checkerboard/solid-background composites into transparent sprite assets.")
+    src = ap.add_mutually_exclusive_group()
+    src.add_argument("--manifest", type=Path, help="JSON manifest of sheets (paths relative to the manifest)")
+    src.add_argument("--dir", type=Path, help="directory of composites (+ optional <name>.json sidecars)")
+    ap.add_argument("--out", type=Path, default=OUT_VFX.parent, help="output root (default: public/assets)")
+    ap.add_argument("--jobs", type=int, default=0, help="worker processes (default: CPU count, 1 = serial)")
+    ap.add_argument("--force", action="store_true", help="rebuild every output even if it is up to date")
+    ap.add_argument("--no-cache", action="store_true", help="don't read or write the intermediate cache")
+    ap.add_argument("--cache-dir", type=Path, default=CACHE_DIR, help="build manifest + intermediate cache (default: .cache/assets)")
+    ap.add_argument("--cache-max-mb", type=int, default=DEFAULT_MAX_BYTES >> 20, help="evict intermediates beyond this size")
+    ap.add_argument(
+        "--slice",
+        choices=("projection", "components"),
+        help="strip/frame detection for sheets whose manifest entry doesn't set \"slice\" (default: projection)",
+    )
+    ap.add_argument("--atlas", action="store_true", help="also pack the outputs into <out>/atlas (pages + atlas.json)")
+    ap.add_argument("--encode", action="store_true", help="re-encode written PNGs (options below) and report sizes")
+    add_encode_arguments(ap.add_argument_group("encoding (with --encode)"))
+    args = ap.parse_args(argv)
+
+    if args.manifest:
+        sheets = load_manifest(json.loads(args.manifest.read_text(encoding="utf-8")), args.manifest.parent, args.out)
+    elif args.dir:
+        sheets = manifest_from_dir(args.dir, args.out)
+    else:
+        sheets = load_manifest(DEFAULT_MANIFEST, INBOX, args.out)
+
+    if not sheets:
+        print("No input sheets.")
+        return 2
+    for sh in sheets:
+        sh.slice = sh.slice or args.slice
+    missing = [s.src for s in sheets if not s.src.exists()]
+    if missing:
+        print("Missing inputs. Expected:")
+        for m in missing:
+            print(" -", m)
+        return 2
+
+    build = BuildManifest(args.cache_dir / "build-manifest.json")
+    cache = None if args.no_cache else DiskCache(args.cache_dir, max_bytes=args.cache_max_mb << 20)
+    encode = params_from_args(args) if args.encode else None
+    res = run_batch(sheets, jobs=args.jobs, build=build, cache=cache, force=args.force, encode=encode)
+    for w in res.warnings:
+        print("warning:", w)
+
+    if res.fresh:
+        print(f"Up to date: {len(res.fresh)} file(s)")
+    if res.written:
+        print("Wrote:")
+    for p in res.written:
+        print(" -", p.relative_to(ROOT) if p.is_relative_to(ROOT) else p)
+
+    encoded = list(res.encoded)
+    if args.atlas:
+        atlas_dir = args.out / "atlas"
+        index = build_atlas(res.written + res.fresh, root=args.out, out_dir=atlas_dir, build=build, force=args.force, encode=encode)
+        if index is None:
+            print("Atlas up to date.")
+        else:
+            pages = ", ".join(f"{p['image']} ({p['w']}x{p['h']})" for p in index["pages"])
+            print(f"Atlas: {len(index['sprites'])} sprite(s) in {pages}")
+            encoded += index.get("encoded", [])
+    if encoded:
+        print("Encoding:")
+        print_report(encoded)
     return 0
 
 
@@ -2307,6 +2307,72 @@ app.get("/api/bot/status", (req, res) => {
   });
 });
 
+// Versioned world entities for `GET /api/bot/world?since=<version>` (delta snapshots).
+// Each sync compares the public JSON of every entity with the last one we saw and stamps
+// changed entities with the next version; removed entities leave a tombstone.
+// Versions start at boot time (ms) and advance by at most one per sync, so a version from
+// a previous server process is always below `floor` (or above `version`) and gets a full snapshot.
+const WORLD_DELTA_KINDS = ["players", "monsters", "drops", "parties", "board"];
+const WORLD_DELTA_TOMBSTONE_MAX = 4000;
+const worldDelta = {
+  version: nowMs(),
+  floor: 0,
+  syncedAt: 0,
+  entities: Object.fromEntries(WORLD_DELTA_KINDS.map((k) => [k, new Map()])), // id -> { json, value, v }
+  tombstones: [], // { kind, id, v } oldest first
+  chatVersions: new WeakMap(), // chat object -> version it was first seen at
+};
+worldDelta.floor = worldDelta.version;
+
+function syncWorldDelta() {
+  const t = nowMs();
+  if (worldDelta.syncedAt === t) return;
+  worldDelta.syncedAt = t;
+
+  const lists = {
+    players: Array.from(players.values()).map(toPublicPlayer),
+    monsters: Array.from(monsters.values()).map(toPublicMonster),
+    drops: Array.from(drops.values()).map(toPublicDrop),
+    parties: Array.from(parties.values()).map(toPublicParty).filter(Boolean),
+    board: boardPosts.slice(-20),
+  };
+  const next = worldDelta.version + 1;
+  let changed = false;
+  for (const kind of WORLD_DELTA_KINDS) {
+    const map = worldDelta.entities[kind];
+    const seen = new Set();
+    for (const e of lists[kind]) {
+      if (!e || !e.id) continue;
+      seen.add(e.id);
+      const json = JSON.stringify(e);
+      const prev = map.get(e.id);
+      if (prev && prev.json === json) {
+        prev.value = e;
+        continue;
+      }
+      map.set(e.id, { json, value: e, v: next });
+      changed = true;
+    }
+    for (const id of Array.from(map.keys())) {
+      if (seen.has(id)) continue;
+      map.delete(id);
+      worldDelta.tombstones.push({ kind, id, v: next });
+      changed = true;
+    }
+  }
+  for (const c of chats) {
+    if (worldDelta.chatVersions.has(c)) continue;
+    worldDelta.chatVersions.set(c, next);
+    changed = true;
+  }
+  if (worldDelta.tombstones.length > WORLD_DELTA_TOMBSTONE_MAX) {
+    const cut = worldDelta.tombstones.length - WORLD_DELTA_TOMBSTONE_MAX;
+    worldDelta.floor = worldDelta.tombstones[cut - 1].v;
+    worldDelta.tombstones.splice(0, cut);
+  }
+  if (changed) worldDelta.version = next;
+}
+
 app.get("/api/bot/world", (req, res) => {
   const auth = authBot(req);
   if (!auth) return res.status(401).json({ ok: false, error: "unauthorized" });
@@ -2314,6 +2380,7 @@ app.get("/api/bot/world", (req, res) => {
   const rl = rateLimitBot(p, "world", { intervalMs: 250, burst: 6 });
   if (!rl.ok) return res.status(429).json({ ok: false, error: "rate limited", retryInMs: rl.retryInMs });
   markBotSeen(p);
+  syncWorldDelta();
 
   const nearbyR2 = Math.pow(6 * WORLD.tileSize, 2);
   const relevantChats = chats
@@ -2333,15 +2400,30 @@ app.get("/api/bot/world", (req, res) => {
     })
     .slice(-25);
 
+  // `since` must be a version this process handed out and still has tombstones for.
+  const sinceRaw = req.query?.since;
+  const since = sinceRaw == null || sinceRaw === "" ? null : Math.floor(Number(sinceRaw));
+  const delta = Number.isFinite(since) && since >= worldDelta.floor && since <= worldDelta.version;
+
+  const pick = (kind) => {
+    const out = [];
+    for (const e of worldDelta.entities[kind].values()) {
+      if (!delta || e.v > since) out.push(e.value);
+    }
+    return out;
+  };
+
   const snapshot = {
+    version: worldDelta.version,
+    delta,
     world: { width: WORLD.width, height: WORLD.height, tileSize: WORLD.tileSize },
     you: toPublicPlayer(p),
-    players: Array.from(players.values()).map(toPublicPlayer),
-    monsters: Array.from(monsters.values()).map(toPublicMonster),
-    drops: Array.from(drops.values()).map(toPublicDrop),
-    parties: Array.from(parties.values()).map(toPublicParty).filter(Boolean),
-    board: boardPosts.slice(-20),
-    chats: relevantChats,
+    players: pick("players"),
+    monsters: pick("monsters"),
+    drops: pick("drops"),
+    parties: pick("parties"),
+    board: pick("board"),
+    chats: delta ? relevantChats.filter((c) => (worldDelta.chatVersions.get(c) || Infinity) > since) : relevantChats,
     hat: {
       submittedAt: p.hat.submittedAt,
       answers: p.hat.answers,
@@ -2349,6 +2431,13 @@ app.get("/api/bot/world", (req, res) => {
       botResult: p.hat.botResult,
     },
   };
+  if (delta) {
+    snapshot.since = since;
+    snapshot.removed = Object.fromEntries(WORLD_DELTA_KINDS.map((k) => [k, []]));
+    for (const tomb of worldDelta.tombstones) {
+      if (tomb.v > since) snapshot.removed[tomb.kind].push(tomb.id);
+    }
+  }
 
   res.json({ ok: true, snapshot });
 });
@@ -1114,6 +1114,54 @@ test('Bot: events endpoint returns kill events (cursor-based)', async ({ page })
   expect((data.events as any[]).some((e: any) => e && e.kind === 'kill' && String(e.text || '').includes('Event Poring'))).toBeTruthy();
 });
 
+test('Bot: world snapshot supports since=<version> deltas', async ({ page }) => {
+  await resetWorld(page);
+  await page.goto('/');
+  await waitForFonts(page);
+  await closeOnboarding(page);
+
+  const playerId = await page.evaluate(() => {
+    try {
+      return JSON.parse(localStorage.getItem('clawtown.player') || 'null')?.playerId || null;
+    } catch {
+      return null;
+    }
+  });
+  expect(playerId).toBeTruthy();
+
+  const join = await page.request.post('/api/join-codes', { data: { playerId } });
+  const joinData = await join.json();
+  expect(joinData.ok).toBeTruthy();
+
+  const link = await page.request.post('/api/bot/link', { data: { joinCode: joinData.joinCode } });
+  const linkData = await link.json();
+  expect(linkData.ok).toBeTruthy();
+  const headers = { Authorization: `Bearer ${linkData.botToken}` };
+
+  const fullRes = await page.request.get('/api/bot/world', { headers });
+  const full = (await fullRes.json()).snapshot;
+  expect(full.delta).toBe(false);
+  expect(typeof full.version).toBe('number');
+  expect((full.monsters || []).length).toBeGreaterThan(0);
+
+  await page.request.post('/api/debug/spawn-monster', { data: { id: 'm_delta_slime', kind: 'slime', name: 'Delta Poring', x: 200, y: 200 } });
+
+  const deltaRes = await page.request.get(`/api/bot/world?since=${full.version}`, { headers });
+  const delta = (await deltaRes.json()).snapshot;
+  expect(delta.delta).toBe(true);
+  expect(delta.since).toBe(full.version);
+  expect(delta.version).toBeGreaterThan(full.version);
+  expect(delta.you?.id).toBe(playerId);
+  expect((delta.monsters || []).some((m: any) => m.id === 'm_delta_slime')).toBeTruthy();
+  expect(Array.isArray(delta.removed?.monsters)).toBeTruthy();
+
+  // Unknown versions (e.g. from before a server restart) fall back to a full snapshot.
+  const staleRes = await page.request.get('/api/bot/world?since=1', { headers });
+  const stale = (await staleRes.json()).snapshot;
+  expect(stale.delta).toBe(false);
+  expect(stale.monsters.length).toBeGreaterThanOrEqual(full.monsters.length);
+});
+
 test('Skill 4: targeted fireball damages monsters', async ({ page }) => {
   await resetWorld(page);
   await page.goto('/');